@@ -0,0 +1,48 @@
+"""Benchmark the duration parser against the old per entry regex on synthetic clockify durations.
+
+usage: python scripts/bench_duration.py [COUNT]
+"""
+
+import random
+import re
+import sys
+import time
+
+from vm_clockify.utils import duration_helper
+
+
+def _synthetic_durations(count: int) -> list[str]:
+    rng = random.Random(42)
+    values: list[str] = []
+    for _ in range(count):
+        days, hours, minutes, seconds = rng.choice([0] * 20 + [1]), rng.randrange(12), rng.randrange(60), rng.randrange(60)
+        value = f"P{days}D" if days else "P"
+        time_part = "".join(f"{n}{unit}" for n, unit in ((hours, "H"), (minutes, "M"), (seconds, "S")) if n)
+        values.append(f"{value}T{time_part}" if time_part else f"{value}T0S")
+    return values
+
+
+def _legacy(values: list[str]) -> list[int | None]:
+    results: list[int | None] = []
+    for value in values:
+        match = re.match(r"PT(?:([0-9]{1,2})H){0,1}(?:([0-9]{1,2})M){0,1}", value) if value.startswith("PT") else None
+        results.append(None if match is None else int(match.group(1) or 0) * 3600 + int(match.group(2) or 0) * 60)
+    return results
+
+
+def main() -> None:
+    """Run the benchmark."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    values = _synthetic_durations(count)
+
+    for name, parse in (("legacy regex", _legacy), ("parse_durations", duration_helper.parse_durations)):
+        duration_helper.clear_duration_cache()
+        started = time.perf_counter()
+        parsed = parse(values)
+        elapsed = time.perf_counter() - started
+        total = sum(value for value in parsed if value is not None)
+        print(f"{name:16}: {count / elapsed:>12,.0f} durations/s ({elapsed:.3f}s, total {total}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Fuzz the issue tag scanner against the former regex and benchmark it, also on pathological texts.
+
+usage: python scripts/bench_issue_tag.py [FUZZ_COUNT]
+"""
+
+import random
+import re
+import sys
+import time
+from urllib.parse import parse_qs
+
+from vm_clockify.utils.issue_tag_helper import find_issue_tag, parse_issue_tag, strip_issue_tag
+
+LEGACY_REGEX_ISSUE = r"(?:(?:.*?)\[(.*?)\](?:.*?))+$"
+FUZZ_ALPHABET = ["a", "b", " ", "[", "]", "=", "&", "i", "t", "+", "%20", "\n", "\r", "ü", "[i=ABC-1]", "[i=X-2&t=Dev]"]
+
+
+def _legacy(value: str) -> tuple[str | None, str, dict[str, list[str]]]:
+    match = re.match(LEGACY_REGEX_ISSUE, value)
+    tag = match.group(1) if match is not None else None
+    return tag, re.sub(r"\[.*?\]$", "", value).strip(), parse_qs(tag) if tag is not None else {}
+
+
+def _current(value: str) -> tuple[str | None, str, dict[str, list[str]]]:
+    tag = find_issue_tag(value)
+    parsed = {key: [item] for key, item in parse_issue_tag(tag).items()} if tag is not None else {}
+    return tag, strip_issue_tag(value), parsed
+
+
+def _fuzz(count: int) -> None:
+    rng = random.Random(42)
+    for _ in range(count):
+        # the legacy regex is exponential in the number of brackets, keep the fuzz texts short
+        value = "".join(rng.choice(FUZZ_ALPHABET) for _ in range(rng.randrange(12)))
+        legacy, current = _legacy(value), _current(value)
+        # parse_qs returns all values of a key, the scanner only the first one (the only one used)
+        legacy_first = {key: items[:1] for key, items in legacy[2].items()}
+        if (legacy[0], legacy[1], legacy_first) != current:
+            msg = f"result differs for {value!r}: {legacy} != {current}"
+            raise AssertionError(msg)
+    print(f"fuzz            : {count:,} texts match the legacy regex")
+
+
+def _bench(name: str, values: list[str], legacy: bool) -> None:
+    started = time.perf_counter()
+    for value in values:
+        find_issue_tag(value)
+    elapsed = time.perf_counter() - started
+    line = f"{name:16}: scanner {len(values) / elapsed:>12,.0f} texts/s"
+    if legacy:
+        started = time.perf_counter()
+        for value in values:
+            re.match(LEGACY_REGEX_ISSUE, value)
+        line += f", legacy regex {len(values) / (time.perf_counter() - started):>12,.0f} texts/s"
+    print(line)
+
+
+def main() -> None:
+    """Run the fuzz and the benchmark."""
+    _fuzz(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
+
+    typical = [f"work on feature {n} [i=ABC-{n}&t=Development]" for n in range(100_000)]
+    _bench("typical", typical, legacy=True)
+    _bench("no tag", [f"meeting about topic {n}" for n in range(100_000)], legacy=True)
+
+    # many brackets and a line break at the end: the legacy regex needs seconds from ~12 tags on, minutes from ~16
+    for count in (8, 10, 12):
+        _bench(f"{count} tags + break", ["[a]" * count + "\n x"] * 10, legacy=True)
+    _bench("10k tags + break", ["[a]" * 10_000 + "\n x"] * 10, legacy=False)
+    _bench("100k brackets", ["[" * 100_000 + "]" * 100_000] * 10, legacy=False)
+
+
+if __name__ == "__main__":
+    main()
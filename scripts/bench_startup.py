@@ -0,0 +1,105 @@
+"""Benchmark the start up of the cli per sub-command and check the command manifest against the command modules.
+
+The wall time is the median of fresh interpreters, the imports are taken from one run with "-X importtime",
+listed are the heaviest packages, which are imported directly by vm_clockify modules.
+
+usage: python scripts/bench_startup.py [RUNS]
+"""
+
+from importlib import import_module
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import time
+
+import click
+
+from vm_clockify.main import COMMANDS
+
+CASES: list[list[str]] = [
+    ["--help"],
+    ["clockify", "--help"],
+    ["clockify", "times", "--help"],
+    ["clockify", "remaining-days", "--help"],
+    ["youtrack", "--help"],
+    ["landwehr", "--help"],
+]
+CODE = "import sys; sys.argv[0] = 'vm-clockify'; from vm_clockify.main import cli; cli()"
+# required options of the command groups, only to show the help of their commands
+ENV_DEFAULTS = {
+    "CLOCKIFY_API_KEY": "bench",
+    "YOUTRACK_API_KEY": "bench",
+    "YOUTRACK_API_ENDPOINT": "https://youtrack.example.com",
+}
+
+
+def _check_manifest() -> None:
+    commands_dir = Path(__file__).parent.parent / "vm_clockify" / "commands"
+    modules = sorted(path.stem for path in commands_dir.glob("*.py") if not path.name.startswith("__"))
+    if sorted(COMMANDS) != modules:
+        msg = f"manifest {sorted(COMMANDS)} differs from the command modules {modules}"
+        raise AssertionError(msg)
+    for name, (module_name, short_help) in COMMANDS.items():
+        group = import_module(module_name).cli
+        if not isinstance(group, click.Group) or group.get_short_help_str() != short_help:
+            msg = f'manifest help "{short_help}" of "{name}" differs from the command'
+            raise AssertionError(msg)
+    print(f"manifest        : {len(COMMANDS)} commands match the command modules")
+
+
+def _run(args: list[str], env: dict[str, str], importtime: bool = False) -> tuple[float, str]:
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", CODE, *args]
+    started = time.perf_counter()
+    res = subprocess.run(command, env=env, capture_output=True, text=True, check=False)  # noqa: S603
+    elapsed = time.perf_counter() - started
+    if res.returncode != 0:
+        msg = f"'{' '.join(args)}' failed with code {res.returncode}: {res.stderr[-500:]}"
+        raise AssertionError(msg)
+    return elapsed, res.stderr
+
+
+def _heaviest_imports(importtime: str, count: int = 4) -> tuple[float, list[tuple[str, float]]]:
+    """Return the total import time and the heaviest packages imported directly by vm_clockify modules."""
+    total = 0
+    imports: dict[str, int] = {}
+    # the output is in post order, the children of a module are listed before it with a deeper indent
+    pending: list[tuple[int, str, int]] = []
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        children = [item for item in pending if item[0] == depth + 1]
+        pending = [item for item in pending if item[0] <= depth]
+        if name.startswith("vm_clockify"):
+            for _, child_name, child_cumulative in children:
+                if not child_name.startswith("vm_clockify"):
+                    package = child_name.split(".")[0]
+                    imports[package] = imports.get(package, 0) + child_cumulative
+        pending.append((depth, name, int(cumulative)))
+        if depth == 0:
+            total += int(cumulative)
+    heaviest = sorted(imports.items(), key=lambda item: item[1], reverse=True)[:count]
+    return total / 1000, [(package, value / 1000) for package, value in heaviest]
+
+
+def main() -> None:
+    """Run the manifest check and the benchmark."""
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    _check_manifest()
+
+    env = {**ENV_DEFAULTS, **os.environ}
+    for args in CASES:
+        wall = statistics.median(_run(args, env)[0] for _ in range(runs)) * 1000
+        total, heaviest = _heaviest_imports(_run(args, env, importtime=True)[1])
+        packages = ", ".join(f"{package} {value:.1f}ms" for package, value in heaviest)
+        print(f"{' '.join(args):32}: {wall:7.1f}ms wall, {total:7.1f}ms imports ({packages})")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,20 @@
 
 from datetime import datetime
 import logging
+from pathlib import Path
 import sys
+from typing import TYPE_CHECKING
 
 import click
 
-from vm_clockify.service.api_clockify_service import ApiClockifyService
+from vm_clockify.service.clockify_group_by import GROUP_BY_DIMENSIONS, parse_group_by
+from vm_clockify.service.clockify_renderer import OUTPUT_FORMATS
 from vm_clockify.utils.config import settings
 from vm_clockify.utils.utils_helper import Context, pass_context, uri_validator
 
+if TYPE_CHECKING:
+    from vm_clockify.service.api_clockify_service import ApiClockifyService
+
 
 # ------------------------------------------------------------------------------
 #
@@ -33,18 +39,34 @@ from vm_clockify.utils.utils_helper import Context, pass_context, uri_validator
     default=settings.CLOCKIFY_API_ENDPOINT,
     required=True,
 )
+@click.option(
+    "-lh",
+    "--local-hydration",
+    help="request time entries not hydrated and resolve projects, tasks and tags by a local cached index "
+    f"[{str(settings.CLOCKIFY_LOCAL_HYDRATION).lower()}]",
+    is_flag=True,
+    default=settings.CLOCKIFY_LOCAL_HYDRATION,
+)
 @pass_context
-def cli(ctx: Context, key: str, endpoint: str) -> None:
+def cli(ctx: Context, key: str, endpoint: str, local_hydration: bool) -> None:
     """Clockify api usage command."""
     if uri_validator(endpoint):
         settings.CLOCKIFY_API_KEY = key
         settings.CLOCKIFY_API_ENDPOINT = endpoint
-        ctx.service = ApiClockifyService()
+        settings.CLOCKIFY_LOCAL_HYDRATION = local_hydration
+        ctx.lazy_service(_create_service)
     else:
-        logging.log(logging.WARNING, f'endpoint "{endpoint}" is not a valid url format')
+        logging.log(logging.WARNING, 'endpoint "%s" is not a valid url format', endpoint)
         sys.exit(2)
 
 
+def _create_service() -> "ApiClockifyService":
+    # the service (with httpx and the store) is imported and created first, when a command uses it
+    from vm_clockify.service.api_clockify_service import ApiClockifyService  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
+
+    return ApiClockifyService()
+
+
 # ------------------------------------------------------------------------------
 #
 #
@@ -58,7 +80,7 @@ def user(ctx: Context) -> None:
         service: ApiClockifyService = ctx.service
         service.user()
     except KeyboardInterrupt as k:
-        logging.log(logging.DEBUG, f"process interrupted! ({k})")
+        logging.log(logging.DEBUG, "process interrupted! (%s)", k)
         sys.exit(5)
     except Exception as e:
         logging.log(logging.CRITICAL, e, exc_info=True)
@@ -83,24 +105,23 @@ def user(ctx: Context) -> None:
     "-u",
     "--user-id",
     type=str,
-    help=f"user to use [{settings.CLOCKIFY_API_USER_ID}]",
+    help=f"user to use, not needed in batch mode [{settings.CLOCKIFY_API_USER_ID}]",
     default=settings.CLOCKIFY_API_USER_ID,
-    required=True,
 )
 @click.option(
     "-y",
     "--year",
     type=int,
-    help=f"from until now or specific day, how much days to collect backwards [{datetime.now(tz=settings.TIME_ZONE).year}]",
-    default=datetime.now(tz=settings.TIME_ZONE).year,
+    help="year of the month to calculate [current year]",
+    default=lambda: datetime.now(tz=settings.TIME_ZONE).year,
     required=True,
 )
 @click.option(
     "-m",
     "--month",
     type=int,
-    help=f"from until now or specific day, how much days to collect backwards [{datetime.now(tz=settings.TIME_ZONE).month}]",
-    default=datetime.now(tz=settings.TIME_ZONE).month,
+    help="month to calculate [current month]",
+    default=lambda: datetime.now(tz=settings.TIME_ZONE).month,
     required=True,
 )
 @click.option(
@@ -119,34 +140,192 @@ def user(ctx: Context) -> None:
     default=0,
     required=True,
 )
+@click.option(
+    "-r",
+    "--refresh",
+    help="request the complete time range again from clockify, instead of using the local store [false]",
+    is_flag=True,
+)
+@click.option(
+    "-bu",
+    "--batch-user",
+    type=str,
+    multiple=True,
+    help="run for multiple users, as 'WORKSPACE_ID:USER_ID' or only 'USER_ID' to use the workspace option [None]",
+    default=None,
+)
+@click.option(
+    "-bf",
+    "--batch-file",
+    type=click.Path(exists=True, dir_okay=False),
+    help="file with one user per line, same format as --batch-user, lines with '#' are ignored [None]",
+    default=None,
+)
+@click.option(
+    "-cc",
+    "--country",
+    type=str,
+    help=f"holiday country of the work calendar [{settings.WORK_CALENDAR_COUNTRY}]",
+    default=settings.WORK_CALENDAR_COUNTRY,
+)
+@click.option(
+    "-cs",
+    "--subdiv",
+    type=str,
+    help=f"holiday subdivision of the work calendar, empty for none [{settings.WORK_CALENDAR_SUBDIV}]",
+    default=settings.WORK_CALENDAR_SUBDIV,
+)
+@click.option(
+    "-wh",
+    "--weekly-hours",
+    type=str,
+    help=f"expected hours from monday until sunday, like '8,8,8,8,6,0,0' [{settings.WORK_TIME_WEEKLY_HOURS}]",
+    default=settings.WORK_TIME_WEEKLY_HOURS,
+)
 @pass_context
 def remaining_days(
     ctx: Context,
     workspace_id: str,
-    user_id: str,
+    user_id: str | None,
     year: int,
     month: int,
     taken_free_days: int = 0,
     illness_days: int = 0,
+    refresh: bool = False,
+    batch_user: tuple[str, ...] = (),
+    batch_file: str | None = None,
+    country: str = settings.WORK_CALENDAR_COUNTRY,
+    subdiv: str | None = settings.WORK_CALENDAR_SUBDIV,
+    weekly_hours: str | None = settings.WORK_TIME_WEEKLY_HOURS,
 ) -> None:
     """Clockify pi will print you remaining work-time for a specific month in a year.
 
     HINT: run first user-api to get workspace ID and user ID
     """
+    users = _parse_batch_users(workspace_id, batch_user, batch_file)
+    if not users and user_id is None:
+        msg = "Missing option '-u' / '--user-id' or '--batch-user' / '--batch-file'."
+        raise click.UsageError(msg)
+
+    # default work calendar, users in "WORK_CALENDAR_USERS_FILE" can still have their own
+    settings.WORK_CALENDAR_COUNTRY = country
+    settings.WORK_CALENDAR_SUBDIV = subdiv
+    settings.WORK_TIME_WEEKLY_HOURS = weekly_hours
+
+    try:
+        service: ApiClockifyService = ctx.service
+        if users:
+            service.remaining_monthly_work_time_batch(
+                users=users,
+                year=year,
+                month=month,
+                taken_free_days=taken_free_days,
+                illness_days=illness_days,
+                refresh=refresh,
+            )
+        elif user_id is not None:
+            settings.CLOCKIFY_API_WORKSPACE_ID = workspace_id
+            settings.CLOCKIFY_API_USER_ID = user_id
+            service.remaining_monthly_work_time(
+                workspace_id=workspace_id,
+                user_id=user_id,
+                year=year,
+                month=month,
+                taken_free_days=taken_free_days,
+                illness_days=illness_days,
+                refresh=refresh,
+            )
+    except KeyboardInterrupt as k:
+        logging.log(logging.DEBUG, "process interrupted! (%s)", k)
+        sys.exit(5)
+    except Exception as e:
+        logging.log(logging.CRITICAL, e, exc_info=True)
+        sys.exit(2)
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+@cli.command()
+@click.option(
+    "-w",
+    "--workspace-id",
+    type=str,
+    help=f"workspace to use [{settings.CLOCKIFY_API_WORKSPACE_ID}]",
+    default=settings.CLOCKIFY_API_WORKSPACE_ID,
+    required=True,
+)
+@click.option(
+    "-u",
+    "--user-id",
+    type=str,
+    help=f"user to use [{settings.CLOCKIFY_API_USER_ID}]",
+    default=settings.CLOCKIFY_API_USER_ID,
+    required=True,
+)
+@click.option(
+    "-fm",
+    "--from-month",
+    type=click.DateTime(formats=["%Y-%m"]),
+    help="first month of the balance (format: YYYY-MM) [january of the current year]",
+    default=lambda: f"{datetime.now(tz=settings.TIME_ZONE).year}-01",
+    required=True,
+)
+@click.option(
+    "-tm",
+    "--to-month",
+    type=click.DateTime(formats=["%Y-%m"]),
+    help="last month of the balance (format: YYYY-MM) [current month]",
+    default=lambda: datetime.now(tz=settings.TIME_ZONE).strftime("%Y-%m"),
+    required=True,
+)
+@click.option(
+    "-df",
+    "--days-file",
+    type=click.Path(exists=True, dir_okay=False),
+    help='json file with free and illness days per month, like {"2024-01": {"free_days": 2, "illness_days": 1}} [None]',
+    default=None,
+)
+@click.option(
+    "-r",
+    "--refresh",
+    help="request the complete time range again from clockify, instead of using the local store [false]",
+    is_flag=True,
+)
+@pass_context
+def balance(
+    ctx: Context,
+    workspace_id: str,
+    user_id: str,
+    from_month: datetime,
+    to_month: datetime,
+    days_file: str | None = None,
+    refresh: bool = False,
+) -> None:
+    """Clockify api will print you the work-time balance per month over a month range.
+
+    HINT: run first user-api to get workspace ID and user ID
+    """
+    if from_month > to_month:
+        msg = "Option '-fm' / '--from-month' needs to be before '-tm' / '--to-month'."
+        raise click.UsageError(msg)
+
     try:
+        service: ApiClockifyService = ctx.service
         settings.CLOCKIFY_API_WORKSPACE_ID = workspace_id
         settings.CLOCKIFY_API_USER_ID = user_id
-        service: ApiClockifyService = ctx.service
-        service.remaining_monthly_work_time(
+        service.balance(
             workspace_id=workspace_id,
             user_id=user_id,
-            year=year,
-            month=month,
-            taken_free_days=taken_free_days,
-            illness_days=illness_days,
+            first_month=from_month.date(),
+            last_month=to_month.date(),
+            days_file=days_file,
+            refresh=refresh,
         )
     except KeyboardInterrupt as k:
-        logging.log(logging.DEBUG, f"process interrupted! ({k})")
+        logging.log(logging.DEBUG, "process interrupted! (%s)", k)
         sys.exit(5)
     except Exception as e:
         logging.log(logging.CRITICAL, e, exc_info=True)
@@ -171,9 +350,8 @@ def remaining_days(
     "-u",
     "--user-id",
     type=str,
-    help=f"user to use [{settings.CLOCKIFY_API_USER_ID}]",
+    help=f"user to use, not needed in batch mode [{settings.CLOCKIFY_API_USER_ID}]",
     default=settings.CLOCKIFY_API_USER_ID,
-    required=True,
 )
 @click.option(
     "-d",
@@ -187,7 +365,7 @@ def remaining_days(
     "-p",
     "--page-size",
     type=int,
-    help="how much records should loaded (max 5000) [50]",
+    help="how much records should loaded per request, all pages are collected (max 5000) [50]",
     default=50,
     required=True,
 )
@@ -243,11 +421,61 @@ def remaining_days(
     help="list time counters in the terminal output [true]",
     is_flag=True,
 )
+@click.option(
+    "-r",
+    "--refresh",
+    help="request the complete time range again from clockify, instead of using the local store [false]",
+    is_flag=True,
+)
+@click.option(
+    "-bu",
+    "--batch-user",
+    type=str,
+    multiple=True,
+    help="run for multiple users, as 'WORKSPACE_ID:USER_ID' or only 'USER_ID' to use the workspace option [None]",
+    default=None,
+)
+@click.option(
+    "-bf",
+    "--batch-file",
+    type=click.Path(exists=True, dir_okay=False),
+    help="file with one user per line, same format as --batch-user, lines with '#' are ignored [None]",
+    default=None,
+)
+@click.option(
+    "-en",
+    "--engine",
+    type=click.Choice(["python", "numpy"]),
+    help=f"engine to aggregate the entries, numpy is faster on long ranges, needs numpy installed [{settings.CLOCKIFY_ENGINE}]",
+    default=settings.CLOCKIFY_ENGINE,
+)
+@click.option(
+    "-gb",
+    "--group-by",
+    type=str,
+    help=f"print nested totals by comma separated dimensions, like 'week,project' ({', '.join(GROUP_BY_DIMENSIONS)}) [None]",
+    default=None,
+)
+@click.option(
+    "-fo",
+    "--format",
+    "output_format",
+    type=click.Choice(OUTPUT_FORMATS),
+    help=f"output format of the result, csv and json for scripts [{settings.CLOCKIFY_OUTPUT_FORMAT}]",
+    default=settings.CLOCKIFY_OUTPUT_FORMAT,
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, writable=True),
+    help="file to write the result into, '-' for stdout [-]",
+    default=None,
+)
 @pass_context
-def times(
+def times(  # noqa: PLR0913, PLR0917 # pylint: disable=too-many-positional-arguments
     ctx: Context,
     workspace_id: str,
-    user_id: str,
+    user_id: str | None,
     days_to_subtract: int,
     page_size: int,
     specific_day: str,
@@ -258,32 +486,94 @@ def times(
     buffer: bool,
     time_details: bool,
     time_count: bool,
+    refresh: bool,
+    batch_user: tuple[str, ...],
+    batch_file: str | None,
+    engine: str,
+    group_by: str | None,
+    output_format: str,
+    output: str | None,
 ) -> None:
     """Clockify api will print you work-time.
 
     HINT: run first user-api to get workspace ID and user ID
     """
+    users = _parse_batch_users(workspace_id, batch_user, batch_file)
+    if not users and user_id is None:
+        msg = "Missing option '-u' / '--user-id' or '--batch-user' / '--batch-file'."
+        raise click.UsageError(msg)
+    try:
+        group_by_dimensions = parse_group_by(group_by)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'-gb' / '--group-by'") from e
+
     try:
-        settings.CLOCKIFY_API_WORKSPACE_ID = workspace_id
-        settings.CLOCKIFY_API_USER_ID = user_id
         service: ApiClockifyService = ctx.service
-        service.times(
-            workspace_id=workspace_id,
-            user_id=user_id,
-            days_to_subtract=days_to_subtract,
-            page_size=page_size,
-            specific_day=specific_day,
-            filter_project_name=project_search,
-            filter_task_name=task_search,
-            filter_issue_id=issue_search,
-            combine=combine,
-            buffer=buffer,
-            time_details=time_details,
-            time_count=not time_count,
-        )
+        if users:
+            service.times_batch(
+                users=users,
+                days_to_subtract=days_to_subtract,
+                page_size=page_size,
+                specific_day=specific_day,
+                filter_project_name=project_search,
+                filter_task_name=task_search,
+                filter_issue_id=issue_search,
+                combine=combine,
+                buffer=buffer,
+                time_details=time_details,
+                time_count=not time_count,
+                refresh=refresh,
+                engine=engine,
+                group_by=group_by_dimensions,
+                output_format=output_format,
+                output=output,
+            )
+        elif user_id is not None:
+            settings.CLOCKIFY_API_WORKSPACE_ID = workspace_id
+            settings.CLOCKIFY_API_USER_ID = user_id
+            service.times(
+                workspace_id=workspace_id,
+                user_id=user_id,
+                days_to_subtract=days_to_subtract,
+                page_size=page_size,
+                specific_day=specific_day,
+                filter_project_name=project_search,
+                filter_task_name=task_search,
+                filter_issue_id=issue_search,
+                combine=combine,
+                buffer=buffer,
+                time_details=time_details,
+                time_count=not time_count,
+                refresh=refresh,
+                engine=engine,
+                group_by=group_by_dimensions,
+                output_format=output_format,
+                output=output,
+            )
     except KeyboardInterrupt as k:
-        logging.log(logging.DEBUG, f"process interrupted! ({k})")
+        logging.log(logging.DEBUG, "process interrupted! (%s)", k)
         sys.exit(5)
     except Exception as e:
         logging.log(logging.CRITICAL, e, exc_info=True)
         sys.exit(2)
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+def _parse_batch_users(workspace_id: str, batch_user: tuple[str, ...], batch_file: str | None) -> list[tuple[str, str]]:
+    """Parse the (workspace, user) pairs for batch mode, duplicates are removed."""
+    values = list(batch_user)
+    if batch_file is not None:
+        with Path(batch_file).open(encoding="utf-8") as f:
+            values.extend(line for line in (line.strip() for line in f) if line and not line.startswith("#"))
+
+    users: list[tuple[str, str]] = []
+    for value in values:
+        user_workspace_id, _, user_id = value.strip().rpartition(":")
+        batch_pair = (user_workspace_id.strip() or workspace_id, user_id.strip())
+        if batch_pair not in users:
+            users.append(batch_pair)
+    return users
@@ -2,12 +2,15 @@
 
 import logging
 import sys
+from typing import TYPE_CHECKING
 
 import click
 
-from vm_clockify.service.api_landwehr_service import ApiLandwehrService
 from vm_clockify.utils.utils_helper import Context, pass_context
 
+if TYPE_CHECKING:
+    from vm_clockify.service.api_landwehr_service import ApiLandwehrService
+
 
 # ------------------------------------------------------------------------------
 #
@@ -17,8 +20,15 @@ from vm_clockify.utils.utils_helper import Context, pass_context
 @click.group()
 @pass_context
 def cli(ctx: Context) -> None:
-    """Youtrack-api usage command."""
-    ctx.service = ApiLandwehrService()
+    """Landwehr usage command."""
+    ctx.lazy_service(_create_service)
+
+
+def _create_service() -> "ApiLandwehrService":
+    # the service (with bs4 and httpx) is imported and created first, when a command uses it
+    from vm_clockify.service.api_landwehr_service import ApiLandwehrService  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
+
+    return ApiLandwehrService()
 
 
 # ------------------------------------------------------------------------------
@@ -38,7 +48,7 @@ def upload(ctx: Context, year: int, month: int, day: int, auftrag: str) -> None:
         service: ApiLandwehrService = ctx.service
         service.upload(year=year, month=month, day=day, auftrag=auftrag)
     except KeyboardInterrupt as k:
-        logging.log(logging.DEBUG, f"process interrupted! ({k})")
+        logging.log(logging.DEBUG, "process interrupted! (%s)", k)
         sys.exit(5)
     except Exception as e:
         logging.log(logging.CRITICAL, e, exc_info=True)
@@ -1,17 +1,19 @@
 """YOUTRACK."""
 
-import json
 import logging
 from pathlib import Path
 import sys
+from typing import TYPE_CHECKING
 
 import click
 
-from vm_clockify.service.api_clockify_service import IssueTime
-from vm_clockify.service.api_youtrack_service import ApiYoutrackService
+from vm_clockify.service.clockify_handoff import iter_handoff
 from vm_clockify.utils.config import settings
 from vm_clockify.utils.utils_helper import Context, create_service_folder, pass_context, uri_validator
 
+if TYPE_CHECKING:
+    from vm_clockify.service.api_youtrack_service import ApiYoutrackService
+
 
 # ------------------------------------------------------------------------------
 #
@@ -41,40 +43,54 @@ def cli(ctx: Context, key: str, endpoint: str) -> None:
     if uri_validator(endpoint):
         settings.YOUTRACK_API_KEY = key
         settings.YOUTRACK_API_ENDPOINT = endpoint
-        ctx.service = ApiYoutrackService()
+        ctx.lazy_service(_create_service)
     else:
-        logging.log(logging.WARNING, f'endpoint "{endpoint}" is not a valid url format')
+        logging.log(logging.WARNING, 'endpoint "%s" is not a valid url format', endpoint)
         sys.exit(2)
 
 
+def _create_service() -> "ApiYoutrackService":
+    # the service (with httpx) is imported and created first, when a command uses it
+    from vm_clockify.service.api_youtrack_service import ApiYoutrackService  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
+
+    return ApiYoutrackService()
+
+
 # ------------------------------------------------------------------------------
 #
 #
 #
 # ------------------------------------------------------------------------------
 @cli.command()
+@click.option(
+    "-c",
+    "--concurrency",
+    type=int,
+    help=f"how many work items are uploaded at the same time [{settings.YOUTRACK_UPLOAD_CONCURRENCY}]",
+    default=settings.YOUTRACK_UPLOAD_CONCURRENCY,
+)
 @pass_context
-def upload(ctx: Context) -> None:
+def upload(ctx: Context, concurrency: int) -> None:
     """Will insert times collected from clockify into youtrack.
 
     HINT: run clockify times api first, else there are no records to be uploaded.
     """
+    from vm_clockify.service.api_youtrack_service import UPLOAD_FAILED  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
+
     try:
         service: ApiYoutrackService = ctx.service
-        issues: dict[str, IssueTime] = {}
-        # Read data from a JSON file
+        # the handoff is read lazy, the upload starts with the first chunk of records
         tmp_file_path = Path(f"{create_service_folder()}/{settings.CLOCKIFY_TMP_FILE}")
-        with tmp_file_path.open(encoding="utf-8") as f:
-            serialized_issues = json.load(f)
-            issues = {key: IssueTime(**value) if isinstance(value, dict) else value for key, value in serialized_issues.items()}
-
-        service.upload(issues=issues)
+        outcomes = service.upload(issues=iter_handoff(tmp_file_path), concurrency=concurrency)
 
-        if tmp_file_path.exists():
+        # keep the times for a next try, if items failed (uploaded items are detected then)
+        if outcomes is None or any(outcome.status == UPLOAD_FAILED for outcome in outcomes):
+            logging.log(logging.WARNING, 'not all items are uploaded, "%s" is kept to try it again', tmp_file_path)
+        elif tmp_file_path.exists():
             tmp_file_path.unlink()  # This removes the file
 
     except KeyboardInterrupt as k:
-        logging.log(logging.DEBUG, f"process interrupted! ({k})")
+        logging.log(logging.DEBUG, "process interrupted! (%s)", k)
         sys.exit(5)
     except Exception as e:
         logging.log(logging.CRITICAL, e, exc_info=True)
@@ -1,12 +1,20 @@
 """MAIN."""
 
+from importlib import import_module
 import logging
-from pathlib import Path
+import sys
 
 import click
 
 from .utils.config import settings
-from .utils.log_helper import LogHelper
+
+# sub-commands with their module and short help, so "--help" and the dispatch need no scan of the
+# commands folder and only the called command module is imported (keep in sync with the modules)
+COMMANDS: dict[str, tuple[str, str]] = {
+    "clockify": ("vm_clockify.commands.clockify", "Clockify api usage command."),
+    "landwehr": ("vm_clockify.commands.landwehr", "Landwehr usage command."),
+    "youtrack": ("vm_clockify.commands.youtrack", "Youtrack-api usage command."),
+}
 
 # ------------------------------------------------------------------------------
 #
@@ -39,28 +47,39 @@ print()  # noqa: T201
 class ComplexCLI(click.MultiCommand):
     """ComplexCLI."""
 
+    _commands: dict[str, click.core.Group] = {}
+
     def list_commands(self, _: click.Context) -> list[str]:
         """ComplexCLI."""
-        commands_dir = Path(__file__).parent / "commands"
-        return sorted(
-            [
-                filename.stem
-                for filename in commands_dir.iterdir()
-                if filename.suffix == ".py" and not filename.name.startswith("__")
-            ],
-        )
+        return sorted(COMMANDS)
 
     def get_command(self, _: click.Context, cmd_name: str) -> click.core.Group | None:
         """ComplexCLI."""
+        command = self._commands.get(cmd_name)
+        if command is not None or cmd_name not in COMMANDS:
+            return command
         try:
-            mod = __import__(f"vm_clockify.commands.{cmd_name}", None, None, ["cli"])
+            mod = import_module(COMMANDS[cmd_name][0])
             if isinstance(mod.cli, click.core.Group):
+                self._commands[cmd_name] = mod.cli
                 return mod.cli
 
         except ImportError as e:
             logging.log(logging.CRITICAL, e)
         return None
 
+    def format_commands(self, _: click.Context, formatter: click.HelpFormatter) -> None:
+        """List the commands with the short help of the manifest, without importing them."""
+        with formatter.section("Commands"):
+            formatter.write_dl([(name, COMMANDS[name][1]) for name in sorted(COMMANDS)])
+
+
+def _close_http_clients() -> None:
+    """Close the shared http clients, only if a command has used them (httpx is not imported else)."""
+    http_helper = sys.modules.get("vm_clockify.utils.http_helper")
+    if http_helper is not None:
+        http_helper.http_clients.close()
+
 
 # ------------------------------------------------------------------------------
 #
@@ -145,7 +164,12 @@ def cli(
     settings.PROJECT_NAME = project
     settings.DISABLE_SPLIT_PROJECT = disable_split_project
     settings.DISABLE_SPLIT_HOST = disable_split_host
+    # logging is imported first here, "--help" does not need it
+    from .utils.log_helper import LogHelper  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
+
     # INIT: log helper global
     LogHelper()
+    # CLOSE: shared http clients, after the sub-command is finished
+    click.get_current_context().call_on_close(_close_http_clients)
     logging.log(logging.DEBUG, "init start_up...")
     settings.print()
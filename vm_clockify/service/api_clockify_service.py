@@ -1,24 +1,37 @@
 """CLOCKIFY."""
 
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
+from itertools import batched
 import json
 import logging
 from pathlib import Path
-import re
-from re import Match
 import sys
-from typing import TYPE_CHECKING, Any
-from urllib.parse import parse_qs
-
-import holidays
-import httpx
-import verboselogs
-
+from typing import Any
+
+from vm_clockify.service.clockify_columnar import ColumnarIssueAggregator, DecodedWork, numpy_available
+from vm_clockify.service.clockify_group_by import GroupByAggregator
+from vm_clockify.service.clockify_handoff import write_handoff
+from vm_clockify.service.clockify_issue_cache import IssueInfoCache
+from vm_clockify.service.clockify_issue_time import KEY_BUFFER, KEY_ISSUE, KEY_SUM, IssueKey, IssueTime
+from vm_clockify.service.clockify_records import ClockifyRecordsFetcher
+from vm_clockify.service.clockify_renderer import ResultRenderer, open_output
+from vm_clockify.service.clockify_rollup import DayRollups, rollup_context
+from vm_clockify.service.work_calendar import WorkCalendar, month_range, user_work_calendar
 from vm_clockify.utils.config import settings
+from vm_clockify.utils.day_bucket_helper import DayBucketer
+from vm_clockify.utils.diagnostics_helper import Diagnostics
+from vm_clockify.utils.duration_helper import entry_duration, parse_durations
+from vm_clockify.utils.http_helper import http_clients
 from vm_clockify.utils.utils_helper import create_service_folder
 
-if TYPE_CHECKING:
-    from httpx._types import HeaderTypes, QueryParamTypes
+# warnings per time entry, they are counted and logged once as summary
+WARN_NO_WORK_TIME = "no work time was set, check if this was correct or you forget to set your worktime"
+WARN_MULTIPLE_IDS = "issue has multiple ids, check this"
+WARN_NO_ISSUE = "failed to get or parse base issue information, issue has not any id in task or project set"
+# entries are decoded in pages of this size, like the durations of all entries of a page are parsed at once
+DECODE_PAGE_SIZE: int = 1000
 
 
 # ------------------------------------------------------------------------------
@@ -26,39 +39,6 @@ if TYPE_CHECKING:
 #
 #
 # ------------------------------------------------------------------------------
-class IssueTime:
-    """Issue Time."""
-
-    def __init__(
-        self,
-        project: str | None = None,
-        task: str | None = None,
-        issue_date: str | None = None,
-        duration: dict[str, int] | None = None,
-        issue: list[str] | None = None,
-        description: list[str] | None = None,
-        issue_type: str | None = None,
-    ) -> None:
-        """Init."""
-        if duration is None:
-            duration = {}
-        if issue is None:
-            issue = []
-        if description is None:
-            description = []
-        self.project = project
-        self.task = task
-        self.issue_date = issue_date
-        self.duration = duration
-        self.issue = issue
-        self.description = description
-        self.issue_type = issue_type
-
-    def to_dict(self) -> dict[str, Any]:
-        """Convert the dataclass to a dictionary."""
-        return dict(self.__dict__.items())
-
-
 class PrintValues:
     """Print Values."""
 
@@ -88,14 +68,10 @@ class PrintValues:
 class ApiClockifyService:
     """Clockify Service."""
 
-    prefix_sum: str = "-> sum:"
-    prefix_duration: str = "PT"
-    format_date_from: str = "%Y-%m-%dT%H:%M:%SZ"
     format_date_day: str = "%Y-%m-%d"
     format_date_date_start: str = "%Y-%m-%dT00:00:00.000Z"
     format_date_date_end: str = "%Y-%m-%dT23:59:59.000Z"
     # regex_issue = r".*?\[(.*?)\].*?"
-    regex_duration: str = r"PT(?:([0-9]{1,2})H){0,1}(?:([0-9]{1,2})M){0,1}"
 
     # --------------------------------------------------------------------------
     #
@@ -105,6 +81,9 @@ class ApiClockifyService:
     def __init__(self) -> None:
         """Clockify Service."""
         logging.log(logging.DEBUG, "clockify-api-service is initiated")
+        self.issue_cache = IssueInfoCache()
+        self.diagnostics = Diagnostics(settings.CLOCKIFY_DIAGNOSTICS_SAMPLES)
+        self.records = ClockifyRecordsFetcher(self.diagnostics)
 
     # --------------------------------------------------------------------------
     #
@@ -123,12 +102,11 @@ class ApiClockifyService:
                 "content-type": "application/json",
                 "X-Api-Key": settings.CLOCKIFY_API_KEY,
             }
-            with httpx.Client() as session:
-                res = session.get(f"{settings.CLOCKIFY_API_ENDPOINT}/user", headers=headers)
-                parsed = json.loads(res.text)
-                logging.log(logging.INFO, f"USER ID             : {parsed['id']}")
-                logging.log(logging.INFO, f"ACTIVE WORKSPACE    : {parsed['activeWorkspace']}")
-                logging.log(logging.INFO, f"DEFAULT WORKSPACE   : {parsed['defaultWorkspace']}")
+            res = http_clients.client().get(f"{settings.CLOCKIFY_API_ENDPOINT}/user", headers=headers)
+            parsed = json.loads(res.text)
+            logging.log(logging.INFO, "USER ID             : %s", parsed["id"])
+            logging.log(logging.INFO, "ACTIVE WORKSPACE    : %s", parsed["activeWorkspace"])
+            logging.log(logging.INFO, "DEFAULT WORKSPACE   : %s", parsed["defaultWorkspace"])
         # logging.log(logging.DEBUG, json.dumps(parsed, indent=4, sort_keys=False))
         except Exception as e:
             logging.log(logging.CRITICAL, e, exc_info=True)
@@ -147,76 +125,214 @@ class ApiClockifyService:
         month: int,
         taken_free_days: int = 0,
         illness_days: int = 0,
+        refresh: bool = False,
     ) -> None:
         """Clockify remaining month work time calc."""
         if not settings.CLOCKIFY_API_KEY:
             logging.log(logging.ERROR, "failed because CLOCKIFY_API_KEY is not set")
             return
 
-        page_size: int = 5000
-        first_day = date(year, month, 1).strftime(self.format_date_date_start)
-        last_day = (date(year, month + 1, 1) - timedelta(days=1)).strftime(self.format_date_date_end)
-        total_worked_time_hours: float = 0
-
-        parsed = self.request_records_from_clockify(workspace_id, user_id, first_day, last_day, page_size)
-
-        if parsed is None:
-            logging.log(logging.ERROR, "failed because records not parsed, see error before")
-            return
-
-        for work in parsed:
-            if not isinstance(work, dict):
-                continue
-            time_duration: str | None = (
-                work.get("timeInterval", {}).get("duration", None) if work.get("timeInterval") is not None else None
-            )
-
-            if time_duration and time_duration.startswith(self.prefix_duration):
-                time_duration_tmp = re.match(self.regex_duration, time_duration)
-                if time_duration_tmp is not None:
-                    c_hours = int(time_duration_tmp.group(1)) if time_duration_tmp.group(1) else 0
-                    c_minutes = int(time_duration_tmp.group(2)) if time_duration_tmp.group(2) else 0
-                    total_worked_time_hours = total_worked_time_hours + (c_hours) + c_minutes / 60
+        month_first_day, month_last_day = month_range(year, month)
+        first_day = month_first_day.strftime(self.format_date_date_start)
+        last_day = month_last_day.strftime(self.format_date_date_end)
+        total_worked_time_hours = self._collect_worked_hours(workspace_id, user_id, first_day, last_day, refresh)
 
+        work_calendar = user_work_calendar(user_id)
         remaining_hours = self._calculate_remaining_hours(
-            year,
-            month,
+            work_calendar,
+            month_first_day,
+            month_last_day,
             total_worked_time_hours,
             free_days=taken_free_days,
             illness_days=illness_days,
         )
-        logging.log(logging.INFO, f"Requested time-range : {first_day} - {last_day}")
-        logging.log(logging.INFO, f"Worked hours         : {total_worked_time_hours}")
-        logging.log(logging.INFO, f"Remaining hours      : {remaining_hours}")
-        logging.log(logging.INFO, f"Remaining days       : {remaining_hours / 8}")
+        logging.log(logging.INFO, "Requested time-range : %s - %s", first_day, last_day)
+        self._log_remaining(work_calendar, month_first_day, month_last_day, total_worked_time_hours, remaining_hours)
 
-    def _calculate_remaining_hours(
+    def remaining_monthly_work_time_batch(
         self,
+        users: list[tuple[str, str]],
         year: int,
         month: int,
-        time_still_worked: float,
-        work_time_hours: int = 8,
-        free_days: int = 0,
+        taken_free_days: int = 0,
         illness_days: int = 0,
-    ) -> float:
-        total_work_days = self._get_total_work_days(year, month)
-        total_work_hours = total_work_days * work_time_hours  # Assuming 8 hours worked per day
-        holiday_list = self._get_holidays(year)
-        holiday_hours = sum(8 for date in holiday_list if date.month == month)
+        refresh: bool = False,
+    ) -> dict[tuple[str, str], float] | None:
+        """Clockify remaining month work time calc for multiple (workspace, user) pairs at once.
 
-        total_work_hours -= holiday_hours
-        total_work_hours -= free_days * 8  # Assuming 8 hours per taken free day
-        total_work_hours -= illness_days * 8  # Assuming 8 hours per illness day
-        return time_still_worked - total_work_hours  # Assuming 160 hours in a month
+        The records of the users are requested concurrently, limited by "CLOCKIFY_BATCH_WORKERS".
+        """
+        if not settings.CLOCKIFY_API_KEY:
+            logging.log(logging.ERROR, "failed because CLOCKIFY_API_KEY is not set")
+            return None
+
+        month_first_day, month_last_day = month_range(year, month)
+        first_day = month_first_day.strftime(self.format_date_date_start)
+        last_day = month_last_day.strftime(self.format_date_date_end)
+        with ThreadPoolExecutor(max_workers=settings.CLOCKIFY_BATCH_WORKERS) as executor:
+            worked_hours = executor.map(
+                lambda user: self._collect_worked_hours(user[0], user[1], first_day, last_day, refresh),
+                users,
+            )
+            results: dict[tuple[str, str], float] = {}
+            logging.log(logging.INFO, "Requested time-range : %s - %s", first_day, last_day)
+            for (workspace_id, user_id), total_worked_time_hours in zip(users, worked_hours, strict=True):
+                work_calendar = user_work_calendar(user_id)
+                remaining_hours = self._calculate_remaining_hours(
+                    work_calendar,
+                    month_first_day,
+                    month_last_day,
+                    total_worked_time_hours,
+                    free_days=taken_free_days,
+                    illness_days=illness_days,
+                )
+                results[(workspace_id, user_id)] = remaining_hours
+                logging.log(logging.INFO, "~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~")
+                logging.log(logging.INFO, "  ==> USER: %s (WORKSPACE: %s)", user_id, workspace_id)
+                self._log_remaining(work_calendar, month_first_day, month_last_day, total_worked_time_hours, remaining_hours)
+        return results
+
+    def balance(
+        self,
+        workspace_id: str,
+        user_id: str,
+        first_month: date,
+        last_month: date,
+        days_file: str | None = None,
+        refresh: bool = False,
+    ) -> list[dict[str, Any]] | None:
+        """Clockify work time balance per month of a month range, with a running balance over all months.
+
+        The whole range is requested once, free and illness days per month ("YYYY-MM") can be given
+        as json file like: {"2024-01": {"free_days": 2, "illness_days": 1}}
+        """
+        if not settings.CLOCKIFY_API_KEY:
+            logging.log(logging.ERROR, "failed because CLOCKIFY_API_KEY is not set")
+            return None
+
+        range_first_day = month_range(first_month.year, first_month.month)[0]
+        range_last_day = month_range(last_month.year, last_month.month)[1]
+        first_day = range_first_day.strftime(self.format_date_date_start)
+        last_day = range_last_day.strftime(self.format_date_date_end)
+        worked_seconds = self._collect_worked_seconds_by_month(workspace_id, user_id, first_day, last_day, refresh)
+        month_days = self._load_month_days(days_file)
+        work_calendar = user_work_calendar(user_id)
+
+        results: list[dict[str, Any]] = []
+        balance_hours: float = 0
+        year, month = first_month.year, first_month.month
+        while (year, month) <= (last_month.year, last_month.month):
+            month_first_day, month_last_day = month_range(year, month)
+            month_key = month_first_day.strftime("%Y-%m")
+            free_days, illness_days = month_days.get(month_key, (0, 0))
+            worked_hours = worked_seconds.get(month_key, 0) / 3600
+            remaining_hours = self._calculate_remaining_hours(
+                work_calendar,
+                month_first_day,
+                month_last_day,
+                worked_hours,
+                free_days=free_days,
+                illness_days=illness_days,
+            )
+            balance_hours += remaining_hours
+            results.append(
+                {
+                    "month": month_key,
+                    "working_days": work_calendar.working_days(month_first_day, month_last_day),
+                    "free_days": free_days,
+                    "illness_days": illness_days,
+                    "expected_hours": worked_hours - remaining_hours,
+                    "worked_hours": worked_hours,
+                    "remaining_hours": remaining_hours,
+                    "balance_hours": balance_hours,
+                },
+            )
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+        logging.log(logging.INFO, "Requested time-range : %s - %s", first_day, last_day)
+        logging.log(logging.INFO, "Month   | Days | Free | Ill | Expected h |   Worked h | Remaining h |  Balance h")
+        for result in results:
+            logging.log(
+                logging.INFO,
+                "%s | %4s | %4s | %3s | %10.2f | %10.2f | %11.2f | %10.2f",
+                result["month"],
+                result["working_days"],
+                result["free_days"],
+                result["illness_days"],
+                result["expected_hours"],
+                result["worked_hours"],
+                result["remaining_hours"],
+                result["balance_hours"],
+            )
+        return results
+
+    def _load_month_days(self, days_file: str | None) -> dict[str, tuple[int, int]]:
+        """Free and illness days by month ("YYYY-MM") from the json days file."""
+        if days_file is None:
+            return {}
+        with Path(days_file).open(encoding="utf-8") as f:
+            values: dict[str, dict[str, int]] = json.load(f)
+        return {
+            month_key: (int(days.get("free_days", 0)), int(days.get("illness_days", 0))) for month_key, days in values.items()
+        }
 
-    def _get_total_work_days(self, year: int, month: int) -> int:
-        first_day = date(year, month, 1)
-        last_day = date(year, month + 1, 1) - timedelta(days=1)
-        total_days = (last_day - first_day).days + 1
-        return sum(1 for day in range(total_days) if (first_day + timedelta(days=day)).weekday() < 5)
+    def _log_remaining(
+        self,
+        work_calendar: WorkCalendar,
+        first_day: date,
+        last_day: date,
+        total_worked_time_hours: float,
+        remaining_hours: float,
+    ) -> None:
+        day_hours = work_calendar.average_day_seconds() / 3600
+        logging.log(logging.INFO, "Working days         : %s", work_calendar.working_days(first_day, last_day))
+        logging.log(logging.INFO, "Expected hours       : %s", work_calendar.expected_seconds(first_day, last_day) / 3600)
+        logging.log(logging.INFO, "Worked hours         : %s", total_worked_time_hours)
+        logging.log(logging.INFO, "Remaining hours      : %s", remaining_hours)
+        logging.log(logging.INFO, "Remaining days       : %s", remaining_hours / day_hours if day_hours else 0.0)
+
+    def _collect_worked_hours(self, workspace_id: str, user_id: str, first_day: str, last_day: str, refresh: bool) -> float:
+        worked_seconds = self._collect_worked_seconds_by_month(workspace_id, user_id, first_day, last_day, refresh)
+        return sum(worked_seconds.values()) / 3600
+
+    def _collect_worked_seconds_by_month(
+        self,
+        workspace_id: str,
+        user_id: str,
+        first_day: str,
+        last_day: str,
+        refresh: bool,
+    ) -> dict[str, int]:
+        """Worked seconds by local month ("YYYY-MM"), requested in one pass over the whole range."""
+        page_size: int = 5000
+        bucketer, fetch_first_day, fetch_last_day = self._get_day_bucketer(first_day, last_day)
+        parsed = self.records.iter_records(workspace_id, user_id, fetch_first_day, fetch_last_day, page_size, refresh=refresh)
+
+        worked_time_seconds: dict[str, int] = {}
+        for page in batched(parsed, page_size, strict=False):
+            works = [work for work in page if isinstance(work, dict)]
+            for work, worked_seconds in zip(works, parse_durations(entry_duration(work) for work in works), strict=True):
+                time_start = bucketer.parse_instant(work["timeInterval"].get("start") or "") if work.get("timeInterval") else None
+                if worked_seconds is None or time_start is None:
+                    continue
+                # only the part of the entry inside the local days range is counted
+                for day, seconds in bucketer.split(time_start, worked_seconds):
+                    worked_time_seconds[day[:7]] = worked_time_seconds.get(day[:7], 0) + (seconds or 0)
+        return worked_time_seconds
 
-    def _get_holidays(self, year: int) -> holidays.HolidayBase:
-        return holidays.country_holidays(country="DE", subdiv="BW", years=year)
+    def _calculate_remaining_hours(
+        self,
+        work_calendar: WorkCalendar,
+        first_day: date,
+        last_day: date,
+        time_still_worked: float,
+        free_days: int = 0,
+        illness_days: int = 0,
+    ) -> float:
+        # holidays and free weekdays are already no working days in the calendar
+        total_work_seconds = work_calendar.expected_seconds(first_day, last_day)
+        total_work_seconds -= (free_days + illness_days) * work_calendar.average_day_seconds()
+        return time_still_worked - total_work_seconds / 3600
 
     # --------------------------------------------------------------------------
     #
@@ -224,7 +340,7 @@ class ApiClockifyService:
     #
     # --------------------------------------------------------------------------
 
-    def times(
+    def times(  # noqa: PLR0913, PLR0917 # pylint: disable=too-many-positional-arguments
         self,
         workspace_id: str,
         user_id: str,
@@ -238,52 +354,220 @@ class ApiClockifyService:
         buffer: bool = False,
         time_details: bool = False,
         time_count: bool = True,
-    ) -> dict[str, IssueTime] | None:
-        """Clockify generate list of work time."""
+        refresh: bool = False,
+        engine: str = "python",
+        group_by: tuple[str, ...] = (),
+        output_format: str = "table",
+        output: str | None = None,
+    ) -> dict[IssueKey, IssueTime] | None:
+        """Clockify generate list of work time.
+
+        The entries are aggregated per entry in python or with engine "numpy" column wise (needs numpy installed).
+        With group by dimensions, nested totals by them are aggregated in the same pass and printed.
+        """
         try:
-            tmp_day: datetime = datetime.now(tz=settings.TIME_ZONE)
-            start_day: str | None = None
-            end_day: str = tmp_day.strftime(self.format_date_date_end)
-
-            # if a speicif day should be used as start day, parse it from param
-            if specific_day is not None:
-                tmp_day = datetime.strptime(specific_day, self.format_date_day).replace(tzinfo=settings.TIME_ZONE)
-                end_day = tmp_day.strftime(self.format_date_date_end)
-            # calculate start day
-            start_day = (tmp_day - timedelta(days=days_to_subtract)).strftime(self.format_date_date_start)
-
-            logging.debug(start_day)
-            logging.debug(end_day)
-
-            parsed = self.request_records_from_clockify(workspace_id, user_id, start_day, end_day, page_size)
-            if parsed is None:
+            if not settings.CLOCKIFY_API_KEY:
+                logging.log(logging.ERROR, "failed because CLOCKIFY_API_KEY is not set")
                 return None
 
-            results: dict[str, IssueTime] = {}
-
-            # proceed the parsed api list into its needed task information
-            self._proceed_work_issues(results, parsed, combine, filter_project_name, filter_task_name, filter_issue_id)
-
-            # add also a generic buffer issue for not specific work
-            if buffer:
-                self._calc_buffer_issue(results)
+            start_day, end_day = self._get_times_range(days_to_subtract, specific_day)
+            engine = self._get_engine(engine)
+            group_by_aggregator = GroupByAggregator(group_by) if group_by else None
+            results = self._collect_times(
+                workspace_id,
+                user_id,
+                start_day,
+                end_day,
+                page_size,
+                combine,
+                filter_project_name,
+                filter_task_name,
+                filter_issue_id,
+                buffer,
+                refresh,
+                engine,
+                group_by_aggregator,
+            )
 
             # ------------------------------------------------------
             # write result to file, to be used later for other api's example to import it into different service
-            serializable_results = {
-                key: value.to_dict() if isinstance(value, IssueTime) else value for key, value in results.items()
-            }
-            with Path(f"{create_service_folder()}/{settings.CLOCKIFY_TMP_FILE}").open(mode="w", encoding="utf-8") as f:
-                json.dump(serializable_results, f)
+            write_handoff(f"{create_service_folder()}/{settings.CLOCKIFY_TMP_FILE}", results.items())
+
+            # print the result for manual check or copy/past usage, or as csv/json for scripts
+            with (
+                open_output(output) as stream,
+                ResultRenderer(output_format, stream, time_details, time_count) as renderer,
+            ):
+                renderer.render(results)
+                # the nested totals of the group by dimensions
+                if group_by_aggregator is not None:
+                    renderer.group_totals(group_by, group_by_aggregator.total)
+
+            self.diagnostics.report("times")
+            return results
+        except Exception as e:
+            logging.log(logging.CRITICAL, e, exc_info=True)
+        return None
 
-            # print the result for manual check or copy/past usage
-            self._print_result(results, time_details, time_count)
+    def times_batch(  # noqa: PLR0913, PLR0917 # pylint: disable=too-many-positional-arguments
+        self,
+        users: list[tuple[str, str]],
+        days_to_subtract: int = 0,
+        page_size: int = 50,
+        specific_day: str | None = None,
+        filter_project_name: str | None = None,
+        filter_task_name: str | None = None,
+        filter_issue_id: str | None = None,
+        combine: bool = False,
+        buffer: bool = False,
+        time_details: bool = False,
+        time_count: bool = True,
+        refresh: bool = False,
+        engine: str = "python",
+        group_by: tuple[str, ...] = (),
+        output_format: str = "table",
+        output: str | None = None,
+    ) -> dict[tuple[str, str], dict[IssueKey, IssueTime]] | None:
+        """Clockify generate list of work time for multiple (workspace, user) pairs at once.
+
+        The records of the users are requested and aggregated concurrently, limited by "CLOCKIFY_BATCH_WORKERS".
+        The combined result is only printed, it is not written for an upload into other services.
+        The group by totals are aggregated over all users, by user with the dimension "user".
+        """
+        try:
+            if not settings.CLOCKIFY_API_KEY:
+                logging.log(logging.ERROR, "failed because CLOCKIFY_API_KEY is not set")
+                return None
 
+            start_day, end_day = self._get_times_range(days_to_subtract, specific_day)
+            engine = self._get_engine(engine)
+            group_by_aggregator = GroupByAggregator(group_by) if group_by else None
+            with ThreadPoolExecutor(max_workers=settings.CLOCKIFY_BATCH_WORKERS) as executor:
+                user_results = executor.map(
+                    lambda user: self._collect_times(
+                        user[0],
+                        user[1],
+                        start_day,
+                        end_day,
+                        page_size,
+                        combine,
+                        filter_project_name,
+                        filter_task_name,
+                        filter_issue_id,
+                        buffer,
+                        refresh,
+                        engine,
+                        group_by_aggregator,
+                    ),
+                    users,
+                )
+                results: dict[tuple[str, str], dict[IssueKey, IssueTime]] = {}
+                with (
+                    open_output(output) as stream,
+                    ResultRenderer(output_format, stream, time_details, time_count) as renderer,
+                ):
+                    for (workspace_id, user_id), user_result in zip(users, user_results, strict=True):
+                        results[(workspace_id, user_id)] = user_result
+                        renderer.header(f"USER: {user_id} (WORKSPACE: {workspace_id})")
+                        renderer.render(user_result, user_id)
+                    if group_by_aggregator is not None:
+                        renderer.group_totals(group_by, group_by_aggregator.total)
+            self.diagnostics.report("times")
             return results
         except Exception as e:
             logging.log(logging.CRITICAL, e, exc_info=True)
         return None
 
+    def _get_times_range(self, days_to_subtract: int, specific_day: str | None) -> tuple[str, str]:
+        tmp_day: datetime = datetime.now(tz=settings.TIME_ZONE)
+        end_day: str = tmp_day.strftime(self.format_date_date_end)
+
+        # if a speicif day should be used as start day, parse it from param
+        if specific_day is not None:
+            tmp_day = datetime.strptime(specific_day, self.format_date_day).replace(tzinfo=settings.TIME_ZONE)
+            end_day = tmp_day.strftime(self.format_date_date_end)
+        # calculate start day
+        start_day: str = (tmp_day - timedelta(days=days_to_subtract)).strftime(self.format_date_date_start)
+
+        logging.debug(start_day)
+        logging.debug(end_day)
+        return start_day, end_day
+
+    def _get_day_bucketer(self, start_day: str, end_day: str) -> tuple[DayBucketer, str, str]:
+        """Day bucketer for the local days range and the utc range to request, which covers it."""
+        bucketer = DayBucketer(date.fromisoformat(start_day[:10]), date.fromisoformat(end_day[:10]))
+        fetch_first_day, fetch_last_day = bucketer.fetch_range()
+        return (
+            bucketer,
+            fetch_first_day.strftime(self.format_date_date_start),
+            fetch_last_day.strftime(self.format_date_date_end),
+        )
+
+    def _get_engine(self, engine: str) -> str:
+        if engine == "numpy" and not numpy_available():
+            logging.log(logging.WARNING, 'engine "numpy" needs numpy installed (pip install "vm_clockify[numpy]"), use python')
+            return "python"
+        return engine
+
+    def _collect_times(
+        self,
+        workspace_id: str,
+        user_id: str,
+        start_day: str,
+        end_day: str,
+        page_size: int,
+        combine: bool,
+        filter_project_name: str | None,
+        filter_task_name: str | None,
+        filter_issue_id: str | None,
+        buffer: bool,
+        refresh: bool,
+        engine: str = "python",
+        group_by: GroupByAggregator | None = None,
+    ) -> dict[IssueKey, IssueTime]:
+        bucketer, fetch_start_day, fetch_end_day = self._get_day_bucketer(start_day, end_day)
+        parsed = self.records.iter_records(workspace_id, user_id, fetch_start_day, fetch_end_day, page_size, refresh=refresh)
+
+        results: dict[IssueKey, IssueTime] = {}
+
+        # proceed the parsed api list into its needed task information
+        # the group by needs all entries, so the day rollups are only used without it
+        if group_by is None and settings.CLOCKIFY_STORE_ENABLED and settings.CLOCKIFY_ROLLUP_ENABLED:
+            self._proceed_work_issues_rollup(
+                results,
+                workspace_id,
+                user_id,
+                parsed,
+                bucketer,
+                combine,
+                filter_project_name,
+                filter_task_name,
+                filter_issue_id,
+                engine,
+                refresh,
+            )
+        else:
+            self._proceed_work_issues(
+                results,
+                parsed,
+                bucketer,
+                combine,
+                filter_project_name,
+                filter_task_name,
+                filter_issue_id,
+                engine,
+                group_by,
+                user_id,
+            )
+
+        # add also a generic buffer issue for not specific work
+        if buffer:
+            self._calc_buffer_issue(results)
+
+        self.issue_cache.save()
+        logging.log(logging.DEBUG, "issue cache: %s", self.issue_cache.stats())
+        return results
+
     def request_records_from_clockify(
         self,
         workspace_id: str,
@@ -293,245 +577,328 @@ class ApiClockifyService:
         page_size: int = 50,
     ) -> list[Any] | None:
         """Start and end day needs to be in format: "%Y-%m-%dT00:00:00.000Z"."""
-        if not settings.CLOCKIFY_API_KEY:
-            logging.log(logging.ERROR, "failed because CLOCKIFY_API_KEY is not set")
-            return None
-
-        headers: HeaderTypes = {
-            "content-type": "application/json",
-            "X-Api-Key": settings.CLOCKIFY_API_KEY,
-        }
-        params: QueryParamTypes = [
-            ("hydrated", True),
-            ("page-size", page_size),
-            ("start", start_day),
-            ("end", end_day),
-        ]
-        path = f"workspaces/{workspace_id}/user/{user_id}/time-entries"
-        with httpx.Client() as session:
-            res = session.get(
-                f"{settings.CLOCKIFY_API_ENDPOINT}/{path}",
-                headers=headers,
-                params=params,
-            )
-            if res.status_code != 200:
-                logging.error(f"api call to get time entries failed with code '{res.status_code}' because of '{res.text}'")
-                sys.exit(1)
-
-            parsed: Any = json.loads(res.text)
-            if not isinstance(parsed, list):
-                logging.error("api result could not be parsed as list, no function implemented for this case")
-                sys.exit(1)
-            return parsed
+        return self.records.request_records_from_clockify(workspace_id, user_id, start_day, end_day, page_size)
 
     def _proceed_work_issues(
         self,
-        results: dict[str, IssueTime],
-        parsed: list[Any],
+        results: dict[IssueKey, IssueTime],
+        parsed: Iterable[Any],
+        bucketer: DayBucketer,
         combine: bool,
         filter_project_name: str | None,
         filter_task_name: str | None,
         filter_issue_id: str | None,
+        engine: str = "python",
+        group_by: GroupByAggregator | None = None,
+        user_id: str | None = None,
     ) -> None:
-        for work in parsed:
-            if not isinstance(work, dict):
-                continue
-
-            # parse first all needed values from json
-            time_start: str | None = (
-                work.get("timeInterval", {}).get("start", None) if work.get("timeInterval") is not None else None
-            )
-            time_duration: str | None = (
-                work.get("timeInterval", {}).get("duration", None) if work.get("timeInterval") is not None else None
-            )
-            current_time_duration = None
-            if time_duration and time_duration.startswith(self.prefix_duration):
-                time_duration_tmp = re.match(self.regex_duration, time_duration)
-                if time_duration_tmp is not None:
-                    current_time_duration = {
-                        "h": int(time_duration_tmp.group(1)) if time_duration_tmp.group(1) else 0,
-                        "m": int(time_duration_tmp.group(2)) if time_duration_tmp.group(2) else 0,
-                    }
-
-            current_task: str | None = work.get("task", {}).get("name", None) if work.get("task") is not None else None
-            current_project: str | None = work.get("project", {}).get("name", None) if work.get("project") is not None else None
-
-            # if combine is true, same tasks will combine into one
-            # else default will not combine tasks
-            clockify_issue_id: str | None = None
-            if not combine:
-                clockify_issue_id = work.get("id", "")
-
-            original_description: str = str(work.get("description"))
-            # try to parse the start date into datetime object
-            current_time_start: datetime | None = (
-                datetime.strptime(time_start, self.format_date_from).replace(tzinfo=settings.TIME_ZONE) if time_start else None
-            )
-
-            # filter inside task and project
-            if current_project is not None and filter_project_name is not None and filter_project_name not in current_project:
-                current_project = None
-            if current_task is not None and filter_task_name is not None and filter_task_name not in current_task:
-                current_task = None
-
-            # if current_task is None:
-            #     logging.debug("there is no 'task name' specified")
-            #     continue
-            if current_project is None:
-                logging.debug("there is no 'project name' name specified")
-                continue
-
-            # if time can be parsed, start to save the result
-            if current_time_start is None:
-                logging.error("failed to parse current date start")
-                sys.exit(1)
-            # ----------------------------------------------
-            # if start date parsed correct, get only current day without time
-            current_day: str = current_time_start.strftime(self.format_date_day)
-
-            # get needed info like the id from issue
-            current_issue, current_issue_type, current_description = self._parse_issue_extra_info(
-                current_task,
-                current_project,
-                original_description,
+        if engine == "numpy":
+            self._proceed_work_issues_columnar(
+                results,
+                parsed,
+                bucketer,
+                combine,
+                filter_project_name,
+                filter_task_name,
+                filter_issue_id,
+                group_by,
+                user_id,
             )
+            return
 
-            if current_issue is None:
-                logging.warning("failed to get or parse base issue information for:")
-                logging.warning(
-                    f"""
-                        - timeStart: {current_time_start}
-                        - task: {current_task}
-                        - project: {current_project}
-                        - description: {current_description}
-                        - timeDuration: {current_time_duration}
-                    """,
-                )
-
-            # filter specific issue
-            if filter_issue_id is not None and current_issue is not None and filter_issue_id not in current_issue:
-                current_issue = None
-
-            if current_issue is None:
-                continue
-
+        decoded = self._decode_works(
+            parsed,
+            bucketer,
+            combine,
+            filter_project_name,
+            filter_task_name,
+            filter_issue_id,
+            group_by,
+            user_id,
+        )
+        for (
+            current_day,
+            current_project,
+            current_task,
+            clockify_issue_id,
+            time_duration_seconds,
+            current_issue,
+            current_issue_type,
+            current_description,
+        ) in decoded:
             # ----------------------------------------------
             # S1:: for a complete time overview for a day
             # SETUP:: id to store collections combined unique by its day
-            #         prefix_sum is used to filter it later
+            #         the "sum" kind is used to filter it later
             self._gen_issue(
                 results,
-                current_id=f"{self.prefix_sum}_{current_day}",
+                current_id=(KEY_SUM, current_day, None, None, None),
                 current_project=current_project,
                 current_task=current_task,
                 current_day=current_day,
-                current_time_duration=current_time_duration,
+                current_time_duration=time_duration_seconds,
             )
             # ----------------------------------------------
             # S2:: the issues combined it self
             # SETUP:: id to store collections combined unique
             self._gen_issue(
                 results,
-                current_id=f"{current_day}_{current_project}_{current_task}_{clockify_issue_id}",
+                current_id=(KEY_ISSUE, current_day, current_project, current_task, clockify_issue_id),
                 current_project=current_project,
                 current_task=current_task,
                 current_day=current_day,
-                current_time_duration=current_time_duration,
+                current_time_duration=time_duration_seconds,
                 current_issue=current_issue,
                 current_issue_type=current_issue_type,
                 current_description=current_description,
             )
 
-    def _calc_buffer_issue(self, results: dict[str, IssueTime]) -> None:
+    def _proceed_work_issues_rollup(
+        self,
+        results: dict[IssueKey, IssueTime],
+        workspace_id: str,
+        user_id: str,
+        parsed: Iterable[Any],
+        bucketer: DayBucketer,
+        combine: bool,
+        filter_project_name: str | None,
+        filter_task_name: str | None,
+        filter_issue_id: str | None,
+        engine: str,
+        refresh: bool,
+    ) -> None:
+        """Aggregate only the local days, whose entries changed since their saved rollup, and merge all days."""
+        context = rollup_context(
+            combine,
+            filter_project_name,
+            filter_task_name,
+            filter_issue_id,
+            str(bucketer.tz),
+            bucketer.split_midnight,
+        )
+        rollups = DayRollups(self.records.store, workspace_id, user_id, bucketer, context)
+        for work in parsed:
+            if isinstance(work, dict):
+                rollups.add(work)
+
+        changed_results: dict[IssueKey, IssueTime] = {}
+        self._proceed_work_issues(
+            changed_results,
+            rollups.changed_works(refresh),
+            bucketer,
+            combine,
+            filter_project_name,
+            filter_task_name,
+            filter_issue_id,
+            engine,
+        )
+        for key, values in rollups.merge({key: value.to_dict() for key, value in changed_results.items()}):
+            results[key] = IssueTime.from_dict(values)
+
+    def _decode_works(
+        self,
+        parsed: Iterable[Any],
+        bucketer: DayBucketer,
+        combine: bool,
+        filter_project_name: str | None,
+        filter_task_name: str | None,
+        filter_issue_id: str | None,
+        group_by: GroupByAggregator | None,
+        user_id: str | None = None,
+    ) -> Iterator[DecodedWork]:
+        for page in batched(parsed, DECODE_PAGE_SIZE, strict=False):
+            # the durations of the page are parsed at once
+            durations = parse_durations(entry_duration(work) if isinstance(work, dict) else None for work in page)
+            for work, time_duration_seconds in zip(page, durations, strict=True):
+                # an entry over midnight is decoded into one part per day
+                decoded_works = self._decode_work(
+                    work,
+                    time_duration_seconds,
+                    bucketer,
+                    combine,
+                    filter_project_name,
+                    filter_task_name,
+                    filter_issue_id,
+                )
+                for decoded_work in decoded_works:
+                    if group_by is not None:
+                        group_by.add(decoded_work, work, user_id)
+                    yield decoded_work
+
+    def _proceed_work_issues_columnar(
+        self,
+        results: dict[IssueKey, IssueTime],
+        parsed: Iterable[Any],
+        bucketer: DayBucketer,
+        combine: bool,
+        filter_project_name: str | None,
+        filter_task_name: str | None,
+        filter_issue_id: str | None,
+        group_by: GroupByAggregator | None = None,
+        user_id: str | None = None,
+    ) -> None:
+        """Aggregate the entries page by page column wise, like the per entry aggregation."""
+        aggregator = ColumnarIssueAggregator(bucketer)
+        for page in batched(parsed, DECODE_PAGE_SIZE, strict=False):
+            aggregator.add_page(
+                page,
+                combine,
+                filter_project_name,
+                filter_task_name,
+                filter_issue_id,
+                resolve_issue=self._parse_issue_extra_info,
+                warn_no_issue=lambda sample: self.diagnostics.warn(WARN_NO_ISSUE, sample),
+                group_by=group_by,
+                user_id=user_id,
+            )
+
+        for day, project, task in aggregator.missing_durations():
+            self.diagnostics.warn(WARN_NO_WORK_TIME, (day, project, task))
+        for key, project, task, day, duration_seconds, issues, issue_type, descriptions in aggregator.aggregate():
+            for _ in issues[1:]:
+                self.diagnostics.warn(WARN_MULTIPLE_IDS, descriptions[-1])
+            results[key] = IssueTime(
+                project=project,
+                task=task,
+                issue_date=day,
+                duration_seconds=duration_seconds,
+                issue=issues,
+                description=descriptions,
+                issue_type=issue_type,
+            )
+
+    def _decode_work(
+        self,
+        work: object,
+        time_duration_seconds: int | None,
+        bucketer: DayBucketer,
+        combine: bool,
+        filter_project_name: str | None,
+        filter_task_name: str | None,
+        filter_issue_id: str | None,
+    ) -> list[DecodedWork]:
+        """Parse the needed values of a time entry per local day, empty if filtered, without issue or outside the range.
+
+        The duration is parsed already, with the durations of all entries of the page.
+        """
+        if not isinstance(work, dict):
+            return []
+
+        # parse first all needed values from json
+        time_start: str | None = work.get("timeInterval", {}).get("start", None) if work.get("timeInterval") is not None else None
+        current_task: str | None = work.get("task", {}).get("name", None) if work.get("task") is not None else None
+        current_project: str | None = work.get("project", {}).get("name", None) if work.get("project") is not None else None
+
+        # if combine is true, same tasks will combine into one
+        # else default will not combine tasks
+        clockify_issue_id: str | None = None
+        if not combine:
+            clockify_issue_id = work.get("id", "")
+
+        original_description: str = str(work.get("description"))
+        # try to parse the start date into utc epoch seconds
+        current_time_start: int | None = bucketer.parse_instant(time_start) if time_start else None
+
+        # filter inside task and project
+        if current_project is not None and filter_project_name is not None and filter_project_name not in current_project:
+            current_project = None
+        if current_task is not None and filter_task_name is not None and filter_task_name not in current_task:
+            current_task = None
+
+        # if current_task is None:
+        #     logging.debug("there is no 'task name' specified")
+        #     return None
+        if current_project is None:
+            logging.debug("there is no 'project name' name specified")
+            return []
+
+        # if time can be parsed, start to save the result
+        if current_time_start is None:
+            logging.error("failed to parse current date start")
+            sys.exit(1)
+        # ----------------------------------------------
+        # if start date parsed correct, get the local days of the entry without time
+        day_parts = bucketer.split(current_time_start, time_duration_seconds)
+        if not day_parts:
+            return []
+
+        # get needed info like the id from issue
+        current_issue, current_issue_type, current_description = self._parse_issue_extra_info(
+            current_task,
+            current_project,
+            original_description,
+            task_id=work.get("taskId") if current_task is not None else None,
+            project_id=work.get("projectId"),
+        )
+
+        if current_issue is None:
+            self.diagnostics.warn(
+                WARN_NO_ISSUE,
+                {
+                    "timeStart": time_start,
+                    "task": current_task,
+                    "project": current_project,
+                    "description": original_description,
+                    "timeDuration": entry_duration(work),
+                },
+            )
+
+        # filter specific issue
+        if filter_issue_id is not None and current_issue is not None and filter_issue_id not in current_issue:
+            current_issue = None
+
+        if current_issue is None:
+            return []
+
+        return [
+            (
+                current_day,
+                current_project,
+                current_task,
+                clockify_issue_id,
+                day_seconds,
+                current_issue,
+                current_issue_type,
+                current_description,
+            )
+            for current_day, day_seconds in day_parts
+        ]
+
+    def _calc_buffer_issue(self, results: dict[IssueKey, IssueTime]) -> None:
         if settings.WORK_TIME_DEFAULT_ISSUE is None or settings.WORK_TIME_DEFAULT_COMMENT is None:
             return
 
         for key, value in results.copy().items():
-            if not key.startswith(self.prefix_sum) or value.project is None or value.task is None or value.issue_date is None:
+            if key[0] != KEY_SUM or value.project is None or value.task is None or value.issue_date is None:
                 continue
 
             # calc the rest time
-            opened_rest_time: float = settings.WORK_TIME_DEFAULT_HOURS - (
-                value.duration.get("h", 0) + (value.duration.get("m", 0) / 60.0)
-            )
+            opened_rest_seconds: int = settings.WORK_TIME_DEFAULT_HOURS * 3600 - (value.duration_seconds or 0)
 
             # add only if there is missing time, else no buffer issue is needed
-            if opened_rest_time <= 0:
+            if opened_rest_seconds <= 0:
                 continue
 
-            # calc into correct format
-            new_hour, new_minutes = self._convert_time_split(opened_rest_time * 60.0 * 60.0)
-            current_time_duration: dict[str, int] = {"h": new_hour, "m": new_minutes}
             # add to issues
             self._gen_issue(
                 results,
-                current_id=f"{settings.WORK_TIME_DEFAULT_ISSUE}_{value.issue_date}_{value.project}_{value.task}",
+                current_id=(KEY_BUFFER, value.issue_date, value.project, value.task, settings.WORK_TIME_DEFAULT_ISSUE),
                 current_project=value.project,
                 current_task=value.task,
                 current_day=value.issue_date,
-                current_time_duration=current_time_duration,
+                current_time_duration=opened_rest_seconds,
                 current_issue=settings.WORK_TIME_DEFAULT_ISSUE,
                 current_description=settings.WORK_TIME_DEFAULT_COMMENT,
             )
 
-    def _print_result(self, results: dict[str, IssueTime], time_details: bool, time_count: bool) -> None:
-        print_style: int = 0  # 0 | 1
-
-        for key, value in results.items():
-            log_parts = []
-
-            # print a overview for the complete day work
-            if key.startswith(self.prefix_sum) and time_count:
-                logging.info("~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~")
-                logging.info(f"  ==> DAY: {value.issue_date}")
-                logging.info(f"  [*] WORKED: {value.duration.get('h', 0)}h {value.duration.get('m', 0)}m")
-                opened_rest_time = settings.WORK_TIME_DEFAULT_HOURS - (
-                    value.duration.get("h", 0) + (value.duration.get("m", 0) / 60)
-                )
-                new_hour, new_minutes = self._convert_time_split(opened_rest_time * 60 * 60)
-                logging.info(f"  [*] REST  : {new_hour}h {new_minutes}m")
-                logging.info("~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~")
-                # logging.info("###################################################")
-            # print issue per issue with information
-            elif time_details:
-                if print_style == 0:
-                    if value.issue_date:
-                        log_parts.append(f"{value.issue_date}")
-                    if value.duration:
-                        log_parts.append(f"{value.duration.get('h', 0)}h {value.duration.get('m', 0)}m")
-                    if value.issue:
-                        log_parts.append(", ".join(value.issue))
-                    if value.issue_type:
-                        log_parts.append(value.issue_type)
-                    if value.description:
-                        log_parts.append(", ".join(value.description))
-                    logging.info(f"  [*] {' || '.join(log_parts)}")
-                elif print_style == 1:
-                    if value.issue_date:
-                        self._log_detail("DATE:", f"  [*] {value.issue_date}")
-                    if value.duration:
-                        self._log_detail("DURATION:", f"  [*] {value.duration.get('h', 0)}h {value.duration.get('m', 0)}m")
-                    if value.issue:
-                        self._log_detail("ISSUE:", *(f"  [*] {issue}" for issue in value.issue))
-                    if value.issue_type:
-                        self._log_detail("I-TYPE:", f"  [*] {value.issue_type}")
-                    if value.description:
-                        self._log_detail("DESCRIPTION:", *(f"  - {desc}" for desc in value.description))
-                    logging.info("###################################################")
-
-    def _log_detail(self, header: str, *messages: str) -> None:
-        logging.log(verboselogs.NOTICE, header)
-        for message in messages:
-            logging.info(message)
-
     def _gen_issue(
         self,
-        results: dict[str, IssueTime],
-        current_id: str,
+        results: dict[IssueKey, IssueTime],
+        current_id: IssueKey,
         current_task: str | None,
         current_project: str,
         current_day: str,
-        current_time_duration: dict[str, int] | None,
+        current_time_duration: int | None,
         current_issue: str | None = None,
         current_issue_type: str | None = None,
         current_description: str | list[Any] | None = None,
@@ -548,18 +915,10 @@ class ApiClockifyService:
 
         # calc and set the work-time
         if current_time_duration is not None:
-            duration: dict[str, int] = results[current_id].duration
-            duration["h"] = duration.get("h", 0) + current_time_duration.get("h", 0)
-            duration["m"] = duration.get("m", 0) + current_time_duration.get("m", 0)
-            if duration["m"] >= 60:
-                new_hour, new_minutes = self._convert_time_split(duration["m"] * 60)
-                duration["h"] = duration.get("h", 0) + new_hour
-                duration["m"] = new_minutes
-        else:
-            logging.log(
-                logging.WARNING,
-                "no work time was set, check if this was correct or you forget to set your worktime",
-            )
+            results[current_id].duration_seconds = (results[current_id].duration_seconds or 0) + current_time_duration
+        elif current_id[0] != KEY_SUM:
+            # counted once per entry, not again for the sum of its day
+            self.diagnostics.warn(WARN_NO_WORK_TIME, (current_day, current_project, current_task))
 
         # add the youtrack issue number
         # this is done with a check, if combine mode is activated
@@ -568,10 +927,7 @@ class ApiClockifyService:
         if isinstance(current_issue, str) and current_issue not in results[current_id].issue:
             results[current_id].issue.append(current_issue)
             if len(results[current_id].issue) > 1:
-                logging.log(
-                    logging.WARNING,
-                    f'issue "{current_description}" has multiple ids, check this',
-                )
+                self.diagnostics.warn(WARN_MULTIPLE_IDS, current_description)
 
         # add description text for issue
         if isinstance(current_description, str):
@@ -579,62 +935,24 @@ class ApiClockifyService:
         elif isinstance(current_description, list):
             results[current_id].description.extend(current_description)
 
-    def _convert_time_split(self, seconds: float) -> tuple[int, int]:
-        seconds = seconds % (24.0 * 3600.0)
-        hour = seconds // 3600.0
-        seconds %= 3600.0
-        minutes = seconds // 60.0
-        seconds %= 60.0
-        return (int(hour), int(minutes))
-
     def _parse_issue_extra_info(
         self,
         current_task: str | None,
         current_project: str | None,
         current_description: str | None,
-    ) -> tuple[Any | None, Any | None, Any | None]:
-        regex_issue = r"(?:(?:.*?)\[(.*?)\](?:.*?))+$"
-
+        task_id: str | None = None,
+        project_id: str | None = None,
+    ) -> tuple[str | None, str | None, str | None]:
         # SETUP:: parse issue number from task or project
         # need to be format: 'example name [i=issue-id]'
         # or                 'example name [i=issue-...]'
-        current_issue: str | None = None
+        description_tag: str | None = None
         if current_description is not None:
-            current_issue_tmp = re.match(regex_issue, current_description)
-            if isinstance(current_issue_tmp, Match):
-                current_issue = current_issue_tmp.group(1)
-                # current_description = current_description
-                current_description = re.sub(r"\[.*?\]$", "", current_description).strip()
-
-        if current_task is not None:
-            current_issue_tmp = re.match(regex_issue, current_task)
-            if isinstance(current_issue_tmp, Match):
-                current_issue = current_issue_tmp.group(1)
-
-        if current_project is not None:
-            current_issue_tmp = re.match(regex_issue, current_project)
-            if isinstance(current_issue_tmp, Match):
-                current_issue = current_issue_tmp.group(1)
-
-        if current_issue is None:
-            logging.log(
-                logging.WARNING,
-                f"issue has not any id in task or project set {current_issue}",
-            )
-
-        if isinstance(current_issue, str):
-            parsed_result: dict[Any, Any] = parse_qs(current_issue)
-
-            # get issue ID
-            parsed_result_id = parsed_result.get("i")
-            if parsed_result_id:
-                parsed_result_id = parsed_result_id[0]
-
-            # get issue TYPE
-            parsed_result_type = parsed_result.get("t")
-            if parsed_result_type:
-                parsed_result_type = parsed_result_type[0]
+            description_tag, current_description = self.issue_cache.description(current_description)
 
-            return parsed_result_id, parsed_result_type, current_description
+        # without issue info the entry is counted as warning by the caller
+        issue_info = self.issue_cache.resolve(current_task, current_project, description_tag, task_id, project_id)
+        if issue_info is not None:
+            return issue_info[0], issue_info[1], current_description
 
         return None, None, None
@@ -9,6 +9,7 @@ import bs4 as bs
 import httpx
 
 from vm_clockify.utils.config import settings
+from vm_clockify.utils.http_helper import http_clients
 
 
 # ------------------------------------------------------------------------------
@@ -51,32 +52,33 @@ class ApiLandwehrService:
     def upload(self, year: int, month: int, day: int, auftrag: str) -> None:
         """Upload to Landwehr."""
         try:
-            with httpx.Client() as session:
-                # ------------------------------------------------------------------
-                # LOGIN
-                res: httpx.Response = self._login(session)
-
-                # ------------------------------------------------------------------
-                # LOGIN CHECK
-                if (res.status_code in (200, 302)) and self.prado_pagestate is not None and self.ssid is not None:
-                    # ----------------------------------------------------------
-                    # GET TIME
-                    self._get_time(session, year, month)
-
-                    # ----------------------------------------------------------
-                    # ADD TIME
-                    self._add_time(session, auftrag, year, month, day)
-
-                    # parsed = json.loads(res.text)
-                    # logging.log(
-                    #     logging.DEBUG,
-                    #     json.dumps(parsed, indent=4, sort_keys=False),
-                    # )
-                else:
-                    logging.log(logging.ERROR, res.text)
-                    logging.log(logging.ERROR, session.cookies)
-                    logging.log(logging.ERROR, res.status_code)
-                    # sys.exit(1)
+            # own client, to keep the login cookies away from other services
+            session = http_clients.client("landwehr")
+            # ------------------------------------------------------------------
+            # LOGIN
+            res: httpx.Response = self._login(session)
+
+            # ------------------------------------------------------------------
+            # LOGIN CHECK
+            if (res.status_code in (200, 302)) and self.prado_pagestate is not None and self.ssid is not None:
+                # ----------------------------------------------------------
+                # GET TIME
+                self._get_time(session, year, month)
+
+                # ----------------------------------------------------------
+                # ADD TIME
+                self._add_time(session, auftrag, year, month, day)
+
+                # parsed = json.loads(res.text)
+                # logging.log(
+                #     logging.DEBUG,
+                #     json.dumps(parsed, indent=4, sort_keys=False),
+                # )
+            else:
+                logging.log(logging.ERROR, res.text)
+                logging.log(logging.ERROR, session.cookies)
+                logging.log(logging.ERROR, res.status_code)
+                # sys.exit(1)
         except Exception as e:
             logging.log(logging.CRITICAL, e, exc_info=True)
 
@@ -112,7 +114,7 @@ class ApiLandwehrService:
             "Sec-Fetch-Site": "none",
             "Sec-Fetch-User": "?1",
         }
-        response = httpx.get(
+        response = session.get(
             f"{settings.LANDWEHR_API_URL}{settings.LANDWEHR_API_ENDPOINT}",
             headers=headers,
             params=params,
@@ -449,7 +451,7 @@ class ApiLandwehrService:
                 value = prado_pagestate_id.get("value")
                 if isinstance(value, str):  # Ensure the value is a string
                     self.prado_pagestate = value
-                    logging.log(logging.DEBUG, f"PRADO_PAGESTATE:: {self.prado_pagestate}")
+                    logging.log(logging.DEBUG, "PRADO_PAGESTATE:: %s", self.prado_pagestate)
 
     def _html_table_to_json(self, text: str | None) -> None:
         if not text:
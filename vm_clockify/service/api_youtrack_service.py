@@ -1,15 +1,52 @@
 """YOUTRACK."""
 
+import asyncio
+from collections.abc import Iterable
 from datetime import datetime
+from itertools import batched
 import json
 import logging
-import sys
+from typing import Any
 
 import httpx
 
 from vm_clockify.utils.config import settings
+from vm_clockify.utils.http_helper import http_clients
 
-from .api_clockify_service import IssueTime
+from .clockify_issue_time import KEY_SUM, IssueKey, IssueTime
+from .youtrack_metadata import YoutrackMetadataCache
+from .youtrack_work_items import YoutrackWorkItemIndex
+
+UPLOAD_UPLOADED = "uploaded"
+UPLOAD_EXISTS = "exists"
+UPLOAD_FAILED = "failed"
+# records of the handoff, which are prepared and uploaded together
+UPLOAD_CHUNK_SIZE: int = 500
+
+# issue id with the items of the issue to upload: issue, date (epoch milliseconds) and description
+UploadItems = dict[str, list[tuple[IssueTime, int, str]]]
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+class UploadOutcome:
+    """Outcome of the upload of one work item."""
+
+    __slots__ = ("detail", "issue_date", "issue_id", "status")
+
+    def __init__(self, issue_id: str, issue_date: str | None, status: str, detail: str | None = None) -> None:
+        """Upload outcome."""
+        self.issue_id = issue_id
+        self.issue_date = issue_date
+        self.status = status
+        self.detail = detail
+
+    def to_dict(self) -> dict[str, Any]:
+        """Values of the outcome, to be serialized as json."""
+        return {"issue_id": self.issue_id, "issue_date": self.issue_date, "status": self.status, "detail": self.detail}
 
 
 # ------------------------------------------------------------------------------
@@ -43,85 +80,177 @@ class ApiYoutrackService:
     # --------------------------------------------------------------------------
     # https://www.jetbrains.com/help/youtrack/devportal/resource-api-issues-issueID-timeTracking-workItems.html#create-IssueWorkItem-method-sample
 
-    def upload(self, issues: dict[str, IssueTime]) -> None:
-        """Upload to Youtrack."""
+    def upload(self, issues: Iterable[tuple[IssueKey, IssueTime]], concurrency: int | None = None) -> list[UploadOutcome] | None:
+        """Upload to Youtrack, the items of different issues concurrently and the items of one issue in their order.
+
+        The issues are read and uploaded chunk by chunk (UPLOAD_CHUNK_SIZE records), so they are never all in memory.
+        Issue numbers with "..." of a chunk are asked for before its upload, so the upload itself runs without prompts.
+        Return the outcome per item, None if the upload failed completely.
+        """
         try:
             logging.log(logging.INFO, "Upload to YouTrack started ...")
-            with httpx.Client() as session:
-                for key, issue in issues.items():
-                    if key.startswith("-> sum:") or issue.issue_date is None:
-                        continue
-
-                    current_day = int(
-                        datetime.strptime(issue.issue_date, self.format_date_day).replace(tzinfo=settings.TIME_ZONE).timestamp()
-                        * 1000,
-                    )
-
-                    description = "\n- ".join(issue.description)
-                    description = f"- {description}"
-                    body = {
-                        "usesMarkdown": True,
-                        "text": description,
-                        "date": current_day,
-                        "duration": {
-                            "presentation": f"{issue.duration.get('h', 0)}h {issue.duration.get('m', 0)}m",
-                        },
-                    }
-                    if "..." in issue.issue[0]:
-                        logging.log(logging.INFO, "for description ->")
-                        logging.log(logging.INFO, issue.description)
-                        issue.issue[0] = issue.issue[0].replace(
-                            "...",
-                            input(f'==> enter number to replace "..." in {issue.issue[0]}: '),
-                        )
-                    if issue.issue_type:
-                        issue_type_id = self._get_work_type_id(session, issue.issue[0], issue.issue_type)
-                        if issue_type_id:
-                            body["type"] = {"id": issue_type_id}
-
-                    is_issue_uploaded = self._check_issue_exists(
-                        session,
-                        issue.issue[0],
-                        description,
-                        issue.issue_date,
-                        current_day,
-                    )
-
-                    if is_issue_uploaded:
-                        logging.log(
-                            logging.INFO,
-                            f"===>> Issue {issue.issue[0]} for date {issue.issue_date} is always uploaded",
-                        )
-                        continue
-
-                    path = f"issues/{issue.issue[0]}/timeTracking/workItems"
-                    res = session.post(
-                        f"{settings.YOUTRACK_API_ENDPOINT}/{settings.YOUTRACK_API_ENDPOINT_SUFFIX}/{path}",
-                        headers=self.headers,
-                        json=body,
-                    )
-                    if res.status_code != 200:
-                        logging.log(logging.ERROR, res.status_code)
-                        logging.log(logging.ERROR, res.text)
-                        sys.exit(1)
-
-                    logging.log(logging.INFO, f"  - Issue {issue.issue[0]} was uploaded, process next ...")
-
-                    parsed = json.loads(res.text)
-                    logging.log(
-                        logging.DEBUG,
-                        json.dumps(parsed, indent=4, sort_keys=False),
-                    )
+            outcomes = asyncio.run(self._upload_chunks(issues, concurrency or settings.YOUTRACK_UPLOAD_CONCURRENCY))
+            self._log_outcomes(outcomes)
             logging.log(logging.INFO, "... Upload to YouTrack finished!")
+            return outcomes
         except Exception as e:
             logging.log(logging.CRITICAL, e, exc_info=True)
+        return None
+
+    def _prepare_items(self, issues: Iterable[tuple[IssueKey, IssueTime]]) -> UploadItems:
+        """Group the items to upload by their issue, in the order of the issues."""
+        items: UploadItems = {}
+        for key, issue in issues:
+            if key[0] == KEY_SUM or issue.issue_date is None:
+                continue
+
+            if "..." in issue.issue[0]:
+                logging.log(logging.INFO, "for description ->")
+                logging.log(logging.INFO, issue.description)
+                issue.issue[0] = issue.issue[0].replace(
+                    "...",
+                    input(f'==> enter number to replace "..." in {issue.issue[0]}: '),
+                )
+
+            current_day = int(
+                datetime.strptime(issue.issue_date, self.format_date_day).replace(tzinfo=settings.TIME_ZONE).timestamp() * 1000,
+            )
+            description = "\n- ".join(issue.description)
+            items.setdefault(issue.issue[0], []).append((issue, current_day, f"- {description}"))
+        return items
+
+    async def _upload_chunks(self, issues: Iterable[tuple[IssueKey, IssueTime]], concurrency: int) -> list[UploadOutcome]:
+        """Upload the issues chunk by chunk, a chunk is uploaded completely before the next one is read."""
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        session = http_clients.async_client("youtrack")
+        metadata = YoutrackMetadataCache(self.headers)
+        work_items = YoutrackWorkItemIndex(self.headers)
+        outcomes: list[UploadOutcome] = []
+        try:
+            for chunk in batched(issues, UPLOAD_CHUNK_SIZE, strict=False):
+                items = self._prepare_items(chunk)
+                outcomes.extend(await self._upload_items(session, semaphore, metadata, work_items, items))
+        finally:
+            metadata.save()
+            await http_clients.aclose()
+        return outcomes
+
+    async def _upload_items(
+        self,
+        session: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        metadata: YoutrackMetadataCache,
+        work_items: YoutrackWorkItemIndex,
+        items: UploadItems,
+    ) -> list[UploadOutcome]:
+        """Upload the issues of a chunk concurrently, limited by the concurrency for all requests together."""
+        # my work items of the days of the chunk are requested at once, to find uploaded items without a search per item
+        days = [current_day for issue_items in items.values() for _, current_day, _ in issue_items]
+        if days:
+            try:
+                await work_items.prefetch(session, min(days), max(days))
+            except (httpx.HTTPError, ValueError) as e:
+                # the existence is checked per item then
+                logging.log(logging.WARNING, "youtrack work items could not be requested, check per item: %s", e)
+        issue_outcomes = await asyncio.gather(
+            *(
+                self._upload_issue(session, semaphore, metadata, work_items, issue_id, issue_items)
+                for issue_id, issue_items in items.items()
+            ),
+        )
+        return [outcome for outcomes in issue_outcomes for outcome in outcomes]
+
+    async def _upload_issue(
+        self,
+        session: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        metadata: YoutrackMetadataCache,
+        work_items: YoutrackWorkItemIndex,
+        issue_id: str,
+        issue_items: list[tuple[IssueTime, int, str]],
+    ) -> list[UploadOutcome]:
+        """Upload the items of one issue one after another, a failed item does not stop the next ones."""
+        outcomes: list[UploadOutcome] = []
+        for issue, current_day, description in issue_items:
+            async with semaphore:
+                try:
+                    outcome = await self._upload_item(session, metadata, work_items, issue_id, issue, current_day, description)
+                except Exception as e:
+                    logging.log(logging.ERROR, "  - Issue %s failed to upload: %s", issue_id, e)
+                    outcome = UploadOutcome(issue_id, issue.issue_date, UPLOAD_FAILED, str(e))
+            outcomes.append(outcome)
+        return outcomes
+
+    async def _upload_item(
+        self,
+        session: httpx.AsyncClient,
+        metadata: YoutrackMetadataCache,
+        work_items: YoutrackWorkItemIndex,
+        issue_id: str,
+        issue: IssueTime,
+        current_day: int,
+        description: str,
+    ) -> UploadOutcome:
+        body: dict[str, Any] = {
+            "usesMarkdown": True,
+            "text": description,
+            "date": current_day,
+            "duration": {
+                "presentation": f"{issue.hours}h {issue.minutes}m",
+            },
+        }
+        if issue.issue_type:
+            issue_type_id = await metadata.work_type_id(session, issue_id, issue.issue_type)
+            if issue_type_id:
+                body["type"] = {"id": issue_type_id}
+
+        if work_items.covers(current_day):
+            is_issue_uploaded = work_items.contains(issue_id, current_day, description)
+        else:
+            is_issue_uploaded = await self._check_issue_exists(session, issue_id, description, str(issue.issue_date), current_day)
+        if is_issue_uploaded:
+            logging.log(logging.INFO, "===>> Issue %s for date %s is always uploaded", issue_id, issue.issue_date)
+            return UploadOutcome(issue_id, issue.issue_date, UPLOAD_EXISTS)
+
+        path = f"issues/{issue_id}/timeTracking/workItems"
+        res = await session.post(
+            f"{settings.YOUTRACK_API_ENDPOINT}/{settings.YOUTRACK_API_ENDPOINT_SUFFIX}/{path}",
+            headers=self.headers,
+            json=body,
+        )
+        if res.status_code != 200:
+            # retries are done by the http client, skip only this item and proceed with the next
+            logging.log(logging.ERROR, "  - Issue %s failed to upload with code '%s'", issue_id, res.status_code)
+            logging.log(logging.ERROR, res.text)
+            return UploadOutcome(issue_id, issue.issue_date, UPLOAD_FAILED, f"code {res.status_code}: {res.text}")
 
-    def _check_issue_exists(self, session: httpx.Client, issue_id: str, desc: str, date: str, start_end: int) -> bool:
+        logging.log(logging.INFO, "  - Issue %s was uploaded, process next ...", issue_id)
+        work_items.add(issue_id, current_day, description)
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.log(logging.DEBUG, json.dumps(json.loads(res.text), indent=4, sort_keys=False))
+        return UploadOutcome(issue_id, issue.issue_date, UPLOAD_UPLOADED)
+
+    def _log_outcomes(self, outcomes: list[UploadOutcome]) -> None:
+        counts = dict.fromkeys((UPLOAD_UPLOADED, UPLOAD_EXISTS, UPLOAD_FAILED), 0)
+        for outcome in outcomes:
+            counts[outcome.status] += 1
+        logging.log(
+            logging.INFO,
+            "uploaded: %d, already uploaded: %d, failed: %d",
+            counts[UPLOAD_UPLOADED],
+            counts[UPLOAD_EXISTS],
+            counts[UPLOAD_FAILED],
+        )
+        for outcome in outcomes:
+            if outcome.status == UPLOAD_FAILED:
+                logging.log(logging.WARNING, "  - failed: %s for %s (%s)", outcome.issue_id, outcome.issue_date, outcome.detail)
+
+    async def _check_issue_exists(self, session: httpx.AsyncClient, issue_id: str, desc: str, date: str, start_end: int) -> bool:
         fields = "id,date,text"
         query = f'work: "{desc}" issue: {issue_id} work date: {date}'
         # path = f"workItems?fields={fields}&query={query}&author=me&creator=me&start={start_end}&end={(start_end)}"
         path = f"workItems?fields={fields}&query={query}&author=me&creator=me&start={start_end}"
-        res = session.get(
+        res = await session.get(
             f"{settings.YOUTRACK_API_ENDPOINT}/{settings.YOUTRACK_API_ENDPOINT_SUFFIX}/{path}",
             headers=self.headers,
         )
@@ -129,39 +258,9 @@ class ApiYoutrackService:
             parsed = json.loads(res.text)
             try:
                 for item in parsed:
-                    logging.log(logging.DEBUG, f"  - compare :: {item['text']} :: {desc}")
-                    logging.log(logging.DEBUG, f"  - compare :: {item['date']} :: {start_end}")
+                    logging.log(logging.DEBUG, "  - compare :: %s :: %s", item["text"], desc)
+                    logging.log(logging.DEBUG, "  - compare :: %s :: %s", item["date"], start_end)
                 return next(item for item in parsed if item["text"] == desc and item["date"] == start_end) is not None
             except StopIteration:
                 return False
         return False
-
-    def _get_work_type_id(self, session: httpx.Client, issue_id: str, issue_type: str) -> str | None:
-        project_id = self._get_project_id(session, issue_id)
-        if project_id:
-            fields = "id,name"
-            path = f"admin/projects/{project_id}/timeTrackingSettings/workItemTypes?fields={fields}"
-            res = session.get(
-                f"{settings.YOUTRACK_API_ENDPOINT}/{settings.YOUTRACK_API_ENDPOINT_SUFFIX}/{path}",
-                headers=self.headers,
-            )
-            if res.status_code == 200:
-                parsed = json.loads(res.text)
-                try:
-                    return str(next(item for item in parsed if item["name"] == issue_type)["id"])
-                except StopIteration:
-                    return None
-        return None
-
-    def _get_project_id(self, session: httpx.Client, issue_id: str) -> str | None:
-        if issue_id:
-            fields = "id,name"
-            path = f"issues/{issue_id}/project?fields={fields}"
-            res = session.get(
-                f"{settings.YOUTRACK_API_ENDPOINT}/{settings.YOUTRACK_API_ENDPOINT_SUFFIX}/{path}",
-                headers=self.headers,
-            )
-            if res.status_code == 200:
-                parsed = json.loads(res.text)
-                return str(parsed["id"])
-        return None
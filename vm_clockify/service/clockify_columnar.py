@@ -0,0 +1,373 @@
+"""CLOCKIFY COLUMNAR."""
+
+from collections.abc import Callable, Iterable, Iterator
+from importlib.util import find_spec
+import logging
+import sys
+from typing import TYPE_CHECKING, Any
+
+from vm_clockify.utils.day_bucket_helper import DayBucketer
+from vm_clockify.utils.duration_helper import entry_duration, parse_durations
+
+if TYPE_CHECKING:
+    import numpy as np
+    from numpy.typing import NDArray
+
+    from vm_clockify.service.clockify_group_by import GroupByAggregator
+
+# day, project, task, clockify entry id (None in combine mode), duration seconds, issue, issue type, description
+DecodedWork = tuple[str, str, str | None, str | None, int | None, str, str | None, str | None]
+# key of the day sum or the issue as (kind, day, project, task, id)
+AggregatedKey = tuple[str, str, str | None, str | None, str | None]
+# key, project, task, day, duration seconds (None if no entry had a duration), issues, issue type, descriptions
+AggregatedIssue = tuple[AggregatedKey, str, str | None, str, int | None, list[str], str | None, list[str]]
+# resolve issue, issue type and description by task, project, description, task id and project id
+IssueResolver = Callable[
+    [str | None, str | None, str | None, str | None, str | None],
+    tuple[str | None, str | None, str | None],
+]
+
+# project, task, issue, issue type and description of an entry key
+KeyInfo = tuple[str | None, str | None, str | None, str | None, str | None]
+
+COLUMNS = ("day", "seconds", "has_duration", "key", "id")
+KEY_COLUMNS = ("project", "task", "issue", "issue_type", "description")
+
+
+def numpy_available() -> bool:
+    """Check if numpy is installed, which is needed for the columnar engine."""
+    return find_spec("numpy") is not None
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+class PageParts:
+    """Local day parts of the entries of a page, as columns of the entry row, day index and seconds."""
+
+    __slots__ = ("days", "has_duration", "has_parts", "rows", "seconds")
+
+    def __init__(
+        self,
+        rows: "NDArray[np.int64]",
+        days: "NDArray[np.int64]",
+        seconds: "NDArray[np.int64]",
+        has_duration: "NDArray[np.int64]",
+        has_parts: list[bool],
+    ) -> None:
+        """Page parts."""
+        self.rows = rows
+        self.days = days
+        self.seconds = seconds
+        self.has_duration = has_duration
+        self.has_parts = has_parts
+
+
+class ColumnarIssueAggregator:
+    """Decode pages of time entries into columns and aggregate them with numpy.
+
+    The starts of a page are bucketed at once into the local days by a binary search in the day table,
+    only entries over midnight are split one by one. The parts are added as columns of the day index,
+    integer seconds and interned codes of project, task, id, issue, issue type and description.
+    Issue infos are resolved once per distinct values of a page. The sums per day and per issue,
+    the last project/task/type and the unique issues of a key are calculated by group-by over the code columns.
+    Keys are ordered by their first part, so the result has the same order as the per entry aggregation.
+    """
+
+    def __init__(self, bucketer: DayBucketer, sum_kind: str = "sum", issue_kind: str = "issue") -> None:
+        """Columnar issue aggregator."""
+        import numpy as np  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
+
+        self.bucketer = bucketer
+        self.sum_kind = sum_kind
+        self.issue_kind = issue_kind
+        day_starts, self._days = bucketer.day_table()
+        self._day_starts = np.array(day_starts, dtype=np.int64)
+        self._day_indexes = {day: index for index, day in enumerate(self._days)}
+        self._values: dict[str | None, int] = {}
+        # resolved entry keys (task, project, description, task id, project id) with their issue infos and value codes
+        self._keys: dict[tuple[str | None, ...], int] = {}
+        self._key_infos: list[KeyInfo] = []
+        self._key_codes: list[list[int]] = []
+        self._columns: dict[str, list[NDArray[np.int64]]] = {name: [] for name in COLUMNS}
+
+    def add_page(  # pylint: disable=too-many-locals
+        self,
+        page: Iterable[Any],
+        combine: bool,
+        filter_project_name: str | None,
+        filter_task_name: str | None,
+        filter_issue_id: str | None,
+        resolve_issue: IssueResolver,
+        warn_no_issue: Callable[[dict[str, Any]], None],
+        group_by: "GroupByAggregator | None" = None,
+        user_id: str | None = None,
+    ) -> None:
+        """Decode a page of time entries into columns and add the parts of the entries with an issue.
+
+        Entries are filtered like the per entry decoding, without project, outside the range,
+        without issue or not of the filtered issue. An entry without a valid start exits.
+        """
+        works: list[dict[str, Any]] = []
+        projects: list[str] = []
+        for work in page:
+            if not isinstance(work, dict):
+                continue
+            project: str | None = work["project"].get("name") if work.get("project") is not None else None
+            # filter inside project
+            if project is None or (filter_project_name is not None and filter_project_name not in project):
+                logging.debug("there is no 'project name' name specified")
+                continue
+            works.append(work)
+            projects.append(project)
+
+        # parse first all needed values of the page from json
+        time_starts: list[str | None] = [
+            work["timeInterval"].get("start") if work.get("timeInterval") is not None else None for work in works
+        ]
+        starts = [
+            start for time_start in time_starts if time_start and (start := self.bucketer.parse_instant(time_start)) is not None
+        ]
+        if len(starts) != len(works):
+            logging.error("failed to parse current date start")
+            sys.exit(1)
+        parts = self._split(starts, parse_durations(entry_duration(work) for work in works))
+
+        # get needed info like the id from issue, only for entries inside the range and once per distinct values
+        keys: list[int] = []
+        for row, work in enumerate(works):
+            if not parts.has_parts[row]:
+                keys.append(-1)
+                continue
+            task: str | None = work["task"].get("name") if work.get("task") is not None else None
+            if filter_task_name is not None and (task is None or filter_task_name not in task):
+                task = None
+            description = str(work.get("description"))
+            key = (task, projects[row], description, work.get("taskId") if task is not None else None, work.get("projectId"))
+            if (code := self._keys.get(key)) is None:
+                code = self._keys[key] = self._resolve(key, resolve_issue)
+            issue = self._key_infos[code][2]
+            if issue is None:
+                warn_no_issue(
+                    {
+                        "timeStart": time_starts[row],
+                        "task": task,
+                        "project": projects[row],
+                        "description": description,
+                        "timeDuration": entry_duration(work),
+                    },
+                )
+            # filter specific issue
+            keys.append(code if issue is not None and (filter_issue_id is None or filter_issue_id in issue) else -1)
+
+        ids: list[str | None] = [None] * len(works) if combine else [work.get("id", "") for work in works]
+        kept = self._add(parts, keys, ids)
+        if group_by is not None:
+            for row, day, seconds, has_duration in zip(
+                parts.rows[kept].tolist(),
+                parts.days[kept].tolist(),
+                parts.seconds[kept].tolist(),
+                parts.has_duration[kept].tolist(),
+                strict=True,
+            ):
+                project, task, issue, issue_type, description = self._key_infos[keys[row]]
+                decoded_work = (
+                    self._days[day],
+                    str(project),
+                    task,
+                    ids[row],
+                    seconds if has_duration else None,
+                    str(issue),
+                    issue_type,
+                    description,
+                )
+                group_by.add(decoded_work, works[row], user_id)
+
+    def _resolve(self, key: tuple[str | None, ...], resolve_issue: IssueResolver) -> int:
+        """Resolve the issue infos of a new entry key, intern its values and return the code of the key."""
+        task, project, description, task_id, project_id = key
+        key_info: KeyInfo = (project, task, *resolve_issue(task, project, description, task_id, project_id))
+        self._key_infos.append(key_info)
+        self._key_codes.append(self._codes(key_info))
+        return len(self._key_infos) - 1
+
+    def _codes(self, values: Iterable[str | None]) -> list[int]:
+        """Return the interned codes of the values, new values get the next code."""
+        interned = self._values
+        return [interned.setdefault(value, len(interned)) for value in values]
+
+    def _split(self, starts: list[int], durations: list[int | None]) -> PageParts:
+        """Bucket the entries of a page (utc epoch seconds and duration seconds) into their local day parts."""
+        import numpy as np  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
+
+        day_starts = self._day_starts
+        last_index = len(day_starts) - 1
+        start = np.array(starts, dtype=np.int64)
+        has_duration = np.array([duration is not None for duration in durations], dtype=np.int64)
+        seconds = np.array([duration or 0 for duration in durations], dtype=np.int64)
+        index = np.searchsorted(day_starts, start, side="right") - 1
+        in_range = (index >= 0) & (index < last_index)
+
+        # entries over the next midnight are split by the bucketer, like entries before the first day into it
+        crossing = np.zeros(len(starts), dtype=np.bool_)
+        if self.bucketer.split_midnight:
+            next_day_start = day_starts[np.clip(index + 1, 0, last_index)]
+            crossing = (has_duration > 0) & (index < last_index) & (start + seconds > next_day_start)
+        counts = (in_range & ~crossing).astype(np.int64)
+        crossing_rows = np.flatnonzero(crossing).tolist()
+        crossing_parts = [self.bucketer.split(starts[row], durations[row]) for row in crossing_rows]
+        if crossing_rows:
+            counts[crossing_rows] = [len(parts) for parts in crossing_parts]
+
+        rows = np.repeat(np.arange(len(starts), dtype=np.int64), counts)
+        part_days = index[rows]
+        part_seconds = seconds[rows]
+        if crossing_rows:
+            offsets = (np.cumsum(counts) - counts).tolist()
+            for row, parts in zip(crossing_rows, crossing_parts, strict=True):
+                for offset, (day, day_seconds) in enumerate(parts, start=offsets[row]):
+                    part_days[offset] = self._day_indexes[day]
+                    part_seconds[offset] = day_seconds or 0
+        return PageParts(rows, part_days, part_seconds, has_duration[rows], (counts > 0).tolist())
+
+    def _add(self, parts: PageParts, keys: list[int], ids: list[str | None]) -> "NDArray[np.bool_]":
+        """Add the parts of the entries with a key (not -1) of a page and return which parts are added."""
+        import numpy as np  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
+
+        part_keys = np.array(keys, dtype=np.int64)[parts.rows]
+        kept = part_keys >= 0
+        self._columns["day"].append(parts.days[kept])
+        self._columns["seconds"].append(parts.seconds[kept])
+        self._columns["has_duration"].append(parts.has_duration[kept])
+        self._columns["key"].append(part_keys[kept])
+        self._columns["id"].append(np.array(self._codes(ids), dtype=np.int64)[parts.rows[kept]])
+        return kept
+
+    # --------------------------------------------------------------------------
+    #
+    #
+    #
+    # --------------------------------------------------------------------------
+
+    def missing_durations(self) -> Iterator[tuple[str, str, str | None]]:
+        """Yield day, project and task of every issue part without a duration."""
+        import numpy as np  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
+
+        if not self._columns["day"]:
+            return
+        values = list(self._values)
+        columns = self._concatenate()
+        day, project, task = columns["day"], columns["project"], columns["task"]
+        for row in np.flatnonzero(columns["has_duration"] == 0).tolist():
+            yield self._days[day[row]], str(values[project[row]]), values[task[row]]
+
+    def aggregate(self) -> Iterator[AggregatedIssue]:
+        """Yield the aggregated day sums and issues, in order of their first part."""
+        import numpy as np  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
+
+        if not self._columns["day"]:
+            return
+        columns = self._concatenate()
+        if len(columns["day"]) == 0:
+            return
+        day, project, task, issue_type = columns["day"], columns["project"], columns["task"], columns["issue_type"]
+        # every part counts into its day sum and its issue, so both are grouped
+        sum_groups, sum_first = self._groups(day)
+        issue_groups, issue_first = self._groups(day, project, task, columns["id"])
+        sum_seconds, sum_has_duration, sum_last, _ = self._totals(sum_groups, columns)
+        issue_seconds, issue_has_duration, issue_last, issue_order = self._totals(issue_groups, columns)
+
+        values = list(self._values)
+        days = self._days
+        issue_ends = np.cumsum(np.bincount(issue_groups)).tolist()
+        # all descriptions of an issue in the order of its parts, the code lists are sliced per issue
+        descriptions = columns["description"][issue_order].tolist()
+        issues_by_group = self._unique_issues(issue_groups, columns["issue"], len(values))
+
+        # the day sum of a part is added before its issue, like the per entry aggregation does
+        positions = np.concatenate((sum_first * 2, issue_first * 2 + 1))
+        sum_count = len(sum_first)
+        day_list, project_list, task_list, id_list = (columns[name].tolist() for name in ("day", "project", "task", "id"))
+        sum_first_list, issue_first_list = sum_first.tolist(), issue_first.tolist()
+        sum_last_list, issue_type_list = sum_last.tolist(), issue_type[issue_last].tolist()
+        for position in np.argsort(positions, kind="stable").tolist():
+            if position < sum_count:
+                code = position
+                first, last = sum_first_list[code], sum_last_list[code]
+                yield (
+                    (self.sum_kind, days[day_list[first]], None, None, None),
+                    str(values[project_list[last]]),
+                    values[task_list[last]],
+                    days[day_list[first]],
+                    int(sum_seconds[code]) if sum_has_duration[code] > 0 else None,
+                    [],
+                    None,
+                    [],
+                )
+                continue
+            code = position - sum_count
+            first = issue_first_list[code]
+            issue_day, issue_project, issue_task = days[day_list[first]], values[project_list[first]], values[task_list[first]]
+            yield (
+                (self.issue_kind, issue_day, issue_project, issue_task, values[id_list[first]]),
+                str(issue_project),
+                issue_task,
+                issue_day,
+                int(issue_seconds[code]) if issue_has_duration[code] > 0 else None,
+                issues_by_group[code],
+                values[issue_type_list[code]],
+                [
+                    str(values[description])
+                    for description in descriptions[issue_ends[code - 1] if code > 0 else 0 : issue_ends[code]]
+                ],
+            )
+
+    def _concatenate(self) -> "dict[str, NDArray[np.int64]]":
+        """Return the columns of all parts, with the value codes of their entry keys."""
+        import numpy as np  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
+
+        columns = {name: np.concatenate(self._columns[name]) for name in COLUMNS}
+        key_codes = np.array(self._key_codes, dtype=np.int64).reshape(-1, len(KEY_COLUMNS))[columns["key"]]
+        for index, name in enumerate(KEY_COLUMNS):
+            columns[name] = key_codes[:, index]
+        return columns
+
+    def _groups(self, *columns: "NDArray[np.int64]") -> tuple["NDArray[np.int64]", "NDArray[np.int64]"]:
+        """Return the group code of every part by the columns and the first part of every group."""
+        import numpy as np  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
+
+        # the codes are combined column by column and interned again, so they stay smaller than the parts count
+        codes = columns[0]
+        for column in columns[1:]:
+            codes = np.unique(codes * (int(column.max()) + 1) + column, return_inverse=True)[1]
+        _, first, groups = np.unique(codes, return_index=True, return_inverse=True)
+        return groups.astype(np.int64), first.astype(np.int64)
+
+    def _totals(
+        self,
+        groups: "NDArray[np.int64]",
+        columns: "dict[str, NDArray[np.int64]]",
+    ) -> tuple["NDArray[np.float64]", "NDArray[np.float64]", "NDArray[np.int64]", "NDArray[np.int64]"]:
+        """Return the seconds, the count of parts with duration and the last part per group, and the parts ordered by group."""
+        import numpy as np  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
+
+        # seconds are summed as float, which is exact far beyond any worked time
+        seconds = np.bincount(groups, weights=columns["seconds"])
+        has_duration = np.bincount(groups, weights=columns["has_duration"])
+        order = np.argsort(groups, kind="stable")
+        last = order[np.cumsum(np.bincount(groups)) - 1]
+        return seconds, has_duration, last, order
+
+    def _unique_issues(self, groups: "NDArray[np.int64]", issues: "NDArray[np.int64]", value_count: int) -> list[list[str]]:
+        """Return the unique issues per group, in order of their first part."""
+        import numpy as np  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
+
+        values = list(self._values)
+        _, first = np.unique(groups * value_count + issues, return_index=True)
+        issues_by_group: list[list[str]] = [[] for _ in range(int(groups.max()) + 1)]
+        first.sort()
+        for group, issue in zip(groups[first].tolist(), issues[first].tolist(), strict=True):
+            issues_by_group[group].append(str(values[issue]))
+        return issues_by_group
@@ -0,0 +1,225 @@
+"""CLOCKIFY ENTRY STORE."""
+
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import UTC, date, datetime, timedelta
+import json
+import logging
+import sqlite3
+from typing import Any
+
+from vm_clockify.utils.config import settings
+from vm_clockify.utils.utils_helper import create_service_folder
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+class ClockifyEntryStore:
+    """Local sqlite store of hydrated clockify time entries.
+
+    Entries are keyed by workspace, user and entry id and bucketed by the (UTC) day of their start.
+    For every synced day a watermark with the sync time is saved, a day is only requested again
+    from clockify if it was not synced at least "CLOCKIFY_STORE_SETTLE_DAYS" after it ended.
+    The database runs in WAL mode and writes inside "BEGIN IMMEDIATE" transactions,
+    so multiple cli processes can use the same store at the same time.
+    Aggregated rollups per local day are saved with the content hash of their entries,
+    by a context of the aggregation options, to only aggregate changed days again.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """Clockify entry store."""
+        self.path = path if path is not None else f"{create_service_folder()}/{settings.CLOCKIFY_STORE_FILE}"
+        with self._connect() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS time_entries (
+                    workspace_id TEXT NOT NULL,
+                    user_id      TEXT NOT NULL,
+                    entry_id     TEXT NOT NULL,
+                    day          TEXT NOT NULL,
+                    time_start   TEXT NOT NULL,
+                    payload      TEXT NOT NULL,
+                    PRIMARY KEY (workspace_id, user_id, entry_id)
+                );
+                CREATE INDEX IF NOT EXISTS time_entries_day ON time_entries (workspace_id, user_id, day);
+                CREATE TABLE IF NOT EXISTS synced_days (
+                    workspace_id TEXT NOT NULL,
+                    user_id      TEXT NOT NULL,
+                    day          TEXT NOT NULL,
+                    synced_at    TEXT NOT NULL,
+                    PRIMARY KEY (workspace_id, user_id, day)
+                );
+                CREATE TABLE IF NOT EXISTS day_rollups (
+                    workspace_id TEXT NOT NULL,
+                    user_id      TEXT NOT NULL,
+                    context      TEXT NOT NULL,
+                    day          TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    payload      TEXT NOT NULL,
+                    PRIMARY KEY (workspace_id, user_id, context, day)
+                );
+                """,
+            )
+        logging.log(logging.DEBUG, "clockify-entry-store is initiated: %s", self.path)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=settings.CLOCKIFY_STORE_BUSY_TIMEOUT, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            yield conn
+        finally:
+            conn.close()
+
+    # --------------------------------------------------------------------------
+    #
+    #
+    #
+    # --------------------------------------------------------------------------
+
+    def missing_windows(self, workspace_id: str, user_id: str, first_day: date, last_day: date) -> list[tuple[date, date]]:
+        """Return the continuous day windows inside the range, which needs to be requested from clockify."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT day, synced_at FROM synced_days WHERE workspace_id = ? AND user_id = ? AND day BETWEEN ? AND ?",
+                (workspace_id, user_id, first_day.isoformat(), last_day.isoformat()),
+            ).fetchall()
+        synced: dict[str, datetime] = {day: datetime.fromisoformat(synced_at) for day, synced_at in rows}
+        settle = timedelta(days=settings.CLOCKIFY_STORE_SETTLE_DAYS + 1)
+
+        windows: list[tuple[date, date]] = []
+        window_start: date | None = None
+        current_day = first_day
+        while current_day <= last_day:
+            synced_at = synced.get(current_day.isoformat())
+            settled_at = datetime(current_day.year, current_day.month, current_day.day, tzinfo=UTC) + settle
+            if synced_at is None or synced_at < settled_at:
+                window_start = current_day if window_start is None else window_start
+            elif window_start is not None:
+                windows.append((window_start, current_day - timedelta(days=1)))
+                window_start = None
+            current_day += timedelta(days=1)
+        if window_start is not None:
+            windows.append((window_start, last_day))
+        return windows
+
+    def replace_window(
+        self,
+        workspace_id: str,
+        user_id: str,
+        first_day: date,
+        last_day: date,
+        entries: Iterable[Any],
+    ) -> None:
+        """Replace all entries of the day window with the new requested ones and mark the days as synced.
+
+        The entries are consumed lazy into a temporary table first, so the store is only locked
+        for the final replace and not while the entries are requested.
+        """
+        synced_at = datetime.now(tz=UTC).isoformat()
+        days: list[tuple[str, str, str, str]] = []
+        current_day = first_day
+        while current_day <= last_day:
+            days.append((workspace_id, user_id, current_day.isoformat(), synced_at))
+            current_day += timedelta(days=1)
+
+        with self._connect() as conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS window_entries AS SELECT * FROM time_entries WHERE 0")
+            conn.execute("DELETE FROM window_entries")
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR REPLACE INTO window_entries VALUES (?, ?, ?, ?, ?, ?)",
+                self._entry_rows(workspace_id, user_id, entries),
+            )
+            conn.execute("COMMIT")
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "DELETE FROM time_entries WHERE workspace_id = ? AND user_id = ? AND day BETWEEN ? AND ?",
+                    (workspace_id, user_id, first_day.isoformat(), last_day.isoformat()),
+                )
+                stored = conn.execute("INSERT OR REPLACE INTO time_entries SELECT * FROM window_entries").rowcount
+                conn.executemany("INSERT OR REPLACE INTO synced_days VALUES (?, ?, ?, ?)", days)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        logging.log(logging.DEBUG, "stored %s entries for %s - %s", stored, first_day, last_day)
+
+    def _entry_rows(self, workspace_id: str, user_id: str, entries: Iterable[Any]) -> Iterator[tuple[str, ...]]:
+        for work in entries:
+            if not isinstance(work, dict) or work.get("id") is None or work.get("timeInterval") is None:
+                continue
+            time_start: str | None = work["timeInterval"].get("start", None)
+            if time_start is None:
+                continue
+            yield (workspace_id, user_id, work["id"], time_start[:10], time_start, json.dumps(work))
+
+    def iter_entries(self, workspace_id: str, user_id: str, first_day: date, last_day: date) -> Iterator[Any]:
+        """Yield the stored entries of the range, ordered like clockify by their start (newest first)."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "SELECT payload FROM time_entries WHERE workspace_id = ? AND user_id = ? AND day BETWEEN ? AND ? "
+                "ORDER BY time_start DESC, entry_id",
+                (workspace_id, user_id, first_day.isoformat(), last_day.isoformat()),
+            )
+            for (payload,) in cursor:
+                yield json.loads(payload)
+
+    # --------------------------------------------------------------------------
+    #
+    #
+    #
+    # --------------------------------------------------------------------------
+
+    def load_rollups(
+        self,
+        workspace_id: str,
+        user_id: str,
+        context: str,
+        first_day: str,
+        last_day: str,
+    ) -> dict[str, tuple[str, Any]]:
+        """Return the saved rollups of the local days range by day, as content hash and payload."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT day, content_hash, payload FROM day_rollups "
+                "WHERE workspace_id = ? AND user_id = ? AND context = ? AND day BETWEEN ? AND ?",
+                (workspace_id, user_id, context, first_day, last_day),
+            ).fetchall()
+        return {day: (content_hash, json.loads(payload)) for day, content_hash, payload in rows}
+
+    def save_rollups(
+        self,
+        workspace_id: str,
+        user_id: str,
+        context: str,
+        rollups: dict[str, tuple[str, Any]],
+        stale_days: Iterable[str] = (),
+    ) -> None:
+        """Save the changed rollups by day and remove the ones of days, which have no entries anymore."""
+        rows = [
+            (workspace_id, user_id, context, day, content_hash, json.dumps(payload))
+            for day, (content_hash, payload) in rollups.items()
+        ]
+        stale_rows = [(workspace_id, user_id, context, day) for day in stale_days]
+        if not rows and not stale_rows:
+            return
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "DELETE FROM day_rollups WHERE workspace_id = ? AND user_id = ? AND context = ? AND day = ?",
+                    stale_rows,
+                )
+                conn.executemany("INSERT OR REPLACE INTO day_rollups VALUES (?, ?, ?, ?, ?, ?)", rows)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        logging.log(logging.DEBUG, "saved %s day rollups, removed %s", len(rows), len(stale_rows))
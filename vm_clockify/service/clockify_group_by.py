@@ -0,0 +1,116 @@
+"""CLOCKIFY GROUP BY."""
+
+from datetime import date
+from itertools import product
+import threading
+from typing import Any
+
+from vm_clockify.service.clockify_columnar import DecodedWork
+
+GROUP_BY_DIMENSIONS = ("day", "week", "month", "project", "task", "issue", "issue_type", "tag", "user")
+GROUP_BY_EMPTY = "-"
+
+
+def parse_group_by(value: str | None) -> tuple[str, ...]:
+    """Parse comma separated dimensions like "week,project", raise a ValueError for unknown ones."""
+    if not value:
+        return ()
+    dimensions = tuple(item.strip() for item in value.split(",") if item.strip())
+    unknown = [dimension for dimension in dimensions if dimension not in GROUP_BY_DIMENSIONS]
+    if unknown:
+        msg = f"unknown group by dimension {', '.join(unknown)}, possible are: {', '.join(GROUP_BY_DIMENSIONS)}"
+        raise ValueError(msg)
+    return dimensions
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+class GroupTotal:
+    """Total seconds and entry count of a group, with the totals of its sub groups."""
+
+    __slots__ = ("count", "groups", "seconds")
+
+    def __init__(self) -> None:
+        """Group total."""
+        self.seconds = 0
+        self.count = 0
+        self.groups: dict[str, GroupTotal] = {}
+
+    def to_dict(self) -> dict[str, Any]:
+        """Nested dict of the totals, to be serialized as json."""
+        values: dict[str, Any] = {"seconds": self.seconds, "count": self.count}
+        if self.groups:
+            values["groups"] = {name: group.to_dict() for name, group in self.groups.items()}
+        return values
+
+
+class GroupByAggregator:
+    """Aggregate decoded time entries by any list of dimensions into nested totals, in one pass.
+
+    Every entry is added to the total of each level of its group path, like for "week,project"
+    into the total, the total of its week and the total of its project inside the week.
+    An entry with multiple tags is added to each of its tags (the groups above them only once),
+    entries without a value are grouped as "-".
+    One aggregator can be shared by the users of a batch (also from threads), the total is the one of all users.
+    """
+
+    def __init__(self, dimensions: tuple[str, ...]) -> None:
+        """Group by aggregator."""
+        self.dimensions = dimensions
+        self.total = GroupTotal()
+        self._weeks: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def add(self, decoded_work: DecodedWork, work: dict[str, Any], user_id: str | None = None) -> None:
+        """Add a decoded time entry of the user, the raw entry is needed for its tags (and the user without one)."""
+        with self._lock:
+            self._add(decoded_work, work, user_id)
+
+    def _add(self, decoded_work: DecodedWork, work: dict[str, Any], user_id: str | None) -> None:
+        day, project, task, _, duration_seconds, issue, issue_type, _ = decoded_work
+        seconds = duration_seconds or 0
+        values: list[list[str]] = []
+        for dimension in self.dimensions:
+            if dimension == "day":
+                values.append([day])
+            elif dimension == "week":
+                values.append([self._week(day)])
+            elif dimension == "month":
+                values.append([day[:7]])
+            elif dimension == "project":
+                values.append([project])
+            elif dimension == "task":
+                values.append([task or GROUP_BY_EMPTY])
+            elif dimension == "issue":
+                values.append([issue])
+            elif dimension == "issue_type":
+                values.append([issue_type or GROUP_BY_EMPTY])
+            elif dimension == "tag":
+                tags = [str(tag.get("name")) for tag in work.get("tags") or [] if isinstance(tag, dict)]
+                values.append(list(dict.fromkeys(tags)) or [GROUP_BY_EMPTY])
+            elif dimension == "user":
+                values.append([str(user_id or work.get("userId") or GROUP_BY_EMPTY)])
+
+        self.total.seconds += seconds
+        self.total.count += 1
+        # every group of the entry is added once, also a group above a dimension with multiple values (like tags)
+        prefixes = dict.fromkeys(path[:depth] for path in product(*values) for depth in range(1, len(path) + 1))
+        nodes: dict[tuple[str, ...], GroupTotal] = {(): self.total}
+        for prefix in prefixes:
+            parent = nodes[prefix[:-1]]
+            child = parent.groups.get(prefix[-1])
+            if child is None:
+                child = parent.groups[prefix[-1]] = GroupTotal()
+            child.seconds += seconds
+            child.count += 1
+            nodes[prefix] = child
+
+    def _week(self, day: str) -> str:
+        week = self._weeks.get(day)
+        if week is None:
+            iso_year, iso_week, _ = date.fromisoformat(day).isocalendar()
+            week = self._weeks[day] = f"{iso_year}-W{iso_week:02d}"
+        return week
@@ -0,0 +1,88 @@
+"""CLOCKIFY HANDOFF."""
+
+from collections.abc import Iterable, Iterator
+import json
+from pathlib import Path
+
+from vm_clockify.service.clockify_issue_time import KEY_BUFFER, KEY_ISSUE, KEY_SUM, IssueKey, IssueTime
+from vm_clockify.utils.config import settings
+
+HANDOFF_FORMAT: str = "vm-clockify-times"
+HANDOFF_VERSION: int = 1
+# key prefix of the day sums in the released format (version 0)
+LEGACY_PREFIX_SUM: str = "-> sum:"
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+def write_handoff(path: str | Path, issues: Iterable[tuple[IssueKey, IssueTime]]) -> int:
+    """Write the issues as handoff for other services, like the youtrack upload, return the count of records.
+
+    The handoff is line delimited json, a header line with format and version and one compact record per line.
+    It is written into a temporary file first and replaced at the end, so a reader never sees a half written file.
+    """
+    tmp_path = Path(f"{path}.tmp")
+    count = 0
+    with tmp_path.open(mode="w", encoding="utf-8") as f:
+        f.write(json.dumps({"format": HANDOFF_FORMAT, "version": HANDOFF_VERSION}) + "\n")
+        for key, issue in issues:
+            values = issue.to_dict()
+            # hours and minutes are only a view of the seconds
+            values.pop("duration", None)
+            f.write(json.dumps({"key": key, **values}, separators=(",", ":")) + "\n")
+            count += 1
+    tmp_path.replace(path)
+    return count
+
+
+def iter_handoff(path: str | Path) -> Iterator[tuple[IssueKey, IssueTime]]:
+    """Yield the issues of a handoff lazy record by record, also of the released single json object format."""
+    with Path(path).open(encoding="utf-8") as f:
+        first_line = f.readline()
+        try:
+            header = json.loads(first_line) if first_line.strip() else None
+        except ValueError:
+            header = None
+        if not isinstance(header, dict) or header.get("format") != HANDOFF_FORMAT:
+            # released format (version 0), the complete handoff as one json object
+            f.seek(0)
+            try:
+                document = json.load(f)
+            except ValueError as e:
+                msg = f"handoff '{path}' is not a valid times file, run 'clockify times' again"
+                raise ValueError(msg) from e
+            yield from _iter_legacy_handoff(path, document)
+            return
+        if header.get("version", 0) > HANDOFF_VERSION:
+            msg = f"handoff version {header.get('version')} is not supported (max {HANDOFF_VERSION}), update vm-clockify"
+            raise ValueError(msg)
+        for line in f:
+            if line.strip():
+                values = json.loads(line)
+                yield tuple(values["key"]), IssueTime.from_dict(values)
+
+
+def _iter_legacy_handoff(path: str | Path, document: object) -> Iterator[tuple[IssueKey, IssueTime]]:
+    """Yield the issues of the released format (version 0), records keyed by formatted strings."""
+    if not isinstance(document, dict) or not all(isinstance(values, dict) for values in document.values()):
+        msg = f"handoff '{path}' has an unknown format, run 'clockify times' again"
+        raise ValueError(msg)
+    for legacy_key, values in document.items():
+        issue = IssueTime.from_dict(values)
+        yield _legacy_key(str(legacy_key), issue), issue
+
+
+def _legacy_key(legacy_key: str, issue: IssueTime) -> IssueKey:
+    """Convert a key of the released format, like "-> sum:_{day}" or "{day}_{project}_{task}_{id}", into an issue key."""
+    if legacy_key.startswith(LEGACY_PREFIX_SUM):
+        return KEY_SUM, issue.issue_date or legacy_key.removeprefix(f"{LEGACY_PREFIX_SUM}_"), None, None, None
+    day = issue.issue_date or ""
+    buffer_issue = settings.WORK_TIME_DEFAULT_ISSUE
+    if buffer_issue is not None and legacy_key == f"{buffer_issue}_{day}_{issue.project}_{issue.task}":
+        return KEY_BUFFER, day, issue.project, issue.task, buffer_issue
+    # the clockify entry id, "None" if entries were combined
+    clockify_id = legacy_key.removeprefix(f"{day}_{issue.project}_{issue.task}_")
+    return KEY_ISSUE, day, issue.project, issue.task, None if clockify_id == "None" else clockify_id
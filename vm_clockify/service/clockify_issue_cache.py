@@ -0,0 +1,156 @@
+"""CLOCKIFY ISSUE CACHE."""
+
+from collections import OrderedDict
+from collections.abc import Callable
+import json
+import logging
+from pathlib import Path
+import threading
+from typing import Any
+
+from vm_clockify.utils.config import settings
+from vm_clockify.utils.issue_tag_helper import find_issue_tag, parse_issue_tag, strip_issue_tag
+from vm_clockify.utils.utils_helper import create_service_folder
+
+# resolved issue id and issue type, None if no tag was found at all
+IssueInfo = tuple[str | None, str | None] | None
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+class IssueInfoCache:
+    """Bounded LRUs of the resolved issue infos by task and project names, of the tags and of the descriptions.
+
+    Entries of the same task and project resolve to the same issue, so the tags of the names
+    are only scanned and parsed once, like the tags of descriptions, which repeat a lot too.
+    With "CLOCKIFY_ISSUE_CACHE_PERSIST" the resolved issue info of the task and project names is saved
+    by the clockify project/task id, the names are saved with it to detect renamed projects or tasks,
+    so warm runs return it without scanning or parsing the names.
+    """
+
+    def __init__(self, max_size: int | None = None, path: str | None = None) -> None:
+        """Issue info cache."""
+        self.max_size = max(max_size if max_size is not None else settings.CLOCKIFY_ISSUE_CACHE_SIZE, 1)
+        if path is None and settings.CLOCKIFY_ISSUE_CACHE_PERSIST:
+            path = f"{create_service_folder()}/{settings.CLOCKIFY_ISSUE_CACHE_FILE}"
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.name_hits = 0
+        self._lock = threading.Lock()
+        self._names: OrderedDict[tuple[str | None, str | None], IssueInfo] = OrderedDict()
+        self._tags: OrderedDict[str, IssueInfo] = OrderedDict()
+        self._descriptions: OrderedDict[str, tuple[str | None, str]] = OrderedDict()
+        self._stored: dict[str, dict[str, Any]] | None = None
+        self._stored_changed = False
+
+    # --------------------------------------------------------------------------
+    #
+    #
+    #
+    # --------------------------------------------------------------------------
+
+    def resolve(
+        self,
+        task: str | None,
+        project: str | None,
+        description_tag: str | None,
+        task_id: str | None = None,
+        project_id: str | None = None,
+    ) -> IssueInfo:
+        """Resolve the issue id and type, a tag in the project wins over the task and the task over the description."""
+        info, hit = self._cached(self._names, (task, project), lambda: self._names_info(task, project, task_id, project_id))
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if info is None and description_tag is not None:
+            info = self._tag_info(description_tag)
+        return info
+
+    def description(self, value: str) -> tuple[str | None, str]:
+        """Return the tag of the description and the description without it, unchanged if it has no tag."""
+        if "[" not in value:
+            return None, value
+
+        def split() -> tuple[str | None, str]:
+            tag = find_issue_tag(value)
+            return tag, strip_issue_tag(value) if tag is not None else value
+
+        return self._cached(self._descriptions, value, split)[0]
+
+    def _tag_info(self, tag: str) -> IssueInfo:
+        def parse() -> IssueInfo:
+            parsed = parse_issue_tag(tag)
+            return parsed.get("i"), parsed.get("t")
+
+        return self._cached(self._tags, tag, parse)[0]
+
+    def _cached[K, V](self, entries: OrderedDict[K, V], key: K, create: Callable[[], V]) -> tuple[V, bool]:
+        """Return the cached value of the key or create it, and if it was cached."""
+        with self._lock:
+            if key in entries:
+                entries.move_to_end(key)
+                return entries[key], True
+
+        value = create()
+        with self._lock:
+            entries[key] = value
+            if len(entries) > self.max_size:
+                entries.popitem(last=False)
+        return value, False
+
+    def _names_info(self, task: str | None, project: str | None, task_id: str | None, project_id: str | None) -> IssueInfo:
+        ids_key = f"{project_id}/{task_id or ''}" if self.path is not None and project_id is not None else None
+        if ids_key is not None:
+            with self._lock:
+                stored = self._load_stored().get(ids_key)
+                if stored is not None and "info" in stored and stored.get("project") == project and stored.get("task") == task:
+                    self.name_hits += 1
+                    return (stored["info"][0], stored["info"][1]) if stored["info"] is not None else None
+
+        tag: str | None = None
+        for name in (task, project):
+            name_tag = find_issue_tag(name) if name is not None else None
+            if name_tag is not None:
+                tag = name_tag
+        info = self._tag_info(tag) if tag is not None else None
+
+        if ids_key is not None:
+            with self._lock:
+                self._load_stored()[ids_key] = {"project": project, "task": task, "info": info}
+                self._stored_changed = True
+        return info
+
+    def _load_stored(self) -> dict[str, dict[str, Any]]:
+        if self._stored is None:
+            stored: dict[str, dict[str, Any]] = {}
+            if self.path is not None and Path(self.path).exists():
+                try:
+                    with Path(self.path).open(encoding="utf-8") as f:
+                        stored = json.load(f)
+                except (OSError, ValueError) as e:
+                    logging.log(logging.WARNING, "issue cache could not be read, it is created again: %s", e)
+            self._stored = stored
+        return self._stored
+
+    def save(self) -> None:
+        """Write the issue infos of the task and project names to the cache file, if persist is enabled and they changed."""
+        with self._lock:
+            if self.path is None or self._stored is None or not self._stored_changed:
+                return
+            tmp_path = Path(f"{self.path}.tmp")
+            with tmp_path.open(mode="w", encoding="utf-8") as f:
+                json.dump(self._stored, f)
+            tmp_path.replace(self.path)
+            self._stored_changed = False
+
+    def stats(self) -> str:
+        """Hit and miss counters of the names as text."""
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"{self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate), {self.name_hits} names from cache file"
@@ -0,0 +1,90 @@
+"""CLOCKIFY ISSUE TIME."""
+
+from typing import Any
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+# key of an aggregated issue as (kind, day, project, task, id), kinds are "sum" for the overview of a day,
+# "issue" with the clockify entry id (None if combined) and "buffer" with the buffer issue as id
+IssueKey = tuple[str, str, str | None, str | None, str | None]
+KEY_SUM: str = "sum"
+KEY_ISSUE: str = "issue"
+KEY_BUFFER: str = "buffer"
+
+
+class IssueTime:
+    """Issue Time.
+
+    The work time is kept as integer seconds, hours and minutes are only views of it.
+    """
+
+    __slots__ = ("description", "duration_seconds", "issue", "issue_date", "issue_type", "project", "task")
+
+    def __init__(
+        self,
+        project: str | None = None,
+        task: str | None = None,
+        issue_date: str | None = None,
+        duration_seconds: int | None = None,
+        issue: list[str] | None = None,
+        description: list[str] | None = None,
+        issue_type: str | None = None,
+    ) -> None:
+        """Init."""
+        self.project = project
+        self.task = task
+        self.issue_date = issue_date
+        self.duration_seconds = duration_seconds
+        self.issue = issue if issue is not None else []
+        self.description = description if description is not None else []
+        self.issue_type = issue_type
+
+    @property
+    def hours(self) -> int:
+        """Full hours of the work time."""
+        return (self.duration_seconds or 0) // 3600
+
+    @property
+    def minutes(self) -> int:
+        """Minutes of the work time, without the full hours."""
+        return (self.duration_seconds or 0) % 3600 // 60
+
+    @property
+    def duration(self) -> dict[str, int]:
+        """Work time as hours and minutes, empty if no work time was set."""
+        if self.duration_seconds is None:
+            return {}
+        return {"h": self.hours, "m": self.minutes}
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to a dictionary, the work time also as hours and minutes."""
+        return {
+            "project": self.project,
+            "task": self.task,
+            "issue_date": self.issue_date,
+            "duration_seconds": self.duration_seconds,
+            "duration": self.duration,
+            "issue": self.issue,
+            "description": self.description,
+            "issue_type": self.issue_type,
+        }
+
+    @classmethod
+    def from_dict(cls, values: dict[str, Any]) -> "IssueTime":
+        """Create from a dictionary of "to_dict", also of former versions with the work time only as hours and minutes."""
+        duration_seconds: int | None = values.get("duration_seconds")
+        duration: dict[str, int] | None = values.get("duration")
+        if duration_seconds is None and duration:
+            duration_seconds = int(duration.get("h", 0)) * 3600 + int(duration.get("m", 0)) * 60
+        return cls(
+            project=values.get("project"),
+            task=values.get("task"),
+            issue_date=values.get("issue_date"),
+            duration_seconds=duration_seconds,
+            issue=values.get("issue"),
+            description=values.get("description"),
+            issue_type=values.get("issue_type"),
+        )
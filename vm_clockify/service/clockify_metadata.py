@@ -0,0 +1,164 @@
+"""CLOCKIFY METADATA."""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+import json
+import logging
+from pathlib import Path
+import sys
+from typing import Any
+
+from vm_clockify.utils.config import settings
+from vm_clockify.utils.http_helper import http_clients
+from vm_clockify.utils.utils_helper import create_service_folder
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+class ClockifyMetadataIndex:
+    """Projects, tasks and tags of a workspace by their id, to hydrate not hydrated time entries locally.
+
+    Archived projects and tags are part of the index, entries of past ranges use them too.
+    The index is cached as json file per workspace and requested again after "CLOCKIFY_METADATA_TTL" seconds.
+    """
+
+    page_size: int = 5000
+
+    def __init__(
+        self,
+        workspace_id: str,
+        projects: dict[str, dict[str, Any]],
+        tasks: dict[str, dict[str, Any]],
+        tags: dict[str, dict[str, Any]],
+        fetched_at: datetime,
+    ) -> None:
+        """Clockify metadata index."""
+        self.workspace_id = workspace_id
+        self.projects = projects
+        self.tasks = tasks
+        self.tags = tags
+        self.fetched_at = fetched_at
+
+    # --------------------------------------------------------------------------
+    #
+    #
+    #
+    # --------------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, workspace_id: str, force: bool = False) -> "ClockifyMetadataIndex":
+        """Load the index from the cache file, or request it from clockify if it is outdated."""
+        cache_path = Path(f"{create_service_folder()}/{settings.CLOCKIFY_METADATA_FILE}_{workspace_id}.json")
+        if not force and cache_path.exists():
+            try:
+                with cache_path.open(encoding="utf-8") as f:
+                    cached = json.load(f)
+                fetched_at = datetime.fromisoformat(cached["fetched_at"])
+                if datetime.now(tz=UTC) - fetched_at < timedelta(seconds=settings.CLOCKIFY_METADATA_TTL):
+                    logging.log(logging.DEBUG, "use cached clockify metadata from %s", fetched_at)
+                    return cls(workspace_id, cached["projects"], cached["tasks"], cached["tags"], fetched_at)
+            except (OSError, ValueError, KeyError) as e:
+                logging.log(logging.WARNING, "cached clockify metadata could not be read, request it again: %s", e)
+
+        index = cls.request(workspace_id)
+        tmp_path = cache_path.with_suffix(".tmp")
+        with tmp_path.open(mode="w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "fetched_at": index.fetched_at.isoformat(),
+                    "projects": index.projects,
+                    "tasks": index.tasks,
+                    "tags": index.tags,
+                },
+                f,
+            )
+        tmp_path.replace(cache_path)
+        return index
+
+    @classmethod
+    def request(cls, workspace_id: str) -> "ClockifyMetadataIndex":
+        """Request projects (with their tasks) and tags of the workspace from clockify concurrently, also archived ones."""
+        logging.log(logging.DEBUG, "request clockify metadata for workspace %s", workspace_id)
+        fetched_at = datetime.now(tz=UTC)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            projects_futures = [
+                executor.submit(cls._request_all, f"workspaces/{workspace_id}/projects", hydrated=True, archived=archived)
+                for archived in (False, True)
+            ]
+            tags_futures = [
+                executor.submit(cls._request_all, f"workspaces/{workspace_id}/tags", archived=archived)
+                for archived in (False, True)
+            ]
+            index = cls(workspace_id, {}, {}, {}, fetched_at)
+            for future in projects_futures:
+                for project in future.result():
+                    index.learn({"project": project, "tags": []})
+                    for task in project.get("tasks") or []:
+                        index.learn({"task": {**task, "projectId": project["id"]}, "tags": []})
+            for future in tags_futures:
+                index.learn({"tags": future.result()})
+        return index
+
+    @classmethod
+    def _request_all(cls, path: str, hydrated: bool = False, archived: bool | None = None) -> list[dict[str, Any]]:
+        headers = {
+            "content-type": "application/json",
+            "X-Api-Key": str(settings.CLOCKIFY_API_KEY),
+        }
+        params: dict[str, Any] = {"page-size": cls.page_size}
+        if hydrated:
+            params["hydrated"] = True
+        if archived is not None:
+            params["archived"] = archived
+        items: list[dict[str, Any]] = []
+        page_number = 1
+        while True:
+            res = http_clients.client().get(
+                f"{settings.CLOCKIFY_API_ENDPOINT}/{path}",
+                headers=headers,
+                params={**params, "page": page_number},
+            )
+            if res.status_code != 200:
+                logging.error("api call to get '%s' failed with code '%s' because of '%s'", path, res.status_code, res.text)
+                sys.exit(1)
+            parsed = res.json()
+            items.extend(parsed)
+            if len(parsed) < cls.page_size:
+                return items
+            page_number += 1
+
+    # --------------------------------------------------------------------------
+    #
+    #
+    #
+    # --------------------------------------------------------------------------
+
+    def hydrate(self, work: dict[str, Any]) -> bool:
+        """Set project, task and tags of a not hydrated entry by its ids, returns false if an id is not known."""
+        resolved = True
+        project_id: str | None = work.get("projectId")
+        if project_id is not None:
+            work["project"] = self.projects.get(project_id)
+            resolved = resolved and work["project"] is not None
+        task_id: str | None = work.get("taskId")
+        if task_id is not None:
+            work["task"] = self.tasks.get(task_id)
+            resolved = resolved and work["task"] is not None
+        tag_ids: list[str] = work.get("tagIds") or []
+        work["tags"] = [self.tags[tag_id] for tag_id in tag_ids if tag_id in self.tags]
+        return resolved and len(work["tags"]) == len(tag_ids)
+
+    def learn(self, work: dict[str, Any]) -> None:
+        """Add project, task and tags of a hydrated entry, like of a single requested entry, which were not known."""
+        project = work.get("project")
+        if isinstance(project, dict) and project.get("id") is not None:
+            self.projects[project["id"]] = {"id": project["id"], "name": project.get("name")}
+        task = work.get("task")
+        if isinstance(task, dict) and task.get("id") is not None:
+            self.tasks[task["id"]] = {"id": task["id"], "name": task.get("name"), "projectId": task.get("projectId")}
+        for tag in work.get("tags") or []:
+            if isinstance(tag, dict) and tag.get("id") is not None:
+                self.tags[tag["id"]] = {"id": tag["id"], "name": tag.get("name")}
@@ -0,0 +1,402 @@
+"""CLOCKIFY RECORDS."""
+
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, timedelta
+from itertools import islice
+import logging
+from queue import Full, Queue
+import sys
+import threading
+from typing import TYPE_CHECKING, Any
+
+import httpx
+
+from vm_clockify.service.clockify_entry_store import ClockifyEntryStore
+from vm_clockify.service.clockify_metadata import ClockifyMetadataIndex
+from vm_clockify.utils.config import settings
+from vm_clockify.utils.diagnostics_helper import Diagnostics
+from vm_clockify.utils.http_helper import http_clients
+from vm_clockify.utils.utils_helper import iter_json_array
+
+if TYPE_CHECKING:
+    from httpx._types import QueryParamTypes
+
+WARN_UNKNOWN_METADATA = "project, task or tags of the entry are not known and could not be requested, check the entry"
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+class ClockifyRecordsFetcher:
+    """Request time entries from clockify.
+
+    Pages are requested with prefetch, long ranges in concurrent shards
+    and synced days are read from the local store.
+    """
+
+    format_date_date_start: str = "%Y-%m-%dT00:00:00.000Z"
+    format_date_date_end: str = "%Y-%m-%dT23:59:59.000Z"
+
+    # --------------------------------------------------------------------------
+    #
+    #
+    #
+    # --------------------------------------------------------------------------
+    def __init__(self, diagnostics: Diagnostics | None = None) -> None:
+        """Clockify records fetcher."""
+        self.diagnostics = diagnostics if diagnostics is not None else Diagnostics()
+        self._store: ClockifyEntryStore | None = None
+        self._store_lock = threading.Lock()
+        self._metadata: dict[str, Future[ClockifyMetadataIndex]] = {}
+        self._metadata_lock = threading.Lock()
+        self._metadata_refreshed: set[str] = set()
+
+    # --------------------------------------------------------------------------
+    #
+    #
+    #
+    # --------------------------------------------------------------------------
+
+    def iter_records(
+        self,
+        workspace_id: str,
+        user_id: str,
+        start_day: str,
+        end_day: str,
+        page_size: int = 50,
+        refresh: bool = False,
+    ) -> Iterator[Any]:
+        """Yield all time entries of the range, from the local store and only request windows not synced yet.
+
+        Start and end day needs to be in format: "%Y-%m-%dT00:00:00.000Z" and "%Y-%m-%dT23:59:59.000Z".
+        With refresh the complete range is requested again.
+        """
+        first_day = date.fromisoformat(start_day[:10])
+        last_day = date.fromisoformat(end_day[:10])
+        if not settings.CLOCKIFY_STORE_ENABLED:
+            yield from self.iter_records_sharded(workspace_id, user_id, first_day, last_day, page_size)
+            return
+
+        store = self.store
+        windows = [(first_day, last_day)] if refresh else store.missing_windows(workspace_id, user_id, first_day, last_day)
+        for window_start, window_end in windows:
+            logging.log(logging.DEBUG, "request not synced window %s - %s from clockify", window_start, window_end)
+            store.replace_window(
+                workspace_id,
+                user_id,
+                window_start,
+                window_end,
+                self.iter_records_sharded(workspace_id, user_id, window_start, window_end, page_size),
+            )
+        yield from store.iter_entries(workspace_id, user_id, first_day, last_day)
+
+    def iter_records_sharded(
+        self,
+        workspace_id: str,
+        user_id: str,
+        first_day: date,
+        last_day: date,
+        page_size: int = 50,
+    ) -> Iterator[Any]:
+        """Yield all time entries of the days range, long ranges are split into shards and requested concurrently.
+
+        The shards are requested by "CLOCKIFY_FETCH_CONCURRENCY" at the same time and merged in order
+        (newest first, like clockify returns them), entries on the border of two shards are dropped by their id.
+        """
+        concurrency = max(settings.CLOCKIFY_FETCH_CONCURRENCY, 1)
+        shards = iter(self._shard_range(first_day, last_day))
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+
+            def submit(shard: tuple[date, date]) -> Queue[list[Any] | BaseException | None]:
+                # the pages of a shard are passed by a small queue, so not merged shards can not fill the memory
+                pages: Queue[list[Any] | BaseException | None] = Queue(maxsize=2)
+                executor.submit(self._fetch_shard, pages, stop, workspace_id, user_id, shard, page_size)
+                return pages
+
+            # only "concurrency" shards are requested ahead of the one which is merged
+            pending: deque[Queue[list[Any] | BaseException | None]] = deque(
+                submit(shard) for shard in islice(shards, concurrency)
+            )
+            previous_ids: set[str] = set()
+            try:
+                while pending:
+                    pages = pending.popleft()
+                    shard_ids: set[str] = set()
+                    while (page := pages.get()) is not None:
+                        if isinstance(page, BaseException):
+                            raise page
+                        yield from self._drop_seen(page, previous_ids, shard_ids)
+                    previous_ids = shard_ids
+                    pending.extend(submit(shard) for shard in islice(shards, 1))
+            finally:
+                stop.set()
+
+    def _drop_seen(self, page: list[Any], seen_ids: set[str], page_ids: set[str]) -> Iterator[Any]:
+        """Yield the entries not in seen ids, the ids of the yielded entries are added to page ids."""
+        for work in page:
+            work_id = work.get("id") if isinstance(work, dict) else None
+            if work_id is not None:
+                if work_id in seen_ids:
+                    continue
+                page_ids.add(work_id)
+            yield work
+
+    def _fetch_shard(
+        self,
+        pages: Queue[list[Any] | BaseException | None],
+        stop: threading.Event,
+        workspace_id: str,
+        user_id: str,
+        shard: tuple[date, date],
+        page_size: int,
+    ) -> None:
+        def put(value: list[Any] | BaseException | None) -> bool:
+            while not stop.is_set():
+                try:
+                    pages.put(value, timeout=0.1)
+                except Full:
+                    continue
+                return True
+            return False
+
+        try:
+            for page in self.iter_records_from_clockify(
+                workspace_id,
+                user_id,
+                shard[0].strftime(self.format_date_date_start),
+                shard[1].strftime(self.format_date_date_end),
+                page_size,
+            ):
+                if not put(page):
+                    return
+            put(None)
+        except BaseException as e:
+            # also "sys.exit" of a failed request, it is raised again while merging
+            put(e)
+
+    def _shard_range(self, first_day: date, last_day: date) -> list[tuple[date, date]]:
+        """Split the days range into month shards (week shards for ranges up to a month), newest shard first."""
+        total_days = (last_day - first_day).days + 1
+        if total_days <= 7:
+            return [(first_day, last_day)]
+
+        shards: list[tuple[date, date]] = []
+        shard_start = first_day
+        while shard_start <= last_day:
+            if total_days > 31:
+                next_month = date(shard_start.year + shard_start.month // 12, shard_start.month % 12 + 1, 1)
+                shard_end = min(next_month - timedelta(days=1), last_day)
+            else:
+                shard_end = min(shard_start + timedelta(days=6), last_day)
+            shards.append((shard_start, shard_end))
+            shard_start = shard_end + timedelta(days=1)
+        shards.reverse()
+        return shards
+
+    @property
+    def store(self) -> ClockifyEntryStore:
+        """Local store of the time entries, created on first usage."""
+        with self._store_lock:
+            if self._store is None:
+                self._store = ClockifyEntryStore()
+            return self._store
+
+    def metadata(self, workspace_id: str, refresh: bool = False) -> Future[ClockifyMetadataIndex]:
+        """Metadata index of the workspace, loaded in background on first usage and shared by all requests.
+
+        With refresh the index is requested again from clockify, but only once per workspace.
+        """
+        with self._metadata_lock:
+            future = self._metadata.get(workspace_id)
+            if future is None or (refresh and workspace_id not in self._metadata_refreshed):
+                if refresh:
+                    self._metadata_refreshed.add(workspace_id)
+                future = Future()
+                self._metadata[workspace_id] = future
+                threading.Thread(target=self._load_metadata, args=(future, workspace_id, refresh), daemon=True).start()
+            return future
+
+    def _load_metadata(self, future: Future[ClockifyMetadataIndex], workspace_id: str, force: bool) -> None:
+        try:
+            future.set_result(ClockifyMetadataIndex.load(workspace_id, force=force))
+        except BaseException as e:
+            # also "sys.exit" of a failed request, it is raised again by the future result
+            future.set_exception(e)
+
+    def _hydrate(self, workspace_id: str, page: list[Any]) -> None:
+        """Resolve project, task and tags of the not hydrated entries, unknown ids refresh the index once.
+
+        Entries with ids, which are still unknown (like of done tasks), are requested hydrated one by one.
+        """
+        index = self.metadata(workspace_id).result()
+        unknown = [work for work in page if isinstance(work, dict) and not index.hydrate(work)]
+        if unknown:
+            logging.log(logging.DEBUG, "%s entries with unknown metadata ids, refresh metadata index", len(unknown))
+            index = self.metadata(workspace_id, refresh=True).result()
+        for work in unknown:
+            if index.hydrate(work):
+                continue
+            hydrated_work = self._request_hydrated_entry(workspace_id, work.get("id"))
+            if hydrated_work is None:
+                self.diagnostics.warn(
+                    WARN_UNKNOWN_METADATA,
+                    {key: work.get(key) for key in ("id", "projectId", "taskId", "tagIds")},
+                )
+                continue
+            index.learn(hydrated_work)
+            index.hydrate(work)
+
+    def _request_hydrated_entry(self, workspace_id: str, work_id: str | None) -> dict[str, Any] | None:
+        """Request a single time entry hydrated, None if it failed."""
+        if work_id is None:
+            return None
+        res = http_clients.client().get(
+            f"{settings.CLOCKIFY_API_ENDPOINT}/workspaces/{workspace_id}/time-entries/{work_id}",
+            headers={"content-type": "application/json", "X-Api-Key": str(settings.CLOCKIFY_API_KEY)},
+            params={"hydrated": True},
+        )
+        if res.status_code != 200:
+            logging.log(logging.DEBUG, "time entry %s could not be requested, code '%s'", work_id, res.status_code)
+            return None
+        parsed = res.json()
+        return parsed if isinstance(parsed, dict) else None
+
+    def request_records_from_clockify(
+        self,
+        workspace_id: str,
+        user_id: str,
+        start_day: str,
+        end_day: str,
+        page_size: int = 50,
+    ) -> list[Any] | None:
+        """Start and end day needs to be in format: "%Y-%m-%dT00:00:00.000Z"."""
+        if not settings.CLOCKIFY_API_KEY:
+            logging.log(logging.ERROR, "failed because CLOCKIFY_API_KEY is not set")
+            return None
+
+        return [
+            work
+            for page in self.iter_records_from_clockify(workspace_id, user_id, start_day, end_day, page_size)
+            for work in page
+        ]
+
+    def iter_records_from_clockify(
+        self,
+        workspace_id: str,
+        user_id: str,
+        start_day: str,
+        end_day: str,
+        page_size: int = 50,
+    ) -> Iterator[list[Any]]:
+        """Yield all time entries page by page, the next page is already requested while the current one is processed.
+
+        Clockify returns entries ordered by their start time (newest first), so the next page
+        is requested with the oldest start of the current page as new end (keyset paging).
+        Entries created or edited while fetching can not shift the page borders that way,
+        the overlapping entries on the border are dropped by their id.
+        With "CLOCKIFY_LOCAL_HYDRATION" the entries are requested not hydrated
+        and project, task and tags are resolved by the cached metadata index.
+        """
+        headers: dict[str, str] = {
+            "content-type": "application/json",
+            "X-Api-Key": str(settings.CLOCKIFY_API_KEY),
+        }
+        path = f"workspaces/{workspace_id}/user/{user_id}/time-entries"
+        hydrated = not settings.CLOCKIFY_LOCAL_HYDRATION
+        if not hydrated:
+            # the metadata index is loaded at the same time as the first page
+            self.metadata(workspace_id)
+        seen_ids: set[str] = set()
+        page_end: str = end_day
+        page_number: int = 1
+
+        session = http_clients.client()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future: Future[list[Any]] | None = executor.submit(
+                self._request_records_page,
+                session,
+                path,
+                headers,
+                start_day,
+                page_end,
+                page_number,
+                page_size,
+                hydrated,
+            )
+            while future is not None:
+                parsed = future.result()
+                future = None
+
+                # a full page means there could be more, request the next one before the current is processed
+                if len(parsed) >= page_size:
+                    oldest_start = min((start for work in parsed if (start := self._get_time_start(work))), default=None)
+                    if oldest_start is None or oldest_start == page_end:
+                        # all entries of the page start at the same time, keyset can not move, fall back to page number
+                        page_number += 1
+                    else:
+                        page_end, page_number = oldest_start, 1
+                    future = executor.submit(
+                        self._request_records_page,
+                        session,
+                        path,
+                        headers,
+                        start_day,
+                        page_end,
+                        page_number,
+                        page_size,
+                        hydrated,
+                    )
+
+                page: list[Any] = []
+                for work in parsed:
+                    work_id = work.get("id") if isinstance(work, dict) else None
+                    if work_id is not None:
+                        if work_id in seen_ids:
+                            continue
+                        seen_ids.add(work_id)
+                    page.append(work)
+                if not hydrated:
+                    self._hydrate(workspace_id, page)
+                yield page
+
+    def _request_records_page(
+        self,
+        session: httpx.Client,
+        path: str,
+        headers: dict[str, str],
+        start_day: str,
+        end_day: str,
+        page_number: int,
+        page_size: int,
+        hydrated: bool = True,
+    ) -> list[Any]:
+        params: QueryParamTypes = [
+            ("hydrated", hydrated),
+            ("page", page_number),
+            ("page-size", page_size),
+            ("start", start_day),
+            ("end", end_day),
+        ]
+        # decode the entries while the response is received, without holding the complete response text
+        with session.stream("GET", f"{settings.CLOCKIFY_API_ENDPOINT}/{path}", headers=headers, params=params) as res:
+            if res.status_code != 200:
+                res.read()
+                logging.error("api call to get time entries failed with code '%s' because of '%s'", res.status_code, res.text)
+                sys.exit(1)
+
+            try:
+                return list(iter_json_array(res.iter_bytes()))
+            except ValueError:
+                logging.exception("api result could not be parsed as list, no function implemented for this case")
+                sys.exit(1)
+
+    def _get_time_start(self, work: object) -> str | None:
+        if not isinstance(work, dict) or work.get("timeInterval") is None:
+            return None
+        time_start: str | None = work["timeInterval"].get("start", None)
+        return time_start
@@ -0,0 +1,220 @@
+"""CLOCKIFY RENDERER."""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+import csv
+import io
+import json
+from pathlib import Path
+import sys
+from typing import Self, TextIO
+
+from vm_clockify.service.clockify_group_by import GroupTotal
+from vm_clockify.service.clockify_issue_time import KEY_SUM, IssueKey, IssueTime
+from vm_clockify.utils.config import settings
+
+OUTPUT_FORMATS = ("table", "csv", "jsonl", "json")
+CSV_COLUMNS = (
+    "user_id",
+    "kind",
+    "day",
+    "project",
+    "task",
+    "id",
+    "issues",
+    "issue_type",
+    "duration_seconds",
+    "hours",
+    "minutes",
+    "description",
+    "count",
+)
+# kind of the rows of the group by totals
+KIND_GROUP: str = "group"
+
+
+@contextmanager
+def open_output(path: str | None = None) -> Iterator[TextIO]:
+    """Open the output file for the rendered results, stdout without a path."""
+    if path is None or path == "-":
+        yield sys.stdout
+        return
+    with Path(path).open(mode="w", encoding="utf-8", newline="") as f:
+        yield f
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+class ResultRenderer:
+    """Render times results row by row into a buffer, which is written in bulk to the output stream.
+
+    Formats are "table" for the terminal (the day overview and optional the issue details),
+    "csv", "jsonl" (one json object per row) and "json" (one list, written as stream too).
+    The totals of the group by dimensions are rendered after the results, as rows of kind "group".
+    """
+
+    def __init__(
+        self,
+        output_format: str = "table",
+        stream: TextIO | None = None,
+        time_details: bool = False,
+        time_count: bool = True,
+        buffer_size: int = 65536,
+    ) -> None:
+        """Create the result renderer."""
+        if output_format not in OUTPUT_FORMATS:
+            msg = f'output format "{output_format}" is not supported, possible are: {", ".join(OUTPUT_FORMATS)}'
+            raise ValueError(msg)
+        self.output_format = output_format
+        self.stream = stream if stream is not None else sys.stdout
+        self.time_details = time_details
+        self.time_count = time_count
+        self.buffer_size = buffer_size
+        self.rows = 0
+        self._buffer = io.StringIO()
+        self._csv = csv.writer(self._buffer, lineterminator="\n")
+        if output_format == "csv":
+            self._csv.writerow(CSV_COLUMNS)
+        elif output_format == "json":
+            self._buffer.write("[")
+
+    def __enter__(self) -> Self:
+        """Use the renderer as context, it is closed at the end."""
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Close the renderer."""
+        self.close()
+
+    # --------------------------------------------------------------------------
+    #
+    #
+    #
+    # --------------------------------------------------------------------------
+
+    def header(self, title: str) -> None:
+        """Write a header like the user of a batch, only shown in format "table"."""
+        if self.output_format == "table":
+            self._buffer.write(f"###################################################\n  ==> {title}\n")
+            self._buffer.write("###################################################\n")
+
+    def render(self, results: dict[IssueKey, IssueTime], user_id: str | None = None) -> None:
+        """Render all rows of the results."""
+        for key, value in results.items():
+            self.render_row(key, value, user_id)
+
+    def render_row(self, key: IssueKey, value: IssueTime, user_id: str | None = None) -> None:
+        """Render one row into the buffer, the buffer is written when it is full."""
+        if self.output_format == "table":
+            self._table_row(key, value)
+        elif self.output_format == "csv":
+            self._csv.writerow(
+                (
+                    user_id or "",
+                    key[0],
+                    value.issue_date or "",
+                    value.project or "",
+                    value.task or "",
+                    key[4] or "",
+                    ", ".join(value.issue),
+                    value.issue_type or "",
+                    "" if value.duration_seconds is None else value.duration_seconds,
+                    value.hours,
+                    value.minutes,
+                    ", ".join(value.description),
+                    "",
+                ),
+            )
+        else:
+            row = {"key": key, **value.to_dict()}
+            if user_id is not None:
+                row = {"user_id": user_id, **row}
+            if self.output_format == "json" and self.rows > 0:
+                self._buffer.write(",")
+            self._buffer.write(json.dumps(row, separators=(",", ":")))
+            if self.output_format == "jsonl":
+                self._buffer.write("\n")
+        self.rows += 1
+        if self._buffer.tell() >= self.buffer_size:
+            self.flush()
+
+    def group_totals(self, dimensions: tuple[str, ...], total: GroupTotal) -> None:
+        """Render the nested totals of the group by dimensions, every group with the values of its path."""
+        if self.output_format == "table":
+            self._buffer.write(
+                f"~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~\n  ==> GROUP BY: {', '.join(dimensions)}\n",
+            )
+        self._group_row(dimensions, (), "TOTAL", total)
+        if self.output_format == "table":
+            self._buffer.write("~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~\n")
+
+    def _group_row(self, dimensions: tuple[str, ...], path: tuple[str, ...], name: str, group: GroupTotal) -> None:
+        hours, minutes = divmod(group.seconds // 60, 60)
+        if self.output_format == "table":
+            self._buffer.write(f"  {'  ' * len(path)}[*] {name}: {hours}h {minutes}m ({group.count})\n")
+        elif self.output_format == "csv":
+            group_id = " / ".join(f"{dimension}={value}" for dimension, value in zip(dimensions, path, strict=False))
+            self._csv.writerow(("", KIND_GROUP, "", "", "", group_id, "", "", group.seconds, hours, minutes, "", group.count))
+        else:
+            row = {
+                "kind": KIND_GROUP,
+                "group": dict(zip(dimensions, path, strict=False)),
+                "duration_seconds": group.seconds,
+                "hours": hours,
+                "minutes": minutes,
+                "count": group.count,
+            }
+            if self.output_format == "json" and self.rows > 0:
+                self._buffer.write(",")
+            self._buffer.write(json.dumps(row, separators=(",", ":")))
+            if self.output_format == "jsonl":
+                self._buffer.write("\n")
+        self.rows += 1
+        if self._buffer.tell() >= self.buffer_size:
+            self.flush()
+        for child_name, child in group.groups.items():
+            self._group_row(dimensions, (*path, child_name), child_name, child)
+
+    def _table_row(self, key: IssueKey, value: IssueTime) -> None:
+        # print a overview for the complete day work
+        if key[0] == KEY_SUM and self.time_count:
+            # only full minutes are worked, like shown above
+            opened_rest_seconds = settings.WORK_TIME_DEFAULT_HOURS * 3600 - (value.hours * 3600 + value.minutes * 60)
+            rest_hours, rest_minutes = divmod(opened_rest_seconds % (24 * 3600) // 60, 60)
+            self._buffer.write(
+                "~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~\n"
+                f"  ==> DAY: {value.issue_date}\n"
+                f"  [*] WORKED: {value.hours}h {value.minutes}m\n"
+                f"  [*] REST  : {rest_hours}h {rest_minutes}m\n"
+                "~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~\n",
+            )
+        # print issue per issue with information
+        elif self.time_details:
+            parts = []
+            if value.issue_date:
+                parts.append(f"{value.issue_date}")
+            if value.duration_seconds is not None:
+                parts.append(f"{value.hours}h {value.minutes}m")
+            if value.issue:
+                parts.append(", ".join(value.issue))
+            if value.issue_type:
+                parts.append(value.issue_type)
+            if value.description:
+                parts.append(", ".join(value.description))
+            self._buffer.write(f"  [*] {' || '.join(parts)}\n")
+
+    def flush(self) -> None:
+        """Write the buffer to the output stream."""
+        self.stream.write(self._buffer.getvalue())
+        self.stream.flush()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+    def close(self) -> None:
+        """Finish the output, like the end of the json list, and write the rest of the buffer."""
+        if self.output_format == "json":
+            self._buffer.write("]\n")
+        self.flush()
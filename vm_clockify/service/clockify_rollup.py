@@ -0,0 +1,161 @@
+"""CLOCKIFY ROLLUP."""
+
+from collections.abc import Iterator
+from datetime import date, timedelta
+import hashlib
+import logging
+from typing import Any
+
+from vm_clockify.service.clockify_columnar import AggregatedKey
+from vm_clockify.service.clockify_entry_store import ClockifyEntryStore
+from vm_clockify.utils.day_bucket_helper import DayBucketer
+from vm_clockify.utils.duration_helper import entry_duration, parse_duration
+
+# increase if the aggregation changes, so the saved day rollups are not used anymore
+ROLLUP_VERSION: int = 1
+
+
+def rollup_context(*values: object) -> str:
+    """Short hash of the aggregation options, rollups are only reused with the same options."""
+    return hashlib.blake2b(repr((ROLLUP_VERSION, *values)).encode(), digest_size=8).hexdigest()
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+class DayRollups:
+    """Aggregated results per local day, reused from the store while the entries of a day did not change.
+
+    The entries are grouped by their local days with a content hash per day, without decoding or keeping them.
+    Only entries of changed days need to be aggregated again, they are read again from the store window by window,
+    their results are merged with the saved rollups of the other days, ordered by day (newest first) like the entries.
+    """
+
+    def __init__(self, store: ClockifyEntryStore, workspace_id: str, user_id: str, bucketer: DayBucketer, context: str) -> None:
+        """Day rollups."""
+        self.store = store
+        self.workspace_id = workspace_id
+        self.user_id = user_id
+        self.bucketer = bucketer
+        self.context = context
+        self._day_hashes: dict[str, Any] = {}
+        # first and last utc start day (like the store day) of the entries per local day
+        self._start_days: dict[str, tuple[str, str]] = {}
+        self._invalid_works: list[Any] = []
+        self._saved: dict[str, tuple[str, Any]] = {}
+        self._rollups: dict[str, Any] = {}
+        self._changed_days: set[str] = set()
+
+    def add(self, work: dict[str, Any]) -> None:
+        """Add an entry to the content hash of its local days, the entry itself is not kept."""
+        days = self._work_days(work)
+        if days is None:
+            # entries without a valid start are passed on, so they fail like without rollups
+            self._invalid_works.append(work)
+            return
+        fingerprint = self._work_fingerprint(work)
+        start_day: str = work["timeInterval"]["start"][:10]
+        for day in days:
+            if day not in self._day_hashes:
+                self._day_hashes[day] = hashlib.blake2b(digest_size=16)
+                self._start_days[day] = (start_day, start_day)
+            self._day_hashes[day].update(fingerprint)
+            first, last = self._start_days[day]
+            self._start_days[day] = (min(first, start_day), max(last, start_day))
+
+    def changed_works(self, refresh: bool = False) -> Iterator[Any]:
+        """Yield the entries of the days, which changed since their saved rollup (all with refresh)."""
+        content_hashes = {day: day_hash.hexdigest() for day, day_hash in self._day_hashes.items()}
+        self._saved = self.store.load_rollups(
+            self.workspace_id,
+            self.user_id,
+            self.context,
+            self.bucketer.first_day.isoformat(),
+            self.bucketer.last_day.isoformat(),
+        )
+        self._rollups = {}
+        if not refresh:
+            self._rollups = {
+                day: saved[1]
+                for day, content_hash in content_hashes.items()
+                if (saved := self._saved.get(day)) is not None and saved[0] == content_hash
+            }
+        self._changed_days = {day for day in content_hashes if day not in self._rollups}
+        yield from self._invalid_works
+        for first_day, last_day in self._read_windows():
+            for work in self.store.iter_entries(self.workspace_id, self.user_id, first_day, last_day):
+                days = self._work_days(work)
+                if days is not None and not self._changed_days.isdisjoint(days):
+                    yield work
+
+    def merge(self, changed_results: dict[AggregatedKey, dict[str, Any]]) -> Iterator[tuple[AggregatedKey, dict[str, Any]]]:
+        """Save the results of the changed days as their rollups and yield the results of all days."""
+        changed_rollups: dict[str, list[Any]] = {day: [] for day in self._changed_days}
+        for key, values in changed_results.items():
+            if key[1] in changed_rollups:
+                changed_rollups[key[1]].append([key, values])
+        self._rollups.update(changed_rollups)
+        self.store.save_rollups(
+            self.workspace_id,
+            self.user_id,
+            self.context,
+            {day: (self._day_hashes[day].hexdigest(), changed_rollups[day]) for day in self._changed_days},
+            stale_days=[day for day in self._saved if day not in self._day_hashes],
+        )
+        logging.log(
+            logging.DEBUG,
+            "day rollups: %s cached, %s aggregated",
+            len(self._rollups) - len(self._changed_days),
+            len(self._changed_days),
+        )
+
+        for day in sorted(self._rollups, reverse=True):
+            for key, values in self._rollups[day]:
+                yield tuple(key), values
+
+    # --------------------------------------------------------------------------
+    #
+    #
+    #
+    # --------------------------------------------------------------------------
+
+    def _read_windows(self) -> list[tuple[date, date]]:
+        """Utc start days to read the entries of the changed days again, as disjoint windows (newest first)."""
+        windows: list[tuple[date, date]] = []
+        for first, last in sorted(self._start_days[day] for day in self._changed_days):
+            first_day, last_day = date.fromisoformat(first), date.fromisoformat(last)
+            # overlapping or adjacent windows are merged, so an entry is only read once
+            if windows and first_day <= windows[-1][1] + timedelta(days=1):
+                windows[-1] = (windows[-1][0], max(windows[-1][1], last_day))
+            else:
+                windows.append((first_day, last_day))
+        return windows[::-1]
+
+    def _work_days(self, work: dict[str, Any]) -> list[str] | None:
+        """Local days of the entry inside the range, None if its start is not valid."""
+        time_start: str | None = work["timeInterval"].get("start") if work.get("timeInterval") is not None else None
+        current_time_start = self.bucketer.parse_instant(time_start) if time_start else None
+        if current_time_start is None:
+            return None
+        time_duration = entry_duration(work)
+        time_duration_seconds = parse_duration(time_duration) if time_duration else None
+        return [day for day, _ in self.bucketer.split(current_time_start, time_duration_seconds)]
+
+    def _work_fingerprint(self, work: dict[str, Any]) -> bytes:
+        """Values of the entry, which are used by the aggregation."""
+        time_interval = work.get("timeInterval") or {}
+        return repr(
+            (
+                work.get("id"),
+                work.get("description"),
+                time_interval.get("start"),
+                time_interval.get("end"),
+                time_interval.get("duration"),
+                work.get("projectId"),
+                (work.get("project") or {}).get("name"),
+                work.get("taskId"),
+                (work.get("task") or {}).get("name"),
+            ),
+        ).encode()
@@ -0,0 +1,155 @@
+"""WORK CALENDAR."""
+
+from array import array
+import calendar
+from datetime import date, timedelta
+from functools import cache
+import json
+import logging
+from pathlib import Path
+import threading
+from typing import Any
+
+from vm_clockify.utils.config import settings
+
+WEEK_DAYS = 7
+
+
+def parse_weekly_hours(value: str | None) -> tuple[float, ...]:
+    """Parse the weekly schedule as expected hours from monday until sunday, like "8,8,8,8,6,0,0".
+
+    Without a value "WORK_TIME_DEFAULT_HOURS" from monday until friday is used.
+    """
+    if not value:
+        return (float(settings.WORK_TIME_DEFAULT_HOURS),) * 5 + (0.0,) * 2
+    hours = tuple(float(item) for item in value.split(","))
+    if len(hours) != WEEK_DAYS or any(item < 0 or item > 24 for item in hours):
+        msg = f'weekly hours "{value}" needs {WEEK_DAYS} values between 0 and 24, from monday until sunday'
+        raise ValueError(msg)
+    return hours
+
+
+def month_range(year: int, month: int) -> tuple[date, date]:
+    """First and last day of a month."""
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+class WorkCalendar:
+    """Working days and expected work time of a holiday region and a weekly schedule.
+
+    Per year a bitmap of the working days (weekday with hours and not a holiday) and prefix sums
+    of the working days and expected seconds are built once, so every range is answered in O(1) per year.
+    """
+
+    def __init__(self, country: str, subdiv: str | None, weekly_hours: tuple[float, ...]) -> None:
+        """Work calendar."""
+        self.country = country
+        self.subdiv = subdiv
+        self.weekly_seconds = tuple(round(hours * 3600) for hours in weekly_hours)
+        self._years: dict[int, tuple[bytearray, array[int], array[int]]] = {}
+        self._lock = threading.Lock()
+
+    def _year(self, year: int) -> tuple[bytearray, array[int], array[int]]:
+        """Working days bitmap and prefix sums of the working days and expected seconds of a year."""
+        with self._lock:
+            year_data = self._years.get(year)
+            if year_data is None:
+                import holidays  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
+
+                holiday_days = holidays.country_holidays(country=self.country, subdiv=self.subdiv, years=year)
+                first_day = date(year, 1, 1)
+                day_count = 366 if calendar.isleap(year) else 365
+                working = bytearray(day_count)
+                prefix_days = array("q", [0])
+                prefix_seconds = array("q", [0])
+                for offset in range(day_count):
+                    day = first_day + timedelta(days=offset)
+                    seconds = self.weekly_seconds[day.weekday()]
+                    if seconds > 0 and day not in holiday_days:
+                        working[offset] = 1
+                    prefix_days.append(prefix_days[-1] + working[offset])
+                    prefix_seconds.append(prefix_seconds[-1] + seconds * working[offset])
+                year_data = (working, prefix_days, prefix_seconds)
+                self._years[year] = year_data
+            return year_data
+
+    def _range_sum(self, first_day: date, last_day: date, column: int) -> int:
+        total = 0
+        for year in range(first_day.year, last_day.year + 1):
+            prefixes = self._year(year)[column]
+            start = (first_day - date(year, 1, 1)).days if year == first_day.year else 0
+            end = (last_day - date(year, 1, 1)).days + 1 if year == last_day.year else len(prefixes) - 1
+            total += prefixes[end] - prefixes[start]
+        return total
+
+    # --------------------------------------------------------------------------
+    #
+    #
+    #
+    # --------------------------------------------------------------------------
+
+    def is_working_day(self, day: date) -> bool:
+        """Check if the day is a working day."""
+        return bool(self._year(day.year)[0][day.timetuple().tm_yday - 1])
+
+    def day_seconds(self, day: date) -> int:
+        """Return the expected work seconds of a day, 0 for holidays and free weekdays."""
+        return self.weekly_seconds[day.weekday()] if self.is_working_day(day) else 0
+
+    def working_days(self, first_day: date, last_day: date) -> int:
+        """Count the working days between two days, both included."""
+        return self._range_sum(first_day, last_day, 1) if first_day <= last_day else 0
+
+    def expected_seconds(self, first_day: date, last_day: date) -> int:
+        """Return the expected work seconds between two days, both included."""
+        return self._range_sum(first_day, last_day, 2) if first_day <= last_day else 0
+
+    def average_day_seconds(self) -> int:
+        """Return the expected work seconds of an average working weekday, used for free and illness days."""
+        working_weekdays = [seconds for seconds in self.weekly_seconds if seconds > 0]
+        return sum(working_weekdays) // len(working_weekdays) if working_weekdays else 0
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+@cache
+def get_work_calendar(country: str, subdiv: str | None, weekly_hours: tuple[float, ...]) -> WorkCalendar:
+    """Shared work calendar per holiday region and weekly schedule."""
+    return WorkCalendar(country, subdiv, weekly_hours)
+
+
+@cache
+def _load_user_calendars(path: str) -> dict[str, dict[str, Any]]:
+    with Path(path).open(encoding="utf-8") as f:
+        user_calendars: dict[str, dict[str, Any]] = json.load(f)
+    return user_calendars
+
+
+def user_work_calendar(user_id: str | None = None) -> WorkCalendar:
+    """Work calendar of a user, from "WORK_CALENDAR_USERS_FILE" or else the default region and weekly schedule.
+
+    The users file maps the user id to its own values, missing values use the defaults:
+    {"<USER_ID>": {"country": "DE", "subdiv": "BY", "weekly_hours": "8,8,8,8,4,0,0"}}
+    """
+    user_calendar: dict[str, Any] = {}
+    if user_id is not None and settings.WORK_CALENDAR_USERS_FILE is not None:
+        user_calendar = _load_user_calendars(settings.WORK_CALENDAR_USERS_FILE).get(user_id, {})
+        if not user_calendar:
+            logging.log(logging.DEBUG, 'user "%s" has no own work calendar, use the default', user_id)
+
+    weekly_hours = user_calendar.get("weekly_hours", settings.WORK_TIME_WEEKLY_HOURS)
+    if isinstance(weekly_hours, list):
+        weekly_hours = ",".join(str(hours) for hours in weekly_hours)
+    return get_work_calendar(
+        user_calendar.get("country", settings.WORK_CALENDAR_COUNTRY),
+        user_calendar.get("subdiv", settings.WORK_CALENDAR_SUBDIV) or None,
+        parse_weekly_hours(weekly_hours),
+    )
@@ -0,0 +1,209 @@
+"""YOUTRACK METADATA."""
+
+import asyncio
+from collections.abc import Callable, Coroutine
+from datetime import UTC, datetime, timedelta
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from vm_clockify.utils.config import settings
+from vm_clockify.utils.utils_helper import create_service_folder, slugify
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+class YoutrackMetadataCache:
+    """Project ids of issues and work item type ids by name per project, to resolve the type of work items locally.
+
+    All projects with their work item types are requested with one query and cached as json file per endpoint,
+    requested again after "YOUTRACK_METADATA_TTL" seconds. The project of an issue is found by the short name
+    in its id (like "ABC" of "ABC-12"), other issue ids and projects not known yet are requested once and cached too.
+    Concurrent uploads wait for the same request of an issue or project, which is done only once per run.
+    """
+
+    page_size: int = 500
+
+    def __init__(self, headers: dict[str, str]) -> None:
+        """Youtrack metadata cache."""
+        self.headers = headers
+        # project id -> work item type id by name
+        self.projects: dict[str, dict[str, str]] = {}
+        # project short name (upper case) -> project id
+        self.short_names: dict[str, str] = {}
+        # issue id -> project id, for issue ids without a known short name
+        self.issues: dict[str, str] = {}
+        self.fetched_at: datetime | None = None
+        self._changed = False
+        self._projects_failed = False
+        # requests per issue id and project id, started by the first upload, which needs them
+        self._issue_requests: dict[str, asyncio.Task[str | None]] = {}
+        self._type_requests: dict[str, asyncio.Task[dict[str, str] | None]] = {}
+        self._lock = asyncio.Lock()
+
+    # --------------------------------------------------------------------------
+    #
+    #
+    #
+    # --------------------------------------------------------------------------
+
+    async def work_type_id(self, session: httpx.AsyncClient, issue_id: str, issue_type: str) -> str | None:
+        """Return the id of the work item type by its name in the project of the issue."""
+        await self._ensure_loaded(session)
+        project_id = await self.project_id(session, issue_id)
+        if project_id is None:
+            return None
+
+        types = self.projects.get(project_id)
+        # new projects or types since the cache was filled are requested once per run
+        if types is None or issue_type not in types:
+            types = await self._request_once(
+                self._type_requests,
+                project_id,
+                lambda: self._request_project_types(session, project_id),
+            )
+        return types.get(issue_type) if types is not None else None
+
+    async def project_id(self, session: httpx.AsyncClient, issue_id: str) -> str | None:
+        """Return the project id of the issue, by the short name in the issue id or requested once."""
+        short_name, separator, number = issue_id.rpartition("-")
+        if separator and number.isdigit() and (project_id := self.short_names.get(short_name.upper())) is not None:
+            return project_id
+        if issue_id in self.issues:
+            return self.issues[issue_id]
+        return await self._request_once(self._issue_requests, issue_id, lambda: self._request_issue_project(session, issue_id))
+
+    def save(self) -> None:
+        """Write the cache file, if something was requested (not without the projects)."""
+        if not self._changed or self.fetched_at is None or self._projects_failed:
+            return
+        cache_path = self._cache_path()
+        tmp_path = cache_path.with_suffix(".tmp")
+        with tmp_path.open(mode="w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "fetched_at": self.fetched_at.isoformat(),
+                    "projects": self.projects,
+                    "short_names": self.short_names,
+                    "issues": self.issues,
+                },
+                f,
+            )
+        tmp_path.replace(cache_path)
+        self._changed = False
+
+    # --------------------------------------------------------------------------
+    #
+    #
+    #
+    # --------------------------------------------------------------------------
+
+    def _cache_path(self) -> Path:
+        return Path(f"{create_service_folder()}/{settings.YOUTRACK_METADATA_FILE}_{slugify(settings.YOUTRACK_API_ENDPOINT)}.json")
+
+    async def _ensure_loaded(self, session: httpx.AsyncClient) -> None:
+        """Load the cache file or request all projects, only once for all concurrent uploads."""
+        if self.fetched_at is not None:
+            return
+        async with self._lock:
+            if self.fetched_at is None and not self._load():
+                await self._request_projects(session)
+
+    def _load(self) -> bool:
+        cache_path = self._cache_path()
+        if not cache_path.exists():
+            return False
+        try:
+            with cache_path.open(encoding="utf-8") as f:
+                cached = json.load(f)
+            fetched_at = datetime.fromisoformat(cached["fetched_at"])
+            if datetime.now(tz=UTC) - fetched_at >= timedelta(seconds=settings.YOUTRACK_METADATA_TTL):
+                return False
+            self.projects = cached["projects"]
+            self.short_names = cached["short_names"]
+            self.issues = cached["issues"]
+            self.fetched_at = fetched_at
+            logging.log(logging.DEBUG, "use cached youtrack metadata from %s", fetched_at)
+            return True
+        except (OSError, ValueError, KeyError) as e:
+            logging.log(logging.WARNING, "cached youtrack metadata could not be read, request it again: %s", e)
+        return False
+
+    async def _request_projects(self, session: httpx.AsyncClient) -> None:
+        """Request all projects with their work item types, only the needed fields."""
+        logging.log(logging.DEBUG, "request youtrack projects with their work item types")
+        fetched_at = datetime.now(tz=UTC)
+        self.projects, self.short_names, self.issues = {}, {}, {}
+        self._changed = True
+        skip = 0
+        while True:
+            res = await session.get(
+                f"{settings.YOUTRACK_API_ENDPOINT}/{settings.YOUTRACK_API_ENDPOINT_SUFFIX}/admin/projects",
+                headers=self.headers,
+                params={
+                    "fields": "id,shortName,timeTrackingSettings(workItemTypes(id,name))",
+                    "$top": self.page_size,
+                    "$skip": skip,
+                },
+            )
+            if res.status_code != 200:
+                # the projects are requested one by one then, when they are needed
+                logging.log(logging.WARNING, "youtrack projects could not be requested, code '%s'", res.status_code)
+                self._projects_failed = True
+                break
+            parsed: list[dict[str, Any]] = json.loads(res.text)
+            for project in parsed:
+                work_item_types = (project.get("timeTrackingSettings") or {}).get("workItemTypes") or []
+                self.projects[project["id"]] = {str(item["name"]): str(item["id"]) for item in work_item_types}
+                if project.get("shortName"):
+                    self.short_names[str(project["shortName"]).upper()] = project["id"]
+            if len(parsed) < self.page_size:
+                break
+            skip += self.page_size
+        # set at the end, concurrent uploads wait for the projects until then
+        self.fetched_at = fetched_at
+
+    async def _request_once[T](
+        self,
+        requests: dict[str, asyncio.Task[T]],
+        key: str,
+        request: Callable[[], Coroutine[Any, Any, T]],
+    ) -> T:
+        """Start the request of the key only once, concurrent and later callers wait for the same result."""
+        task = requests.get(key)
+        if task is None:
+            task = requests[key] = asyncio.create_task(request())
+        return await task
+
+    async def _request_issue_project(self, session: httpx.AsyncClient, issue_id: str) -> str | None:
+        res = await session.get(
+            f"{settings.YOUTRACK_API_ENDPOINT}/{settings.YOUTRACK_API_ENDPOINT_SUFFIX}/issues/{issue_id}/project",
+            headers=self.headers,
+            params={"fields": "id"},
+        )
+        if res.status_code != 200:
+            logging.log(logging.WARNING, "project of issue %s could not be requested, code '%s'", issue_id, res.status_code)
+            return None
+        self.issues[issue_id] = str(json.loads(res.text)["id"])
+        self._changed = True
+        return self.issues[issue_id]
+
+    async def _request_project_types(self, session: httpx.AsyncClient, project_id: str) -> dict[str, str] | None:
+        res = await session.get(
+            f"{settings.YOUTRACK_API_ENDPOINT}/{settings.YOUTRACK_API_ENDPOINT_SUFFIX}"
+            f"/admin/projects/{project_id}/timeTrackingSettings/workItemTypes",
+            headers=self.headers,
+            params={"fields": "id,name"},
+        )
+        if res.status_code != 200:
+            logging.log(logging.WARNING, "types of project %s could not be requested, code '%s'", project_id, res.status_code)
+            return self.projects.get(project_id)
+        self.projects[project_id] = {str(item["name"]): str(item["id"]) for item in json.loads(res.text)}
+        self._changed = True
+        return self.projects[project_id]
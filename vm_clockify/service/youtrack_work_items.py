@@ -0,0 +1,92 @@
+"""YOUTRACK WORK ITEMS."""
+
+import hashlib
+import json
+import logging
+from typing import Any
+
+import httpx
+
+from vm_clockify.utils.config import settings
+
+DAY_MILLISECONDS: int = 24 * 3600 * 1000
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+class YoutrackWorkItemIndex:
+    """My work items of a date range by issue, date and text hash, to detect already uploaded items locally.
+
+    The work items are requested per days window before its upload with a few paged requests (only the needed fields),
+    instead of a full text search per uploaded item. Uploaded items are added, so repeated items are found too.
+    """
+
+    page_size: int = 500
+
+    def __init__(self, headers: dict[str, str]) -> None:
+        """Youtrack work item index."""
+        self.headers = headers
+        self._keys: set[tuple[str, int, str]] = set()
+        # requested days windows (epoch milliseconds of the first and last day)
+        self._windows: list[tuple[int, int]] = []
+
+    @staticmethod
+    def key(issue_id: str, date: int, text: str) -> tuple[str, int, str]:
+        """Key of a work item, the issue id is compared case insensitive like in youtrack."""
+        return issue_id.upper(), date, hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+    def covers(self, date: int) -> bool:
+        """Check if the work items of the day (epoch milliseconds) are requested."""
+        return any(first_day <= date <= last_day for first_day, last_day in self._windows)
+
+    def contains(self, issue_id: str, date: int, text: str) -> bool:
+        """Check if a work item with the same issue, date and text exists."""
+        return self.key(issue_id, date, text) in self._keys
+
+    def add(self, issue_id: str, date: int, text: str) -> None:
+        """Add an uploaded work item."""
+        self._keys.add(self.key(issue_id, date, text))
+
+    async def prefetch(self, session: httpx.AsyncClient, first_day: int, last_day: int) -> bool:
+        """Request my work items from the first until the last day (epoch milliseconds), return false if it failed.
+
+        The work items are added to the ones of former windows, a window inside a requested one is not requested again.
+        """
+        if any(window_first <= first_day and last_day <= window_last for window_first, window_last in self._windows):
+            return True
+        logging.log(logging.DEBUG, "request youtrack work items from %s until %s", first_day, last_day)
+        keys: set[tuple[str, int, str]] = set()
+        skip = 0
+        while True:
+            res = await session.get(
+                f"{settings.YOUTRACK_API_ENDPOINT}/{settings.YOUTRACK_API_ENDPOINT_SUFFIX}/workItems",
+                headers=self.headers,
+                params={
+                    "fields": "date,text,issue(idReadable)",
+                    "author": "me",
+                    "creator": "me",
+                    "start": first_day,
+                    "end": last_day + DAY_MILLISECONDS - 1,
+                    "$top": self.page_size,
+                    "$skip": skip,
+                },
+            )
+            if res.status_code != 200:
+                # the existence is checked per item then
+                logging.log(logging.WARNING, "youtrack work items could not be requested, code '%s'", res.status_code)
+                return False
+            parsed: list[dict[str, Any]] = json.loads(res.text)
+            for item in parsed:
+                issue_id = (item.get("issue") or {}).get("idReadable")
+                if issue_id and item.get("date") is not None:
+                    keys.add(self.key(str(issue_id), int(item["date"]), str(item.get("text") or "")))
+            if len(parsed) < self.page_size:
+                break
+            skip += self.page_size
+        self._keys |= keys
+        self._windows.append((first_day, last_day))
+        logging.log(logging.DEBUG, "%s youtrack work items are indexed", len(keys))
+        return True
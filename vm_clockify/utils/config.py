@@ -5,8 +5,6 @@ import logging
 from zoneinfo import ZoneInfo
 
 from starlette.config import Config
-from stringcolor.ops import Bold
-import verboselogs
 
 
 class Settings:
@@ -39,6 +37,27 @@ class Settings:
     DISABLE_SPLIT_PROJECT: bool = config("DISABLE_SPLIT_PROJECT", cast=bool, default=False)
     DISABLE_SPLIT_HOST: bool = config("DISABLE_SPLIT_HOST", cast=bool, default=False)
 
+    # ------------------------------------------------------------------------------
+    #
+    # HTTP CLIENT
+    #
+    # ------------------------------------------------------------------------------
+    HTTP_HTTP2: bool = config("HTTP_HTTP2", cast=bool, default=False)  # needs "h2" installed
+    HTTP_TIMEOUT: float = config("HTTP_TIMEOUT", cast=float, default=30.0)
+    HTTP_CONNECT_TIMEOUT: float = config("HTTP_CONNECT_TIMEOUT", cast=float, default=10.0)
+    HTTP_POOL_MAX_CONNECTIONS: int = config("HTTP_POOL_MAX_CONNECTIONS", cast=int, default=20)
+    HTTP_POOL_MAX_KEEPALIVE: int = config("HTTP_POOL_MAX_KEEPALIVE", cast=int, default=10)
+    HTTP_POOL_KEEPALIVE_EXPIRY: float = config("HTTP_POOL_KEEPALIVE_EXPIRY", cast=float, default=30.0)
+    # rate limit per host (requests per second, 0 to disable) and its adaptive concurrency range
+    HTTP_RATE_LIMIT: float = config("HTTP_RATE_LIMIT", cast=float, default=10.0)
+    HTTP_RATE_BURST: int = config("HTTP_RATE_BURST", cast=int, default=10)
+    HTTP_CONCURRENCY_MIN: int = config("HTTP_CONCURRENCY_MIN", cast=int, default=1)
+    HTTP_CONCURRENCY_MAX: int = config("HTTP_CONCURRENCY_MAX", cast=int, default=16)
+    # retry on 429 and for idempotent requests also on 5xx and connection errors
+    HTTP_RETRY_MAX: int = config("HTTP_RETRY_MAX", cast=int, default=5)
+    HTTP_RETRY_BACKOFF: float = config("HTTP_RETRY_BACKOFF", cast=float, default=0.5)
+    HTTP_RETRY_BACKOFF_MAX: float = config("HTTP_RETRY_BACKOFF_MAX", cast=float, default=30.0)
+
     # ------------------------------------------------------------------------------
     #
     # GENERAL TIME SETTINGS
@@ -47,6 +66,13 @@ class Settings:
     WORK_TIME_DEFAULT_HOURS: int = config("WORK_TIME_DEFAULT_HOURS", cast=int, default=8)
     WORK_TIME_DEFAULT_ISSUE: str | None = config("WORK_TIME_DEFAULT_ISSUE", default=None)
     WORK_TIME_DEFAULT_COMMENT: str | None = config("WORK_TIME_DEFAULT_COMMENT", default=None)
+    # expected hours from monday until sunday like "8,8,8,8,6,0,0", default are the default hours from monday until friday
+    WORK_TIME_WEEKLY_HOURS: str | None = config("WORK_TIME_WEEKLY_HOURS", default=None)
+    # holiday region of the work calendar, as country and optional subdivision code
+    WORK_CALENDAR_COUNTRY: str = config("WORK_CALENDAR_COUNTRY", default="DE")
+    WORK_CALENDAR_SUBDIV: str | None = config("WORK_CALENDAR_SUBDIV", default="BW")
+    # json file with an own region and weekly schedule per user id
+    WORK_CALENDAR_USERS_FILE: str | None = config("WORK_CALENDAR_USERS_FILE", default=None)
     # ------------------------------------------------------------------------------
     #
     # CLOCKIFY
@@ -57,6 +83,33 @@ class Settings:
     CLOCKIFY_API_WORKSPACE_ID: str | None = config("CLOCKIFY_API_WORKSPACE_ID", default=None)
     CLOCKIFY_API_USER_ID: str | None = config("CLOCKIFY_API_USER_ID", default=None)
     CLOCKIFY_TMP_FILE: str = "times"
+    # how many shards (month or week) of a long time range are requested at the same time
+    CLOCKIFY_FETCH_CONCURRENCY: int = config("CLOCKIFY_FETCH_CONCURRENCY", cast=int, default=4)
+    # how many users are requested at the same time in batch mode
+    CLOCKIFY_BATCH_WORKERS: int = config("CLOCKIFY_BATCH_WORKERS", cast=int, default=8)
+    # local store of time entries, only not synced or not settled days are requested again
+    CLOCKIFY_STORE_ENABLED: bool = config("CLOCKIFY_STORE_ENABLED", cast=bool, default=True)
+    CLOCKIFY_STORE_FILE: str = config("CLOCKIFY_STORE_FILE", default="clockify.sqlite3")
+    CLOCKIFY_STORE_SETTLE_DAYS: int = config("CLOCKIFY_STORE_SETTLE_DAYS", cast=int, default=7)
+    CLOCKIFY_STORE_BUSY_TIMEOUT: float = config("CLOCKIFY_STORE_BUSY_TIMEOUT", cast=float, default=30.0)
+    # aggregated rollups per day in the local store, only days with changed entries are aggregated again
+    CLOCKIFY_ROLLUP_ENABLED: bool = config("CLOCKIFY_ROLLUP_ENABLED", cast=bool, default=True)
+    # request not hydrated entries and resolve project, task and tags by a local cached metadata index
+    CLOCKIFY_LOCAL_HYDRATION: bool = config("CLOCKIFY_LOCAL_HYDRATION", cast=bool, default=False)
+    CLOCKIFY_METADATA_FILE: str = config("CLOCKIFY_METADATA_FILE", default="clockify_metadata")
+    CLOCKIFY_METADATA_TTL: int = config("CLOCKIFY_METADATA_TTL", cast=int, default=86400)
+    # resolved issue infos by task, project and description tag, optional saved by project/task id
+    CLOCKIFY_ISSUE_CACHE_SIZE: int = config("CLOCKIFY_ISSUE_CACHE_SIZE", cast=int, default=4096)
+    CLOCKIFY_ISSUE_CACHE_PERSIST: bool = config("CLOCKIFY_ISSUE_CACHE_PERSIST", cast=bool, default=False)
+    CLOCKIFY_ISSUE_CACHE_FILE: str = config("CLOCKIFY_ISSUE_CACHE_FILE", default="clockify_issue_cache.json")
+    # python | numpy, engine to aggregate the time entries, numpy needs to be installed
+    CLOCKIFY_ENGINE: str = config("CLOCKIFY_ENGINE", default="python")
+    # table | csv | jsonl | json, output format of the times result
+    CLOCKIFY_OUTPUT_FORMAT: str = config("CLOCKIFY_OUTPUT_FORMAT", default="table")
+    # entries are bucketed by their local day in "TIME_ZONE", entries over midnight are split into both days
+    CLOCKIFY_SPLIT_MIDNIGHT: bool = config("CLOCKIFY_SPLIT_MIDNIGHT", cast=bool, default=True)
+    # warnings per time entry are counted and logged once as summary, with this count of sample entries
+    CLOCKIFY_DIAGNOSTICS_SAMPLES: int = config("CLOCKIFY_DIAGNOSTICS_SAMPLES", cast=int, default=3)
     # ------------------------------------------------------------------------------
     #
     # YOUTRACK
@@ -66,6 +119,11 @@ class Settings:
     YOUTRACK_API_ENDPOINT: str | None = config("YOUTRACK_API_ENDPOINT", default=None)
     YOUTRACK_API_ENDPOINT_SUFFIX: str | None = "youtrack/api"
     YOUTRACK_API_KEY: str | None = config("YOUTRACK_API_KEY", default=None)
+    # how many work items are uploaded at the same time, items of the same issue are uploaded in order
+    YOUTRACK_UPLOAD_CONCURRENCY: int = config("YOUTRACK_UPLOAD_CONCURRENCY", cast=int, default=4)
+    # project ids of issues and work item types of projects, cached by one projects request
+    YOUTRACK_METADATA_FILE: str = config("YOUTRACK_METADATA_FILE", default="youtrack_metadata")
+    YOUTRACK_METADATA_TTL: int = config("YOUTRACK_METADATA_TTL", cast=int, default=86400)
     # ------------------------------------------------------------------------------
     #
     # LANDWEHR
@@ -87,35 +145,47 @@ class Settings:
     def print(self) -> None:
         """Print DEBUG info."""
         if logging.getLevelName(logging.DEBUG) == self.LOGGING_LEVEL:
+            import verboselogs  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
+
             print()  # noqa: T201
             print("~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~")  # noqa: T201
             logging.log(
                 verboselogs.VERBOSE,
-                f"PROJECT_NAME           : {Bold(self.PROJECT_NAME)}",
+                "PROJECT_NAME           : %s",
+                _bold(self.PROJECT_NAME),
             )
-            logging.log(verboselogs.VERBOSE, f"VERSION                : {Bold(self.VERSION)}")
+            logging.log(verboselogs.VERBOSE, "VERSION                : %s", _bold(self.VERSION))
             logging.log(
                 verboselogs.VERBOSE,
-                f"LOGGING-LEVEL          : {Bold(self.LOGGING_LEVEL)}",
+                "LOGGING-LEVEL          : %s",
+                _bold(self.LOGGING_LEVEL),
             )
             logging.log(
                 verboselogs.VERBOSE,
-                f"LOGGING-VERBOSE        : {Bold(self.LOGGING_VERBOSE)}",
+                "LOGGING-VERBOSE        : %s",
+                _bold(self.LOGGING_VERBOSE),
             )
             logging.log(
                 verboselogs.VERBOSE,
-                f"DISABLED SPLIT PROJECT : {Bold(self.DISABLE_SPLIT_PROJECT)}",
+                "DISABLED SPLIT PROJECT : %s",
+                _bold(self.DISABLE_SPLIT_PROJECT),
             )
             logging.log(
                 verboselogs.VERBOSE,
-                f"DISABLED SPLIT HOST    : {Bold(self.DISABLE_SPLIT_HOST)}",
+                "DISABLED SPLIT HOST    : %s",
+                _bold(self.DISABLE_SPLIT_HOST),
             )
             # logging.log(
             #     verboselogs.VERBOSE,
-            #     f'PROJECT-PATH           : {Bold(create_service_path(None))}{Bold("/")}',
+            #     f'PROJECT-PATH           : {_bold(create_service_path(None))}{_bold("/")}',
             # )
             print("~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~")  # noqa: T201
             print()  # noqa: T201
 
 
+def _bold(value: object) -> str:
+    """Bold text for the terminal (ansi escape codes)."""
+    return f"\033[1m{value}\033[0m"
+
+
 settings = Settings()
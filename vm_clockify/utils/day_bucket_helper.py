@@ -0,0 +1,81 @@
+"""DAY BUCKET HELPER."""
+
+from bisect import bisect_right
+from datetime import UTC, date, datetime, timedelta, tzinfo
+
+from vm_clockify.utils.config import settings
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+class DayBucketer:
+    """Bucket UTC time ranges into the local days of a time zone.
+
+    The local midnights of the days range are converted once into UTC instants,
+    so all offset transitions (like daylight saving time) inside the range are part of the table.
+    An entry is bucketed by a binary search of its start in the table, without any per entry
+    date formatting, and entries over midnight are split into one part per day.
+    """
+
+    def __init__(self, first_day: date, last_day: date, tz: tzinfo | None = None, split_midnight: bool | None = None) -> None:
+        """Day bucketer."""
+        self.first_day = first_day
+        self.last_day = last_day
+        self.tz = tz if tz is not None else settings.TIME_ZONE
+        self.split_midnight = split_midnight if split_midnight is not None else settings.CLOCKIFY_SPLIT_MIDNIGHT
+        # local midnights from first day until the day after the last day, as utc epoch seconds
+        self._day_starts: list[int] = []
+        self._days: list[str] = []
+        current_day = first_day
+        while current_day <= last_day + timedelta(days=1):
+            local_midnight = datetime(current_day.year, current_day.month, current_day.day, tzinfo=self.tz)
+            self._day_starts.append(int(local_midnight.timestamp()))
+            self._days.append(current_day.isoformat())
+            current_day += timedelta(days=1)
+
+    def fetch_range(self) -> tuple[date, date]:
+        """Return the utc days to request, with splitting also the day before for entries over midnight into the range."""
+        first = datetime.fromtimestamp(self._day_starts[0], tz=UTC).date()
+        last = datetime.fromtimestamp(self._day_starts[-1] - 1, tz=UTC).date()
+        if self.split_midnight:
+            first -= timedelta(days=1)
+        return first, last
+
+    def day_table(self) -> tuple[list[int], list[str]]:
+        """Return the local midnights (utc epoch seconds) until the day after the last day and their days, for many entries."""
+        return self._day_starts, self._days
+
+    def parse_instant(self, value: str) -> int | None:
+        """Parse an iso 8601 timestamp like "2024-01-01T06:00:00Z" into utc epoch seconds, None if it is not valid."""
+        try:
+            instant = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+        if instant.tzinfo is None:
+            instant = instant.replace(tzinfo=UTC)
+        return int(instant.timestamp())
+
+    def split(self, start: int, seconds: int | None) -> list[tuple[str, int | None]]:
+        """Split the time range into (local day, seconds) parts, parts outside the days range are dropped.
+
+        Ranges without duration (like a running timer) are bucketed by their start only.
+        """
+        day_starts = self._day_starts
+        last_index = len(day_starts) - 1
+        index = bisect_right(day_starts, start) - 1
+        if seconds is None or not self.split_midnight:
+            return [(self._days[index], seconds)] if 0 <= index < last_index else []
+
+        end = start + seconds
+        parts: list[tuple[str, int | None]] = []
+        while index < last_index:
+            next_day_start = day_starts[index + 1]
+            if index >= 0:
+                parts.append((self._days[index], min(end, next_day_start) - max(start, day_starts[index])))
+            if end <= next_day_start:
+                break
+            index += 1
+        return parts
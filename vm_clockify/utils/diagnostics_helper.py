@@ -0,0 +1,55 @@
+"""DIAGNOSTICS HELPER."""
+
+import logging
+import threading
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+class Diagnostics:
+    """Warnings of hot loops, collected as counter per message with a few samples and logged once as summary.
+
+    A warning per time entry costs more than its processing on long ranges, so only the first
+    samples (like the values of the entry) are kept and formatted, all others are only counted.
+    """
+
+    def __init__(self, max_samples: int = 3) -> None:
+        """Diagnostics."""
+        self.max_samples = max_samples
+        self._counts: dict[str, int] = {}
+        self._samples: dict[str, list[str]] = {}
+        self._lock = threading.Lock()
+
+    def warn(self, message: str, sample: object = None) -> None:
+        """Count the message, the sample is only formatted and kept for the first ones."""
+        with self._lock:
+            self._counts[message] = self._counts.get(message, 0) + 1
+            if sample is not None:
+                samples = self._samples.setdefault(message, [])
+                if len(samples) < self.max_samples:
+                    samples.append(str(sample))
+
+    def counts(self) -> dict[str, int]:
+        """Return the counter per message collected since the last summary."""
+        with self._lock:
+            return dict(self._counts)
+
+    def report(self, title: str) -> None:
+        """Log the summary of the collected warnings and start counting again."""
+        with self._lock:
+            counts, samples = self._counts, self._samples
+            self._counts, self._samples = {}, {}
+        if not counts:
+            return
+
+        logging.log(logging.WARNING, "%s: %d warnings, check the entries:", title, sum(counts.values()))
+        for message, count in counts.items():
+            logging.log(logging.WARNING, "  - %s (%dx)", message, count)
+            message_samples = samples.get(message, [])
+            for sample in message_samples:
+                logging.log(logging.WARNING, "      %s", sample)
+            if message_samples and count > len(message_samples):
+                logging.log(logging.WARNING, "      ... and %d more", count - len(message_samples))
@@ -0,0 +1,61 @@
+"""DURATION HELPER."""
+
+from collections.abc import Iterable
+import re
+from typing import Any
+
+# iso 8601 duration as returned by clockify, like "PT1H30M", "PT45S" or "P1DT2H" (days are 24h)
+DURATION_PATTERN: re.Pattern[str] = re.compile(r"P(?:(\d+)D)?(?:T(?=\d)(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)(?:[.,]\d+)?S)?)?")
+# clockify durations repeat a lot (same length of work), parsed values are kept until the cache is full
+DURATION_CACHE_SIZE: int = 65536
+
+_duration_cache: dict[str, int | None] = {}
+
+
+def parse_duration(value: str) -> int | None:
+    """Parse an iso 8601 duration "PnDTnHnMnS" into seconds, fractions of a second are cut.
+
+    Returns None if the value is not a valid duration.
+    """
+    try:
+        return _duration_cache[value]
+    except KeyError:
+        pass
+    match = DURATION_PATTERN.fullmatch(value)
+    seconds: int | None = None
+    if match is not None and len(value) > 1:
+        days, hours, minutes, secs = match.groups()
+        seconds = ((int(days or 0) * 24 + int(hours or 0)) * 60 + int(minutes or 0)) * 60 + int(secs or 0)
+    if len(_duration_cache) >= DURATION_CACHE_SIZE:
+        _duration_cache.clear()
+    _duration_cache[value] = seconds
+    return seconds
+
+
+def clear_duration_cache() -> None:
+    """Clear the parsed durations, like for a benchmark without warm cache."""
+    _duration_cache.clear()
+
+
+def parse_durations(values: Iterable[str | None]) -> list[int | None]:
+    """Parse a batch of iso 8601 durations (like all entries of a page) into seconds, not valid or missing values are None."""
+    cache_get = _duration_cache.get
+    missing = -1
+    results: list[int | None] = []
+    append = results.append
+    for value in values:
+        if not value:
+            append(None)
+            continue
+        seconds = cache_get(value, missing)
+        append(parse_duration(value) if seconds == missing else seconds)
+    return results
+
+
+def entry_duration(work: dict[str, Any]) -> str | None:
+    """Get the raw duration of a clockify time entry."""
+    time_interval = work.get("timeInterval")
+    if time_interval is None:
+        return None
+    duration: str | None = time_interval.get("duration", None)
+    return duration
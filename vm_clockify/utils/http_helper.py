@@ -0,0 +1,302 @@
+"""HTTP HELPER."""
+
+import asyncio
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from importlib.util import find_spec
+import logging
+import random
+import threading
+import time
+from typing import Any
+
+import httpx
+
+from vm_clockify.utils.config import settings
+
+# methods which can be repeated without side effects, others are only repeated on 429 (request was not processed)
+IDEMPOTENT_METHODS: frozenset[str] = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUS_CODES: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+class HostRateLimiter:
+    """Token bucket with adaptive concurrency for one host.
+
+    Requests take a token (refilled with "HTTP_RATE_LIMIT" per second up to "HTTP_RATE_BURST")
+    and a concurrency slot. The concurrency limit grows by one per window of successful requests
+    and is halved on throttling or server errors (AIMD), a "Retry-After" pauses the complete host.
+    """
+
+    def __init__(self, host: str) -> None:
+        self.host = host
+        self._lock = threading.Lock()
+        self._rate = settings.HTTP_RATE_LIMIT
+        self._burst = float(max(settings.HTTP_RATE_BURST, 1))
+        self._tokens = self._burst
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._limit = float(settings.HTTP_CONCURRENCY_MAX)
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit."""
+        return max(int(self._limit), settings.HTTP_CONCURRENCY_MIN)
+
+    def try_acquire(self) -> float:
+        """Take a slot and a token, return 0 if acquired else the seconds to wait before trying again."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self._in_flight >= self.limit:
+                return 0.05
+            if self._rate > 0:
+                self._tokens = min(self._burst, self._tokens + (now - self._refilled_at) * self._rate)
+                self._refilled_at = now
+                if self._tokens < 1:
+                    return (1 - self._tokens) / self._rate
+                self._tokens -= 1
+            self._in_flight += 1
+            return 0.0
+
+    def release(self, status_code: int | None, retry_after: float | None = None) -> None:
+        """Give back the slot and adapt the concurrency limit by the result of the request."""
+        with self._lock:
+            self._in_flight = max(self._in_flight - 1, 0)
+            if status_code is None or status_code in RETRY_STATUS_CODES:
+                self._limit = max(self._limit / 2, float(settings.HTTP_CONCURRENCY_MIN))
+                logging.log(logging.DEBUG, "%s: request failed (%s), concurrency limit is %s", self.host, status_code, self.limit)
+            else:
+                self._limit = min(self._limit + 1 / self._limit, float(settings.HTTP_CONCURRENCY_MAX))
+            if retry_after is not None:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+
+class HostRateLimiters:
+    """Rate limiter per host, shared by the sync and async clients."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._limiters: dict[str, HostRateLimiter] = {}
+
+    def get(self, host: str) -> HostRateLimiter:
+        """Get the limiter of the host, create it on first usage."""
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = HostRateLimiter(host)
+                self._limiters[host] = limiter
+            return limiter
+
+
+rate_limiters = HostRateLimiters()
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    """Parse the "Retry-After" header, as seconds or http date, limited to "HTTP_RETRY_BACKOFF_MAX".
+
+    The value pauses all requests to the host, so a server value like an hour does not block the cli that long.
+    """
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(tz=UTC)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), settings.HTTP_RETRY_BACKOFF_MAX)
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(settings.HTTP_RETRY_BACKOFF_MAX, settings.HTTP_RETRY_BACKOFF * 2**attempt))  # noqa: S311
+
+
+def _should_retry(request: httpx.Request, status_code: int | None, attempt: int) -> bool:
+    if attempt >= settings.HTTP_RETRY_MAX:
+        return False
+    if status_code == 429:
+        return True
+    return request.method in IDEMPOTENT_METHODS and (status_code is None or status_code in RETRY_STATUS_CODES)
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """Sync transport, which rate limits and retries the requests of the wrapped transport."""
+
+    def __init__(self, transport: httpx.BaseTransport) -> None:
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send the request, retry it on throttling or transient errors."""
+        limiter = rate_limiters.get(request.url.host)
+        attempt = 0
+        while True:
+            while (wait := limiter.try_acquire()) > 0:
+                time.sleep(wait)
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.TransportError as e:
+                limiter.release(None)
+                if not _should_retry(request, None, attempt):
+                    raise
+                delay = _backoff(attempt)
+                logging.log(logging.WARNING, "%s %s failed with '%s', retry in %.1fs", request.method, request.url.host, e, delay)
+            else:
+                retry_after = _retry_after(response) if response.status_code in RETRY_STATUS_CODES else None
+                limiter.release(response.status_code, retry_after)
+                if not _should_retry(request, response.status_code, attempt):
+                    return response
+                response.close()
+                delay = retry_after if retry_after is not None else _backoff(attempt)
+                logging.log(
+                    logging.WARNING,
+                    "%s %s returns '%s', retry in %.1fs",
+                    request.method,
+                    request.url.host,
+                    response.status_code,
+                    delay,
+                )
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        """Close the wrapped transport."""
+        self._transport.close()
+
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    """Async transport, which rate limits and retries the requests of the wrapped transport."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send the request, retry it on throttling or transient errors."""
+        limiter = rate_limiters.get(request.url.host)
+        attempt = 0
+        while True:
+            while (wait := limiter.try_acquire()) > 0:  # noqa: ASYNC110
+                await asyncio.sleep(wait)
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                limiter.release(None)
+                if not _should_retry(request, None, attempt):
+                    raise
+                delay = _backoff(attempt)
+                logging.log(logging.WARNING, "%s %s failed with '%s', retry in %.1fs", request.method, request.url.host, e, delay)
+            else:
+                retry_after = _retry_after(response) if response.status_code in RETRY_STATUS_CODES else None
+                limiter.release(response.status_code, retry_after)
+                if not _should_retry(request, response.status_code, attempt):
+                    return response
+                await response.aclose()
+                delay = retry_after if retry_after is not None else _backoff(attempt)
+                logging.log(
+                    logging.WARNING,
+                    "%s %s returns '%s', retry in %.1fs",
+                    request.method,
+                    request.url.host,
+                    response.status_code,
+                    delay,
+                )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self) -> None:
+        """Close the wrapped transport."""
+        await self._transport.aclose()
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+class HttpClientRegistry:
+    """Shared http clients, reused by all services for the whole run.
+
+    Clients are created on first usage by name, so connections (and TLS sessions)
+    are kept in the pool and reused between requests and services.
+    All requests are rate limited per host and retried on throttling or transient errors.
+    Async clients are bound to the event loop they are used in,
+    they need to be closed with "aclose" before the loop ends.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._clients: dict[str, httpx.Client] = {}
+        self._async_clients: dict[str, httpx.AsyncClient] = {}
+
+    def client(self, name: str = "default") -> httpx.Client:
+        """Get the shared sync client by name, create it on first usage."""
+        with self._lock:
+            client = self._clients.get(name)
+            if client is None or client.is_closed:
+                options = self._client_options()
+                client = httpx.Client(
+                    transport=RateLimitedTransport(httpx.HTTPTransport(**options)),
+                    timeout=self._client_timeout(),
+                )
+                self._clients[name] = client
+                logging.log(logging.DEBUG, "http client '%s' is initiated", name)
+            return client
+
+    def async_client(self, name: str = "default") -> httpx.AsyncClient:
+        """Get the shared async client by name, create it on first usage."""
+        with self._lock:
+            client = self._async_clients.get(name)
+            if client is None or client.is_closed:
+                options = self._client_options()
+                client = httpx.AsyncClient(
+                    transport=AsyncRateLimitedTransport(httpx.AsyncHTTPTransport(**options)),
+                    timeout=self._client_timeout(),
+                )
+                self._async_clients[name] = client
+                logging.log(logging.DEBUG, "http async client '%s' is initiated", name)
+            return client
+
+    def close(self) -> None:
+        """Close all sync clients."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+    async def aclose(self) -> None:
+        """Close all async clients, needs to be called inside the event loop the clients are used in."""
+        with self._lock:
+            clients = list(self._async_clients.values())
+            self._async_clients.clear()
+        for client in clients:
+            await client.aclose()
+
+    def _client_options(self) -> dict[str, Any]:
+        http2 = settings.HTTP_HTTP2
+        if http2 and find_spec("h2") is None:
+            logging.log(logging.WARNING, 'http2 needs "h2" installed (pip install "vm_clockify[http2]"), use http1.1')
+            http2 = False
+        return {
+            "http2": http2,
+            "limits": httpx.Limits(
+                max_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.HTTP_POOL_KEEPALIVE_EXPIRY,
+            ),
+        }
+
+    def _client_timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT)
+
+
+http_clients = HttpClientRegistry()
@@ -0,0 +1,55 @@
+"""ISSUE TAG HELPER.
+
+Issue infos are set as last bracket tag in the description, task or project name,
+like 'example name [i=issue-id&t=type]'. The scanners run in one pass over the text
+and return the same results as the former nested lazy regex,
+which backtracks exponential on texts with many brackets.
+"""
+
+from urllib.parse import unquote
+
+
+def find_issue_tag(value: str) -> str | None:
+    """Return the content of the last bracket tag, or None if the text has no tag.
+
+    Tags are paired from left, each '[' is closed by the next ']', brackets inside a tag are part of it.
+    Texts with a line break (other than a final one) have no tag.
+    """
+    line = value.removesuffix("\n")
+    if "\n" in line:
+        return None
+    tag: str | None = None
+    position = 0
+    while (start := line.find("[", position)) != -1:
+        end = line.find("]", start + 1)
+        if end == -1:
+            break
+        tag = line[start + 1 : end]
+        position = end + 1
+    return tag
+
+
+def strip_issue_tag(description: str) -> str:
+    """Remove the tag at the end of the description, from the first '[' of the last line, and strip it."""
+    line = description.removesuffix("\n")
+    if line.endswith("]"):
+        start = line.find("[", line.rfind("\n") + 1)
+        if start != -1:
+            return (line[:start] + description[len(line) :]).strip()
+    return description.strip()
+
+
+def parse_issue_tag(tag: str) -> dict[str, str]:
+    """Parse the key/values of a tag like 'i=issue-id&t=type', the first value of a key is used.
+
+    Values are decoded like a query string, pairs without value are ignored.
+    """
+    values: dict[str, str] = {}
+    for pair in tag.split("&"):
+        key, separator, value = pair.partition("=")
+        if not separator or not value:
+            continue
+        key = unquote(key.replace("+", " "))
+        if key not in values:
+            values[key] = unquote(value.replace("+", " "))
+    return values
@@ -1,18 +1,23 @@
 """UTILS HELPER."""
 
+import codecs
+from collections.abc import Callable, Iterable, Iterator
+import json
 import logging
 from pathlib import Path
 import re
 import sys
-from typing import Any
+from typing import TYPE_CHECKING, Any
 import unicodedata
 from urllib.parse import urlparse
 
 import click
-import httpx
 
 from vm_clockify.utils.config import settings
 
+if TYPE_CHECKING:
+    import httpx
+
 
 # ------------------------------------------------------------------------------
 #
@@ -20,12 +25,33 @@ from vm_clockify.utils.config import settings
 #
 # ------------------------------------------------------------------------------
 class Context:
-    """CONTEXT."""
+    """CONTEXT.
+
+    The service of a command group is created first, when a command uses it,
+    so like the help of a command does not import or create it.
+    """
 
     def __init__(self) -> None:
         """INIT CONTEXT."""
         logging.log(logging.DEBUG, "init context...")
-        self.service: Any = None
+        self._service: Any = None
+        self._service_factory: Callable[[], Any] | None = None
+
+    @property
+    def service(self) -> Any:  # noqa: ANN401
+        """Service of the command group, created by its factory on first use."""
+        if self._service is None and self._service_factory is not None:
+            self._service = self._service_factory()
+        return self._service
+
+    @service.setter
+    def service(self, service: Any) -> None:  # noqa: ANN401
+        self._service = service
+
+    def lazy_service(self, factory: Callable[[], Any]) -> None:
+        """Set the factory of the service, which is called first when a command uses the service."""
+        self._service = None
+        self._service_factory = factory
 
 
 pass_context = click.make_pass_decorator(Context, ensure=True)
@@ -51,10 +77,10 @@ def create_service_folder(
         if path.startswith("./"):
             path = f"{Path.cwd()}{path[1:]}"
         if create_folder(path):
-            logging.log(logging.DEBUG, f"new folder created:: {path}")
+            logging.log(logging.DEBUG, "new folder created:: %s", path)
             return path
 
-        logging.log(logging.ERROR, f'failed to create path "{path}", check permission')
+        logging.log(logging.ERROR, 'failed to create path "%s", check permission', path)
     except Exception as e:
         logging.log(logging.CRITICAL, e, exc_info=True)
     sys.exit(1)
@@ -72,7 +98,7 @@ def create_folder(path: str, mode: int = 0o700) -> bool:
     except OSError:
         logging.exception("OS error")
     except Exception as e:
-        logging.critical(f"Unexpected error occurred: {e}", exc_info=True)
+        logging.critical("Unexpected error occurred: %s", e, exc_info=True)
     else:
         return True
     return False
@@ -116,18 +142,22 @@ def uri_validator(url: str) -> str | None:
     return None
 
 
-def url_checker(url: httpx.URL | str) -> bool:
+def url_checker(url: "httpx.URL | str") -> bool:
     """No desc."""
+    import httpx  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
+
+    from vm_clockify.utils.http_helper import http_clients  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
+
     try:
-        get = httpx.get(url, timeout=5)
-        logging.log(logging.DEBUG, f"{url}: returns '{get.status_code}'")
+        get = http_clients.client().get(url, timeout=5)
+        logging.log(logging.DEBUG, "%s: returns '%s'", url, get.status_code)
         if get.status_code == 200:
             return True
 
     except httpx.RequestError as e:
-        logging.log(logging.DEBUG, f"{url}: fails with '{e}'")
+        logging.log(logging.DEBUG, "%s: fails with '%s'", url, e)
     except Exception as e:
-        logging.log(logging.DEBUG, f"{url}: fails with [{type(e)}] '{e}'")
+        logging.log(logging.DEBUG, "%s: fails with [%s] '%s'", url, type(e), e)
     return False
 
 
@@ -143,3 +173,63 @@ def slugify(value: str | None, allow_unicode: bool = False) -> str | None:
         value = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
     value = re.sub(r"[^\w\s-]", "", value.lower())
     return re.sub(r"[-\s]+", "-", value).strip("-_")
+
+
+# ------------------------------------------------------------------------------
+#
+#
+#
+# ------------------------------------------------------------------------------
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Decode a json array incrementally from byte chunks and yield its items one by one.
+
+    Only the not yet decoded rest of the stream is kept in memory, raises ValueError if it is not a json array.
+    """
+    decoder = json.JSONDecoder()
+    utf8_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    started = False
+    finished = False
+    for chunk in _with_end(chunks):
+        buffer += utf8_decoder.decode(chunk or b"", final=chunk is None)
+        position = 0
+        while True:
+            # skip whitespace and the array syntax between the items
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position >= len(buffer):
+                break
+            if not started:
+                if buffer[position] != "[":
+                    msg = "json is not an array"
+                    raise ValueError(msg)
+                started = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                finished = True
+                position = len(buffer)
+                break
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # item is not complete yet, wait for the next chunk
+                if chunk is None:
+                    raise
+                break
+            if end >= len(buffer) and chunk is not None:
+                # a number could continue in the next chunk
+                break
+            yield item
+            position = end
+        buffer = buffer[position:]
+    if not finished:
+        msg = "json array is not complete"
+        raise ValueError(msg)
+
+
+def _with_end(chunks: Iterable[bytes]) -> Iterator[bytes | None]:
+    yield from chunks
+    yield None